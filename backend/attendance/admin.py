@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Attendance
+from .models import Attendance, DailyAttendanceSummary
 
 
 @admin.register(Attendance)
@@ -20,6 +20,7 @@ class AttendanceAdmin(admin.ModelAdmin):
         'employee_email', 'department'
     ]
     ordering = ['-date', '-created_at']
+    list_select_related = ['employee__user', 'employee__role__department']
     
     fieldsets = (
         ('Basic Information', {
@@ -49,3 +50,22 @@ class AttendanceAdmin(admin.ModelAdmin):
     def department(self, obj):
         return obj.employee.department.name if obj.employee.department else 'N/A'
     department.short_description = 'Department'
+
+
+@admin.register(DailyAttendanceSummary)
+class DailyAttendanceSummaryAdmin(admin.ModelAdmin):
+    list_display = [
+        'employee', 'date', 'worked_hours', 'shortfall_hours', 'session_count',
+        'open_session_count', 'first_check_in', 'last_check_out'
+    ]
+    list_filter = ['date', 'employee__role__department']
+    search_fields = ['employee__first_name', 'employee__last_name', 'employee__user__email']
+    list_select_related = ['employee__role']
+    ordering = ['-date', 'employee_id']
+
+    def has_add_permission(self, request):
+        # Rows are maintained from attendance sessions, never entered by hand
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
@@ -0,0 +1,13 @@
+from django.urls import path
+from . import async_views
+
+app_name = 'attendance-async'
+
+urlpatterns = [
+    path('', async_views.attendance_list, name='attendance-list'),
+    path('<int:pk>/', async_views.attendance_detail, name='attendance-detail'),
+    path('employee/<int:employee_id>/', async_views.attendance_by_employee, name='attendance-by-employee'),
+    path('date-range/', async_views.attendance_by_date_range, name='attendance-by-date-range'),
+    path('today/', async_views.today_attendance, name='today-attendance'),
+    path('reports/timesheet/', async_views.timesheet, name='timesheet-report'),
+]
@@ -0,0 +1,76 @@
+"""
+Async-native versions of the attendance read endpoints.
+
+They return the same payloads as the DRF views in views.py but query through
+Django's async ORM, so a slow date-range or report query suspends only its own
+request when served through backend/asgi.py. Mounted under /api/async/attendance/.
+"""
+from django.utils import timezone
+from rest_framework import status
+
+from backend.async_views import apaginated_data, async_api_view
+from .models import Attendance
+from .reports import atimesheet_report, timesheet_totals
+from .serializers import AttendanceDetailSerializer, AttendanceListValuesSerializer
+from .views import parse_date_range
+
+
+@async_api_view
+async def attendance_list(request):
+    return await apaginated_data(request, Attendance.objects.for_listing(), AttendanceListValuesSerializer)
+
+
+@async_api_view
+async def attendance_detail(request, pk):
+    try:
+        attendance = await AttendanceDetailSerializer.select_related_for(Attendance.objects.all(), request).aget(pk=pk)
+    except Attendance.DoesNotExist:
+        return {'detail': 'No Attendance matches the given query.'}, status.HTTP_404_NOT_FOUND
+    return AttendanceDetailSerializer(attendance, context={'request': request}).data
+
+
+@async_api_view
+async def attendance_by_employee(request, employee_id):
+    attendances = Attendance.objects.for_listing().filter(employee_id=employee_id)
+    return await apaginated_data(request, attendances, AttendanceListValuesSerializer)
+
+
+@async_api_view
+async def attendance_by_date_range(request):
+    start_date, end_date, error_response = parse_date_range(request)
+    if error_response:
+        return error_response.data, error_response.status_code
+    attendances = Attendance.objects.for_listing().filter(date__range=[start_date, end_date])
+    return await apaginated_data(request, attendances, AttendanceListValuesSerializer)
+
+
+@async_api_view
+async def today_attendance(request):
+    attendances = Attendance.objects.for_listing().filter(date=timezone.now().date())
+    return await apaginated_data(request, attendances, AttendanceListValuesSerializer)
+
+
+@async_api_view
+async def timesheet(request):
+    start_date, end_date, error_response = parse_date_range(request)
+    if error_response:
+        return error_response.data, error_response.status_code
+
+    group_by = request.query_params.get('group_by', 'employee')
+    bucket = request.query_params.get('bucket', 'day')
+    try:
+        results = await atimesheet_report(start_date, end_date, group_by=group_by, bucket=bucket)
+    except ValueError as e:
+        return {
+            'message': 'Invalid report parameters',
+            'error': str(e)
+        }, status.HTTP_400_BAD_REQUEST
+
+    return {
+        'start_date': start_date,
+        'end_date': end_date,
+        'group_by': group_by,
+        'bucket': bucket,
+        'totals': timesheet_totals(results),
+        'results': results,
+    }
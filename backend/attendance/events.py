@@ -0,0 +1,126 @@
+"""
+Live attendance events.
+
+Views publish check-in, check-out, create and update events through a broker
+once their transaction commits; the SSE endpoint subscribes to the broker and
+forwards each event to connected dashboards.
+
+The broker class is configurable through ``ATTENDANCE_EVENT_BROKER``.
+``LocalBroker`` fans events out inside one process, which is enough for a
+single ASGI worker; deployments with several workers need a broker backed by
+shared pub/sub (e.g. Redis) implementing the same two methods.
+"""
+import asyncio
+import itertools
+import json
+import threading
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+from .serializers import AttendanceListSerializer
+
+QUEUE_SIZE = 256
+KEEPALIVE_SECONDS = 15
+
+
+class BaseBroker:
+    """Pub/sub interface used by the attendance views and the SSE endpoint"""
+
+    def publish(self, event):
+        """Deliver ``event`` (a JSON-serializable dict) to every subscriber; may be called from any thread"""
+        raise NotImplementedError
+
+    def subscribe(self):
+        """Return a subscription bound to the running event loop, with ``async get(timeout)`` and ``close()``"""
+        raise NotImplementedError
+
+
+class LocalSubscription:
+    def __init__(self, broker, loop, maxsize=QUEUE_SIZE):
+        self.broker = broker
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize)
+
+    def deliver(self, event):
+        try:
+            self.loop.call_soon_threadsafe(self._put, event)
+        except RuntimeError:
+            # The subscriber's loop has shut down
+            self.close()
+
+    def _put(self, event):
+        if self.queue.full():
+            # A consumer this far behind cannot catch up from deltas; tell it to refetch
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            event = {'type': 'resync'}
+        self.queue.put_nowait(event)
+
+    async def get(self, timeout=None):
+        """Wait for the next event; returns None if ``timeout`` seconds pass first"""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+
+class LocalBroker(BaseBroker):
+    """In-process broker: one bounded asyncio queue per subscriber"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = set()
+        self._ids = itertools.count(1)
+
+    def publish(self, event):
+        event = dict(event, id=next(self._ids))
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscription in subscribers:
+            subscription.deliver(event)
+        return event
+
+    def subscribe(self):
+        subscription = LocalSubscription(self, asyncio.get_running_loop())
+        with self._lock:
+            self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+
+@lru_cache(maxsize=None)
+def get_broker():
+    path = getattr(settings, 'ATTENDANCE_EVENT_BROKER', 'attendance.events.LocalBroker')
+    return import_string(path)()
+
+
+def publish_attendance_event(event_type, attendance):
+    """
+    Publish ``attendance`` (loaded with ``for_listing()``) as an ``event_type``
+    event once the current transaction commits.
+    """
+    event = {
+        'type': event_type,
+        'attendance': dict(AttendanceListSerializer(attendance).data),
+    }
+    transaction.on_commit(lambda: get_broker().publish(event))
+
+
+def format_event(event):
+    """Encode an event as a Server-Sent Events message"""
+    lines = []
+    if 'id' in event:
+        lines.append(f"id: {event['id']}")
+    lines.append(f"event: {event['type']}")
+    lines.append(f"data: {json.dumps(event, cls=DjangoJSONEncoder, separators=(',', ':'))}")
+    return '\n'.join(lines) + '\n\n'
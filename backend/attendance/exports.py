@@ -0,0 +1,76 @@
+"""
+Streaming attendance exports.
+
+Rows are fetched with a chunked server-side iterator over the flat ``.values()``
+projection of AttendanceListValuesSerializer and encoded by generators, so
+memory stays flat whatever the date range and the first bytes are sent before
+the query has finished.
+"""
+import csv
+import json
+
+from .models import Attendance
+from .serializers import AttendanceListValuesSerializer
+
+EXPORT_FORMATS = {
+    'csv': ('text/csv', 'csv'),
+    'ndjson': ('application/x-ndjson', 'ndjson'),
+}
+
+HEADER = [
+    'attendance_id', 'employee', 'employee_name', 'employee_email', 'department',
+    'date', 'status', 'check_in_time', 'check_out_time',
+]
+
+CHUNK_SIZE = 2000
+
+
+class Echo:
+    """File-like object whose ``write`` returns the value, for csv.writer"""
+
+    def write(self, value):
+        return value
+
+
+def iter_records(start_date, end_date):
+    """Yield one list-endpoint dict per session between the dates, in the default ordering"""
+    serializer = AttendanceListValuesSerializer()
+    rows = AttendanceListValuesSerializer.project(
+        Attendance.objects.filter(date__range=[start_date, end_date])
+    ).iterator(chunk_size=CHUNK_SIZE)
+    for row in rows:
+        yield serializer.to_representation(row)
+
+
+def _chunked(lines):
+    """Join encoded lines into larger chunks, sending the first line straight away"""
+    lines = iter(lines)
+    for line in lines:
+        yield line
+        break
+    buffer = []
+    for line in lines:
+        buffer.append(line)
+        if len(buffer) >= CHUNK_SIZE:
+            yield ''.join(buffer)
+            buffer = []
+    if buffer:
+        yield ''.join(buffer)
+
+
+def stream_csv(records):
+    writer = csv.writer(Echo())
+    yield writer.writerow(HEADER)
+    yield from _chunked(writer.writerow([record[column] for column in HEADER]) for record in records)
+
+
+def stream_ndjson(records):
+    yield from _chunked(json.dumps(record, separators=(',', ':')) + '\n' for record in records)
+
+
+def export_rows(start_date, end_date, file_type='csv'):
+    """Return a generator of encoded text chunks for a StreamingHttpResponse"""
+    records = iter_records(start_date, end_date)
+    if file_type == 'ndjson':
+        return stream_ndjson(records)
+    return stream_csv(records)
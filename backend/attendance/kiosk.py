@@ -0,0 +1,130 @@
+"""
+Batch processing of kiosk badge scans.
+
+A batch is validated up front, the affected employee-days are loaded with one
+query, check-in/check-out semantics are applied in memory in scan order, and
+the result is written back with one ``bulk_create`` and one ``bulk_update``
+inside a single transaction.
+"""
+from collections import defaultdict
+
+from django.db import transaction
+from django.utils import timezone
+
+from employees.models import Employee
+from .models import Attendance
+from .serializers import AttendanceScanSerializer
+from .summaries import refresh_daily_summaries
+
+MAX_SCANS = 1000
+DEFAULT_STATUS = 'Present'
+
+
+def validate_scans(items):
+    """
+    Validate raw scan dicts. Returns ``(valid, errors)`` where ``valid`` is a list
+    of ``(index, validated_data)`` and ``errors`` maps index to serializer errors.
+    """
+    ids = set()
+    for item in items:
+        try:
+            ids.add(int(item.get('employee')))
+        except (AttributeError, TypeError, ValueError):
+            pass
+    context = {'employees': Employee.objects.in_bulk(ids)}
+
+    valid, errors = [], {}
+    for index, item in enumerate(items):
+        serializer = AttendanceScanSerializer(data=item, context=context)
+        if serializer.is_valid():
+            valid.append((index, serializer.validated_data))
+        else:
+            errors[index] = serializer.errors
+    return valid, errors
+
+
+def _apply(scan, sessions, new_sessions):
+    """Apply one scan to the employee-day ``sessions``; returns (attendance, error)"""
+    when = scan['timestamp']
+    open_sessions = [s for s in sessions if s.check_in_time and not s.check_out_time]
+
+    if scan['action'] == 'check_in':
+        if open_sessions:
+            return None, 'Employee has already checked in'
+        pending = next((s for s in sessions if not s.check_in_time), None)
+        if pending is None:
+            pending = Attendance(
+                employee=scan['employee'],
+                date=scan['date'],
+                status=scan.get('status') or DEFAULT_STATUS,
+            )
+            sessions.append(pending)
+            new_sessions.append(pending)
+        pending.check_in_time = when
+        return pending, None
+
+    if not open_sessions:
+        return None, 'Employee must check in before checking out'
+    session = open_sessions[-1]
+    if when < session.check_in_time:
+        return None, 'Check-out cannot be before check-in'
+    session.check_out_time = when
+    return session, None
+
+
+def apply_scans(items):
+    """
+    Validate and apply a batch of scans. Returns one result dict per input item,
+    in order; invalid or rejected scans do not affect the rest of the batch.
+    """
+    valid, errors = validate_scans(items)
+    now = timezone.now()
+    for _, scan in valid:
+        scan.setdefault('timestamp', now)
+        scan['date'] = timezone.localdate(scan['timestamp'])
+
+    outcomes = {}
+    with transaction.atomic():
+        keys = {(scan['employee'].pk, scan['date']) for _, scan in valid}
+        sessions = defaultdict(list)
+        if keys:
+            existing = (
+                Attendance.objects.select_for_update()
+                .filter(employee_id__in={k[0] for k in keys}, date__in={k[1] for k in keys})
+                .order_by('created_at', 'attendance_id')
+            )
+            for attendance in existing:
+                sessions[(attendance.employee_id, attendance.date)].append(attendance)
+
+        new_sessions, touched = [], {}
+        for index, scan in valid:
+            key = (scan['employee'].pk, scan['date'])
+            attendance, error = _apply(scan, sessions[key], new_sessions)
+            outcomes[index] = (attendance, error)
+            if attendance is not None:
+                attendance.updated_at = now
+                touched[id(attendance)] = attendance
+
+        created = {id(attendance) for attendance in new_sessions}
+        Attendance.objects.bulk_create(new_sessions)
+        Attendance.objects.bulk_update(
+            [a for key, a in touched.items() if key not in created],
+            ['check_in_time', 'check_out_time', 'updated_at'],
+        )
+        refresh_daily_summaries((a.employee_id, a.date) for a in touched.values())
+
+    results = []
+    for index, item in enumerate(items):
+        result = {'index': index}
+        if isinstance(item, dict):
+            result.update(employee=item.get('employee'), action=item.get('action'))
+        if index in errors:
+            result.update({'success': False, 'errors': errors[index]})
+        else:
+            attendance, error = outcomes[index]
+            if error:
+                result.update({'success': False, 'errors': {'non_field_errors': [error]}})
+            else:
+                result.update({'success': True, 'attendance_id': attendance.pk})
+        results.append(result)
+    return results
@@ -0,0 +1,213 @@
+import json
+import platform
+import random
+import statistics
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from attendance.seeding import seed_employees, seed_roles, seed_sessions
+from authentication.tokens import EmployeeRefreshToken
+
+DEFAULT_BASELINE = Path(settings.BASE_DIR) / 'benchmarks' / 'api_baseline.json'
+PASSWORD = 'benchmark-password'
+
+# name -> (method, URL name, URL args from the fixtures, params from the fixtures)
+SCENARIOS = {
+    'signin': ('POST', 'authentication:signin', None, lambda f: {'email': f['email'], 'password': PASSWORD}),
+    'today': ('GET', 'attendance:today-attendance', None, None),
+    'date-range': ('GET', 'attendance:attendance-by-date-range', None, lambda f: f['window']),
+    'attendance-list': ('GET', 'attendance:attendance-list', None, None),
+    'timesheet': ('GET', 'attendance:timesheet-report', None, lambda f: dict(f['window'], group_by='department', bucket='week')),
+    'team-status': ('GET', 'attendance:team-status', lambda f: [f['manager']], lambda f: {'transitive': 'true'}),
+    'employee-list': ('GET', 'employees:employee-list', None, None),
+    'employee-search': ('GET', 'employees:employee-search', None, lambda f: {'q': 'seed 12'}),
+    'employee-reports': ('GET', 'employees:employee-reports', lambda f: [f['manager']], None),
+}
+# Lower is better for every compared metric
+COMPARED = ('p50', 'p95', 'queries')
+
+
+class Command(BaseCommand):
+    help = (
+        'Seed departments, job roles, a manager tree and weeks of attendance '
+        '(late arrivals, split shifts, missing check-outs) inside a rolled-back transaction, drive the API routes '
+        'in-process and report latency percentiles, query counts and throughput, '
+        'compared with a stored baseline.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--employees', type=int, default=2000, help='Employees to seed')
+        parser.add_argument('--days', type=int, default=90, help='Days of attendance history to seed')
+        parser.add_argument('--span', type=int, default=8, help='Direct reports per manager')
+        parser.add_argument('--requests', type=int, default=100, help='Timed requests per scenario')
+        parser.add_argument('--signin-requests', type=int, default=10,
+                            help='Timed requests for signin, which is dominated by password hashing')
+        parser.add_argument('--warmup', type=int, default=5, help='Untimed requests per scenario first')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed')
+        parser.add_argument('--scenario', action='append', dest='scenarios', choices=sorted(SCENARIOS),
+                            help='Scenario to run (repeatable); defaults to all')
+        parser.add_argument('--baseline', type=Path, default=DEFAULT_BASELINE, help='Baseline JSON file')
+        parser.add_argument('--save-baseline', action='store_true', help='Write the results as the new baseline')
+        parser.add_argument('--threshold', type=float, default=0.25,
+                            help='Relative p50/p95 increase reported as a regression')
+        parser.add_argument('--fail-on-regression', action='store_true', help='Exit with an error on regressions')
+
+    def handle(self, *args, **options):
+        names = options['scenarios'] or list(SCENARIOS)
+        rng = random.Random(options['seed'])
+
+        # The test client's host name is not in ALLOWED_HOSTS outside the test runner
+        with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']), transaction.atomic():
+            started = time.perf_counter()
+            fixtures = self.seed(options, rng)
+            self.stdout.write(
+                f"Seeded {options['employees']} employees and {fixtures['sessions']} sessions "
+                f"in {time.perf_counter() - started:.1f}s"
+            )
+            client = Client(HTTP_AUTHORIZATION=f"Bearer {fixtures['token']}")
+            results = {}
+            for name in names:
+                requests = options['signin_requests'] if name == 'signin' else options['requests']
+                results[name] = self.measure(client, SCENARIOS[name], fixtures, requests, options['warmup'])
+            transaction.set_rollback(True)
+
+        self.report(results)
+        run = {
+            'created': timezone.now().isoformat(timespec='seconds'),
+            'options': {key: options[key] for key in ('employees', 'days', 'span', 'requests', 'seed')},
+            'environment': {
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'database': connection.vendor,
+                'machine': platform.machine(),
+            },
+            'results': results,
+        }
+        regressions = self.compare(run, options['baseline'], options['threshold'])
+        if options['save_baseline']:
+            options['baseline'].parent.mkdir(parents=True, exist_ok=True)
+            options['baseline'].write_text(json.dumps(run, indent=2, sort_keys=True) + '\n')
+            self.stdout.write(f"Saved the baseline to {options['baseline']}")
+        if regressions and options['fail_on_regression']:
+            raise CommandError(f"Regressions in: {', '.join(sorted(regressions))}")
+        self.stdout.write(self.style.SUCCESS('Done; seeded rows were rolled back.'))
+
+    def seed(self, options, rng):
+        tag = uuid.uuid4().hex[:8]
+        today = timezone.localdate()
+        roles = seed_roles(departments=8, roles_per_department=5, tag=tag)
+        employees = seed_employees(options['employees'], roles, tag=tag, rng=rng, span=options['span'])
+        # Weekdays only, then a full day today so /today/ has the same sessions whatever the day and time
+        people = [(employee.pk, employee.expected_hours) for employee in employees]
+        sessions, _ = seed_sessions(people, today - timedelta(days=options['days']), today - timedelta(days=1), rng=rng)
+        end_of_today = timezone.make_aware(datetime.combine(today, datetime.max.time()))
+        today_sessions, _ = seed_sessions(people, today, today, rng=rng, weekends=True, now=end_of_today)
+
+        root = employees[0]
+        root.user.set_password(PASSWORD)
+        root.user.save(update_fields=['password'])
+        return {
+            'sessions': sessions + today_sessions,
+            'email': root.user.email,
+            'token': str(EmployeeRefreshToken.for_user(root.user).access_token),
+            'manager': root.pk,
+            'window': {'start_date': (today - timedelta(days=29)).isoformat(), 'end_date': today.isoformat()},
+        }
+
+    @staticmethod
+    def measure(client, scenario, fixtures, requests, warmup):
+        method, url_name, args, params = scenario
+        url = reverse(url_name, args=args(fixtures) if args else None)
+        data = params(fixtures) if params else {}
+        if method == 'POST':
+            def send():
+                return client.post(url, data, content_type='application/json')
+        else:
+            def send():
+                return client.get(url, data)
+
+        for _ in range(warmup):
+            send()
+        latencies, queries, sizes, errors = [], [], [], 0
+        started = time.perf_counter()
+        for _ in range(requests):
+            with CaptureQueriesContext(connection) as captured:
+                request_started = time.perf_counter()
+                response = send()
+                latencies.append((time.perf_counter() - request_started) * 1000)
+            queries.append(len(captured))
+            sizes.append(len(response.content))
+            errors += response.status_code >= 400
+        duration = time.perf_counter() - started
+
+        cuts = statistics.quantiles(latencies, n=100, method='inclusive') if len(latencies) > 1 else latencies * 99
+        return {
+            'requests': requests,
+            'p50': round(cuts[49], 3),
+            'p95': round(cuts[94], 3),
+            'p99': round(cuts[98], 3),
+            'mean': round(statistics.fmean(latencies), 3),
+            'rps': round(requests / duration, 1) if duration else 0.0,
+            'queries': statistics.median_high(queries),
+            'bytes': round(statistics.fmean(sizes)),
+            'errors': errors,
+        }
+
+    def report(self, results):
+        self.stdout.write(
+            f'{"scenario":17} {"p50 ms":>8} {"p95 ms":>8} {"p99 ms":>8} {"req/s":>8} '
+            f'{"queries":>8} {"bytes":>8} {"errors":>7}'
+        )
+        for name, result in results.items():
+            self.stdout.write(
+                f'{name:17} {result["p50"]:8.2f} {result["p95"]:8.2f} {result["p99"]:8.2f} {result["rps"]:8.1f} '
+                f'{result["queries"]:8d} {result["bytes"]:8d} {result["errors"]:7d}'
+            )
+
+    def compare(self, run, path, threshold):
+        """Print the change against the baseline at ``path``; returns the regressed scenarios"""
+        if not path.exists():
+            self.stdout.write(f'No baseline at {path}; run with --save-baseline to create one')
+            return set()
+        baseline = json.loads(path.read_text())
+        if baseline.get('options') != run['options'] or baseline.get('environment') != run['environment']:
+            self.stdout.write(self.style.WARNING(
+                'The baseline was recorded with different options or on a different environment; '
+                'latencies may not be comparable'
+            ))
+
+        self.stdout.write('')
+        self.stdout.write(f"Against the baseline from {baseline.get('created', '?')}:")
+        regressions = set()
+        for name, result in run['results'].items():
+            before = baseline.get('results', {}).get(name)
+            if before is None:
+                self.stdout.write(f'{name:17} (not in the baseline)')
+                continue
+            changes, regressed = [], False
+            for metric in COMPARED:
+                old, new = before[metric], result[metric]
+                if metric == 'queries':
+                    changes.append(f'queries {old} -> {new}')
+                    regressed |= new > old
+                else:
+                    change = (new - old) / old if old else 0.0
+                    changes.append(f'{metric} {change:+.0%}')
+                    regressed |= change > threshold
+            line = f"{name:17} {'  '.join(changes)}"
+            if regressed:
+                regressions.add(name)
+                line = self.style.ERROR(f'{line}  REGRESSION')
+            self.stdout.write(line)
+        return regressions
@@ -0,0 +1,80 @@
+import io
+import random
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from attendance.models import Attendance
+from attendance.seeding import seed_roles, seed_employees, seed_attendance
+from attendance.serializers import AttendanceListSerializer
+from backend.renderers import ORJSONParser, ORJSONRenderer, orjson
+from employees.models import Employee
+from employees.serializers import EmployeeListSerializer
+
+
+class Command(BaseCommand):
+    help = (
+        'Seed attendance and employees inside a rolled-back transaction and time '
+        "DRF's JSONRenderer/JSONParser against the orjson-backed pair on "
+        'AttendanceListSerializer and EmployeeListSerializer output.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=10_000, help='Attendance rows to render')
+        parser.add_argument('--employees', type=int, default=2000, help='Employees to render')
+        parser.add_argument('--repeat', type=int, default=5, help='Timed runs per case (best is reported)')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed')
+
+    def handle(self, *args, **options):
+        if orjson is None:
+            raise CommandError('orjson is not installed; the fast renderer would fall back to DRF')
+
+        rng = random.Random(options['seed'])
+        with transaction.atomic():
+            roles = seed_roles()
+            employees = seed_employees(options['employees'], roles, rng=rng)
+            seed_attendance([employee.pk for employee in employees], options['rows'], rng=rng)
+
+            payloads = {
+                'AttendanceListSerializer': (
+                    AttendanceListSerializer,
+                    list(Attendance.objects.for_listing()[:options['rows']]),
+                ),
+                'EmployeeListSerializer': (
+                    EmployeeListSerializer,
+                    list(Employee.objects.select_related('user', 'role__department')[:options['employees']]),
+                ),
+            }
+            transaction.set_rollback(True)
+
+        repeat = options['repeat']
+        self.stdout.write(f'{"payload":26} {"rows":>6} {"step":8} {"drf ms":>9} {"orjson ms":>10} {"speedup":>8}')
+        for name, (serializer_class, rows) in payloads.items():
+            serialize_ms, data = self.best(repeat, lambda: serializer_class(rows, many=True).data)
+            drf_render_ms, drf_body = self.best(repeat, lambda: JSONRenderer().render(data))
+            fast_render_ms, fast_body = self.best(repeat, lambda: ORJSONRenderer().render(data))
+            if fast_body != drf_body:
+                raise CommandError(f'{name}: orjson output differs from JSONRenderer output')
+            drf_parse_ms, _ = self.best(repeat, lambda: JSONParser().parse(io.BytesIO(drf_body)))
+            fast_parse_ms, _ = self.best(repeat, lambda: ORJSONParser().parse(io.BytesIO(drf_body)))
+
+            self.stdout.write(f'{name:26} {len(rows):6d} {"serialize":8} {serialize_ms:9.1f}')
+            for step, drf_ms, fast_ms in (('render', drf_render_ms, fast_render_ms),
+                                          ('parse', drf_parse_ms, fast_parse_ms)):
+                self.stdout.write(
+                    f'{name:26} {len(rows):6d} {step:8} {drf_ms:9.1f} {fast_ms:10.1f} {drf_ms / fast_ms:7.1f}x'
+                )
+            self.stdout.write(f'{"":26} {"":6} {"bytes":8} {len(drf_body):9d}')
+        self.stdout.write(self.style.SUCCESS('Done; rendered output was identical and seeded rows were rolled back.'))
+
+    @staticmethod
+    def best(repeat, func):
+        timings, result = [], None
+        for _ in range(repeat):
+            started = time.perf_counter()
+            result = func()
+            timings.append((time.perf_counter() - started) * 1000)
+        return min(timings), result
@@ -0,0 +1,72 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from attendance.models import Attendance
+from attendance.seeding import seed_roles, seed_employees, seed_attendance
+from attendance.serializers import AttendanceListSerializer, AttendanceListValuesSerializer
+from employees.models import Employee
+from employees.serializers import EmployeeListSerializer, EmployeeListValuesSerializer
+
+
+class Command(BaseCommand):
+    help = (
+        'Seed attendance and employees inside a rolled-back transaction and compare '
+        'the per-row cost of the list ModelSerializers against the .values()-based '
+        'lean serializers (fetch + serialize), checking the output is identical.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=10_000, help='Rows per listing')
+        parser.add_argument('--repeat', type=int, default=5, help='Timed runs per case (best is reported)')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed')
+
+    def handle(self, *args, **options):
+        rows, repeat = options['rows'], options['repeat']
+        rng = random.Random(options['seed'])
+        self.stdout.write(f'{"listing":11} {"serializer":32} {"rows":>6} {"fetch ms":>9} {"serialize ms":>13} {"us/row":>8}')
+        with transaction.atomic():
+            roles = seed_roles()
+            employees = seed_employees(rows, roles, rng=rng)
+            seed_attendance([employee.pk for employee in employees], rows, rng=rng)
+
+            cases = {
+                'attendance': (
+                    Attendance.objects.order_by('-date', '-created_at', 'attendance_id')[:rows],
+                    (AttendanceListSerializer, lambda qs: qs.for_listing()),
+                    (AttendanceListValuesSerializer, AttendanceListValuesSerializer.project),
+                ),
+                'employees': (
+                    Employee.objects.order_by('-date_joined', 'id')[:rows],
+                    # As served before the lean path: no select_related on the list view
+                    (EmployeeListSerializer, lambda qs: qs.select_related('user', 'role__department')),
+                    (EmployeeListValuesSerializer, EmployeeListValuesSerializer.project),
+                ),
+            }
+            for listing, (queryset, *variants) in cases.items():
+                outputs = []
+                for serializer_class, prepare in variants:
+                    fetch_ms, page = self.best(repeat, lambda: list(prepare(queryset.all())))
+                    serialize_ms, data = self.best(repeat, lambda: serializer_class(page, many=True).data)
+                    outputs.append([dict(row) for row in data])
+                    per_row = (fetch_ms + serialize_ms) * 1000 / max(len(page), 1)
+                    self.stdout.write(
+                        f'{listing:11} {serializer_class.__name__:32} {len(page):6d} '
+                        f'{fetch_ms:9.1f} {serialize_ms:13.1f} {per_row:8.1f}'
+                    )
+                if outputs[0] != outputs[1]:
+                    raise CommandError(f'{listing}: lean serializer output differs from the ModelSerializer')
+
+            transaction.set_rollback(True)
+        self.stdout.write(self.style.SUCCESS('Done; outputs were identical and seeded rows were rolled back.'))
+
+    @staticmethod
+    def best(repeat, func):
+        timings, result = [], None
+        for _ in range(repeat):
+            started = time.perf_counter()
+            result = func()
+            timings.append((time.perf_counter() - started) * 1000)
+        return min(timings), result
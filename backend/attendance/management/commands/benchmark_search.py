@@ -0,0 +1,52 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from attendance.seeding import seed_roles, seed_employees
+from employees.search import has_index, scan_employee_ids, search_employee_ids
+
+
+class Command(BaseCommand):
+    help = (
+        'Seed employees inside a rolled-back transaction and time typeahead queries '
+        'through the full-text search index against icontains scans.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--employees', type=int, default=100_000, help='Employees to seed')
+        parser.add_argument('--repeat', type=int, default=5, help='Timed runs per query (best is reported)')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed')
+        parser.add_argument('--query', action='append', dest='queries',
+                            help='Query to time (repeatable); defaults to a few typeahead prefixes')
+
+    def handle(self, *args, **options):
+        if not has_index():
+            raise CommandError('This database has no employee search index')
+        rng = random.Random(options['seed'])
+        queries = options['queries'] or ['s', 'seed 123', 'seed 4567', 'role 2', 'department 3', 'nobody']
+        repeat = options['repeat']
+
+        with transaction.atomic():
+            started = time.perf_counter()
+            seed_employees(options['employees'], seed_roles(), rng=rng)
+            self.stdout.write(f"Seeded and indexed {options['employees']} employees in {time.perf_counter() - started:.1f}s")
+
+            self.stdout.write(f'{"query":16} {"hits":>5} {"index ms":>9} {"icontains ms":>13}')
+            for query in queries:
+                index_ms, ids = self.best(repeat, lambda: search_employee_ids(query))
+                scan_ms, _ = self.best(repeat, lambda: scan_employee_ids(query))
+                self.stdout.write(f'{query:16} {len(ids):5d} {index_ms:9.2f} {scan_ms:13.2f}')
+
+            transaction.set_rollback(True)
+        self.stdout.write(self.style.SUCCESS('Done; seeded rows were rolled back.'))
+
+    @staticmethod
+    def best(repeat, func):
+        timings, result = [], None
+        for _ in range(repeat):
+            started = time.perf_counter()
+            result = func()
+            timings.append((time.perf_counter() - started) * 1000)
+        return min(timings), result
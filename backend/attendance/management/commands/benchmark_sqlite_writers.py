@@ -0,0 +1,170 @@
+import logging
+import random
+import statistics
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from attendance.seeding import seed_employees, seed_roles
+from authentication.tokens import EmployeeRefreshToken
+from backend.database import SQLITE_MODES, sqlite_database
+
+
+class Command(BaseCommand):
+    help = (
+        'Drive concurrent kiosk check-ins and check-outs, and /today/ reads, against a scratch '
+        'SQLite database in each SQLite mode (see backend/database.py) and compare lock errors '
+        'and latency.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--mode', action='append', dest='modes', choices=SQLITE_MODES,
+                            help='SQLite mode to benchmark (repeatable); defaults to all')
+        parser.add_argument('--employees', type=int, default=400, help='Employees who check in and out')
+        parser.add_argument('--writers', type=int, default=8, help='Threads posting kiosk scans')
+        parser.add_argument('--readers', type=int, default=4, help='Threads reading /today/ meanwhile')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError('The default database is not SQLite')
+        if options['writers'] < 1 or options['employees'] < options['writers']:
+            raise CommandError('--writers must be positive and at most --employees')
+
+        results = {}
+        # The test client's host name is not in ALLOWED_HOSTS outside the test runner
+        with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+            for mode in options['modes'] or SQLITE_MODES:
+                with self.scratch_database(mode):
+                    results[mode] = self.run(options)
+                self.stdout.write(f'{mode}: {results[mode]["writes"]} writes, {results[mode]["errors"]} errors')
+
+        self.stdout.write('')
+        self.stdout.write(
+            f'{options["employees"]} employees checking in and out through {options["writers"]} writer '
+            f'threads, {options["readers"]} reader threads'
+        )
+        self.stdout.write(
+            f'{"mode":8} {"writes/s":>9} {"errors":>7} {"p50 ms":>8} {"p95 ms":>8} {"p99 ms":>8} '
+            f'{"max ms":>8} {"reads/s":>8} {"read p95":>9} {"read err":>9}'
+        )
+        for mode, result in results.items():
+            self.stdout.write(
+                f'{mode:8} {result["wps"]:9.1f} {result["errors"]:7d} {result["p50"]:8.1f} {result["p95"]:8.1f} '
+                f'{result["p99"]:8.1f} {result["max"]:8.1f} {result["rps"]:8.1f} {result["read_p95"]:9.1f} '
+                f'{result["read_errors"]:9d}'
+            )
+
+    @contextmanager
+    def scratch_database(self, mode):
+        """
+        Point the default connection at a new, migrated database file with the
+        settings of ``mode``, the way the test runner switches to the test
+        database; the original settings are restored afterwards.
+        """
+        settings_dict = connection.settings_dict
+        original = dict(settings_dict)
+        with tempfile.TemporaryDirectory() as directory:
+            connections.close_all()
+            settings_dict.update({'OPTIONS': {}, 'CONN_MAX_AGE': 0})
+            settings_dict.update(sqlite_database(str(Path(directory) / 'benchmark.sqlite3'), mode))
+            try:
+                call_command('migrate', verbosity=0, interactive=False)
+                yield
+            finally:
+                connections.close_all()
+                settings_dict.clear()
+                settings_dict.update(original)
+
+    def run(self, options):
+        rng = random.Random(options['seed'])
+        roles = seed_roles(departments=4, roles_per_department=3)
+        employees = seed_employees(options['employees'], roles, rng=rng)
+        token = str(EmployeeRefreshToken.for_user(employees[0].user).access_token)
+        ids = [employee.pk for employee in employees]
+        rng.shuffle(ids)
+        connections.close_all()
+
+        scans_url = reverse('attendance:kiosk-scans')
+        today_url = reverse('attendance:today-attendance')
+        barrier = threading.Barrier(options['writers'] + options['readers'])
+        writing = threading.Event()
+        writing.set()
+
+        def client():
+            # Lock errors surface as 500s instead of exceptions
+            return Client(HTTP_AUTHORIZATION=f'Bearer {token}', raise_request_exception=False)
+
+        def write(index):
+            api = client()
+            latencies, errors = [], 0
+            try:
+                barrier.wait()
+                for action in ('check_in', 'check_out'):
+                    for employee_id in ids[index::options['writers']]:
+                        started = time.perf_counter()
+                        response = api.post(
+                            scans_url, {'scans': [{'employee': employee_id, 'action': action}]},
+                            content_type='application/json',
+                        )
+                        latencies.append((time.perf_counter() - started) * 1000)
+                        errors += response.status_code != 200 or response.json()['failed'] > 0
+            finally:
+                connections.close_all()
+            return latencies, errors
+
+        def read(_):
+            api = client()
+            latencies, errors = [], 0
+            try:
+                barrier.wait()
+                while writing.is_set():
+                    started = time.perf_counter()
+                    response = api.get(today_url)
+                    latencies.append((time.perf_counter() - started) * 1000)
+                    errors += response.status_code != 200
+            finally:
+                connections.close_all()
+            return latencies, errors
+
+        # Lock errors are counted, not logged with a traceback each
+        request_logger = logging.getLogger('django.request')
+        level = request_logger.level
+        request_logger.setLevel(logging.CRITICAL)
+        try:
+            with ThreadPoolExecutor(max_workers=options['writers'] + options['readers']) as pool:
+                readers = [pool.submit(read, index) for index in range(options['readers'])]
+                started = time.perf_counter()
+                writers = list(pool.map(write, range(options['writers'])))
+                duration = time.perf_counter() - started
+                writing.clear()
+                readers = [future.result() for future in readers]
+        finally:
+            request_logger.setLevel(level)
+
+        write_latencies = [latency for latencies, _ in writers for latency in latencies]
+        read_latencies = [latency for latencies, _ in readers for latency in latencies]
+        write_cuts = statistics.quantiles(write_latencies, n=100, method='inclusive')
+        read_cuts = statistics.quantiles(read_latencies, n=100, method='inclusive') if len(read_latencies) > 1 else [0.0] * 99
+        return {
+            'writes': len(write_latencies),
+            'errors': sum(errors for _, errors in writers),
+            'wps': len(write_latencies) / duration,
+            'p50': write_cuts[49],
+            'p95': write_cuts[94],
+            'p99': write_cuts[98],
+            'max': max(write_latencies),
+            'rps': len(read_latencies) / duration,
+            'read_p95': read_cuts[94],
+            'read_errors': sum(errors for _, errors in readers),
+        }
@@ -0,0 +1,79 @@
+import random
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.utils import timezone
+
+from attendance.models import Attendance
+from attendance.seeding import seed_roles, seed_employees, seed_attendance
+
+
+class Command(BaseCommand):
+    help = (
+        'Seed a large attendance table inside a rolled-back transaction and print '
+        'EXPLAIN plans and timings for the API query patterns with and without '
+        'the composite attendance indexes.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1_000_000, help='Attendance rows to seed')
+        parser.add_argument('--employees', type=int, default=2000, help='Employees to spread rows across')
+        parser.add_argument('--repeat', type=int, default=5, help='Timed executions per query')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed')
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        with transaction.atomic():
+            self.stdout.write(f"Seeding {options['rows']:,} attendance rows...")
+            roles = seed_roles()
+            employees = seed_employees(options['employees'], roles, rng=rng)
+            employee_ids = [employee.pk for employee in employees]
+            seed_attendance(employee_ids, options['rows'], rng=rng)
+            with connection.cursor() as cursor:
+                cursor.execute('ANALYZE')
+
+            queries = self.query_patterns(employee_ids, rng)
+            indexes = Attendance._meta.indexes
+
+            # Index DDL is run as plain statements so it stays inside the transaction
+            self.run_sql([f'DROP INDEX {connection.ops.quote_name(index.name)}' for index in indexes])
+            self.report('Without composite indexes', queries, options['repeat'])
+
+            editor = connection.schema_editor(collect_sql=True)
+            self.run_sql([index.create_sql(Attendance, editor) for index in indexes] + ['ANALYZE'])
+            self.report('With composite indexes', queries, options['repeat'])
+
+            transaction.set_rollback(True)
+        self.stdout.write(self.style.SUCCESS('Done; seeded rows were rolled back.'))
+
+    def run_sql(self, statements):
+        with connection.cursor() as cursor:
+            for statement in statements:
+                cursor.execute(str(statement))
+
+    def query_patterns(self, employee_ids, rng):
+        today = timezone.now().date()
+        employee_id = rng.choice(employee_ids)
+        listing = Attendance.objects.for_listing()
+        return {
+            'today': listing.filter(date=today)[:100],
+            'date range (30 days)': listing.filter(date__range=[today - timedelta(days=30), today])[:100],
+            'employee history': listing.filter(employee_id=employee_id)[:100],
+            'employee on date': Attendance.objects.filter(employee_id=employee_id, date=today),
+            'open session': Attendance.objects.filter(
+                employee_id=employee_id, date=today, check_out_time__isnull=True
+            ),
+        }
+
+    def report(self, title, queries, repeat):
+        self.stdout.write(self.style.MIGRATE_HEADING(f'\n== {title} =='))
+        for name, queryset in queries.items():
+            timings = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                list(queryset.all())
+                timings.append((time.perf_counter() - started) * 1000)
+            self.stdout.write(self.style.MIGRATE_LABEL(f'{name}: best {min(timings):.2f} ms'))
+            self.stdout.write(queryset.explain())
@@ -0,0 +1,160 @@
+import http.client
+import itertools
+import shlex
+import shutil
+import statistics
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import timedelta
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from authentication.tokens import EmployeeRefreshToken
+
+SERVERS = {
+    # name -> (default command template, URL prefix of the views it serves)
+    'wsgi': ('gunicorn backend.wsgi:application --workers {workers} --bind 127.0.0.1:{port}', '/api'),
+    'asgi': (
+        'uvicorn backend.asgi:application --workers {workers} --host 127.0.0.1 --port {port} --log-level warning',
+        '/api/async',
+    ),
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Start the API under a WSGI server (sync DRF views) and an ASGI server '
+        '(async views) with the same worker count, drive concurrent read '
+        'requests at each and compare throughput and latency.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=2, help='Worker processes per server')
+        parser.add_argument('--concurrency', type=int, default=50, help='Concurrent client connections')
+        parser.add_argument('--requests', type=int, default=1000, help='Requests per endpoint')
+        parser.add_argument('--port', type=int, default=8765, help='Port the servers listen on')
+        parser.add_argument('--email', help='User whose token is used (default: first active user)')
+        parser.add_argument('--days', type=int, default=30, help='Date-range and report window in days')
+        parser.add_argument('--wsgi-server', default=SERVERS['wsgi'][0],
+                            help='WSGI server command; {workers} and {port} are substituted')
+        parser.add_argument('--asgi-server', default=SERVERS['asgi'][0],
+                            help='ASGI server command; {workers} and {port} are substituted')
+
+    def handle(self, *args, **options):
+        token = self.get_token(options['email'])
+        end = timezone.localdate()
+        window = {'start_date': (end - timedelta(days=options['days'])).isoformat(), 'end_date': end.isoformat()}
+        endpoints = [
+            ('today', '/attendance/today/', {}),
+            ('date-range', '/attendance/date-range/', window),
+            ('timesheet', '/attendance/reports/timesheet/', dict(window, group_by='department', bucket='week')),
+            ('employees', '/employees/employees/', {}),
+        ]
+
+        results = []
+        for name in ('wsgi', 'asgi'):
+            command = options[f'{name}_server'].format(workers=options['workers'], port=options['port'])
+            prefix = SERVERS[name][1]
+            with self.serve(command, options['port'], f'{prefix}/attendance/today/', token):
+                for label, path, params in endpoints:
+                    url = f'{prefix}{path}' + (f'?{urlencode(params)}' if params else '')
+                    stats = self.load(options['port'], url, token, options['concurrency'], options['requests'])
+                    results.append((name, label, stats))
+                    self.stdout.write(f'{name:5} {label:11} {stats["rps"]:9.1f} req/s')
+
+        self.stdout.write('')
+        self.stdout.write(f'{options["workers"]} workers, {options["concurrency"]} concurrent clients, '
+                          f'{options["requests"]} requests per endpoint')
+        self.stdout.write(f'{"server":6} {"endpoint":11} {"req/s":>9} {"p50 ms":>8} {"p95 ms":>8} {"p99 ms":>8} {"errors":>7}')
+        for name, label, stats in results:
+            self.stdout.write(
+                f'{name:6} {label:11} {stats["rps"]:9.1f} {stats["p50"]:8.1f} '
+                f'{stats["p95"]:8.1f} {stats["p99"]:8.1f} {stats["errors"]:7d}'
+            )
+
+    def get_token(self, email):
+        users = get_user_model().objects.filter(is_active=True)
+        user = users.filter(email=email).first() if email else users.order_by('pk').first()
+        if user is None:
+            raise CommandError('No active user to authenticate as; create or seed one first')
+        return str(EmployeeRefreshToken.for_user(user).access_token)
+
+    @contextmanager
+    def serve(self, command, port, probe_path, token):
+        argv = shlex.split(command)
+        if shutil.which(argv[0]) is None:
+            raise CommandError(f'{argv[0]} is not installed; install it or pass a different server command')
+        process = subprocess.Popen(argv, cwd=settings.BASE_DIR)
+        try:
+            self.wait_until_ready(port, probe_path, token, process)
+            yield process
+        finally:
+            process.terminate()
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+    def wait_until_ready(self, port, path, token, process, timeout=30):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                raise CommandError(f'Server exited with status {process.returncode}')
+            try:
+                status, _ = self.request(http.client.HTTPConnection('127.0.0.1', port, timeout=5), path, token)
+                if status == 200:
+                    return
+            except OSError:
+                pass
+            time.sleep(0.2)
+        raise CommandError(f'Server did not answer on port {port} within {timeout}s')
+
+    @staticmethod
+    def request(connection, path, token):
+        connection.request('GET', path, headers={'Authorization': f'Bearer {token}'})
+        response = connection.getresponse()
+        response.read()
+        return response.status, response
+
+    def load(self, port, url, token, concurrency, total):
+        counter = itertools.count()
+        latencies, errors = [], [0]
+        lock = threading.Lock()
+
+        def client():
+            connection = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+            while next(counter) < total:
+                started = time.perf_counter()
+                try:
+                    status, _ = self.request(connection, url, token)
+                    ok = status == 200
+                except (OSError, http.client.HTTPException):
+                    connection.close()
+                    ok = False
+                elapsed = (time.perf_counter() - started) * 1000
+                with lock:
+                    latencies.append(elapsed)
+                    errors[0] += not ok
+            connection.close()
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            for _ in range(concurrency):
+                pool.submit(client)
+        duration = time.perf_counter() - started
+
+        cuts = statistics.quantiles(latencies, n=100, method='inclusive') if len(latencies) > 1 else latencies * 99
+        return {
+            'rps': len(latencies) / duration if duration else 0.0,
+            'p50': cuts[49],
+            'p95': cuts[94],
+            'p99': cuts[98],
+            'errors': errors[0],
+        }
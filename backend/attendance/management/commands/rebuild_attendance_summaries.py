@@ -0,0 +1,40 @@
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Max, Min
+
+from attendance.models import Attendance
+from attendance.summaries import rebuild_daily_summaries
+
+
+class Command(BaseCommand):
+    help = 'Rebuild DailyAttendanceSummary rows from raw attendance sessions for a date range.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start-date', help='First day to rebuild (YYYY-MM-DD); defaults to the earliest session')
+        parser.add_argument('--end-date', help='Last day to rebuild (YYYY-MM-DD); defaults to the latest session')
+        parser.add_argument('--employee', type=int, action='append', dest='employees',
+                            help='Restrict to an employee id (repeatable)')
+
+    def handle(self, *args, **options):
+        bounds = Attendance.objects.aggregate(first=Min('date'), last=Max('date'))
+        try:
+            start_date = self.parse(options['start_date']) or bounds['first']
+            end_date = self.parse(options['end_date']) or bounds['last']
+        except ValueError:
+            raise CommandError('Use YYYY-MM-DD format for dates')
+
+        if start_date is None or end_date is None:
+            self.stdout.write('No attendance sessions to summarise.')
+            return
+        if start_date > end_date:
+            raise CommandError('Start date cannot be after end date')
+
+        written = rebuild_daily_summaries(start_date, end_date, employee_ids=options['employees'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Rebuilt {written} daily summaries between {start_date} and {end_date}.'
+        ))
+
+    @staticmethod
+    def parse(value):
+        return datetime.strptime(value, '%Y-%m-%d').date() if value else None
@@ -0,0 +1,24 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attendance', '0003_remove_unique_constraint'),
+        ('employees', '0002_employee_expected_hours'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='attendance',
+            index=models.Index(fields=['-date', '-created_at'], name='attendance_date_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='attendance',
+            index=models.Index(fields=['employee', '-date', '-created_at'], name='attendance_emp_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='attendance',
+            index=models.Index(condition=models.Q(('check_out_time__isnull', True)), fields=['employee', 'date'], name='attendance_open_session_idx'),
+        ),
+    ]
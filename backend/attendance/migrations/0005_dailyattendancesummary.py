@@ -0,0 +1,34 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attendance', '0004_attendance_indexes'),
+        ('employees', '0002_employee_expected_hours'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyAttendanceSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('worked_seconds', models.PositiveIntegerField(default=0)),
+                ('first_check_in', models.DateTimeField(blank=True, null=True)),
+                ('last_check_out', models.DateTimeField(blank=True, null=True)),
+                ('session_count', models.PositiveIntegerField(default=0)),
+                ('open_session_count', models.PositiveIntegerField(default=0)),
+                ('expected_seconds', models.PositiveIntegerField(default=0)),
+                ('shortfall_seconds', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('employee', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_summaries', to='employees.employee')),
+            ],
+            options={
+                'ordering': ['-date', 'employee_id'],
+                'indexes': [models.Index(fields=['-date'], name='attendance_summary_date_idx')],
+                'constraints': [models.UniqueConstraint(fields=('employee', 'date'), name='attendance_summary_employee_date_uniq')],
+            },
+        ),
+    ]
@@ -1,7 +1,50 @@
 from django.db import models
+from django.db.models import ExpressionWrapper, F, DurationField
 from django.conf import settings
 
 
+# check_out_time - check_in_time as an interval; NULL while a session is open
+WORKED_DURATION = ExpressionWrapper(F('check_out_time') - F('check_in_time'), output_field=DurationField())
+
+
+class AttendanceQuerySet(models.QuerySet):
+    # Columns read by the list/detail serializers, including the FK columns
+    # needed to walk employee -> user / role -> department without extra queries
+    LIST_FIELDS = (
+        'attendance_id', 'employee_id', 'date', 'status',
+        'check_in_time', 'check_out_time', 'created_at', 'updated_at',
+        'employee__id', 'employee__first_name', 'employee__last_name',
+        'employee__user', 'employee__user__email',
+        'employee__role', 'employee__role__department',
+        'employee__role__department__name',
+    )
+
+    def with_employee(self):
+        """Join the employee, user, role and department rows in a single query"""
+        return self.select_related('employee__user', 'employee__role__department')
+
+    def for_listing(self):
+        """Joined and projected queryset used by every attendance read endpoint"""
+        return self.with_employee().only(*self.LIST_FIELDS)
+
+    def record_check_in(self, when):
+        """
+        Atomically set ``check_in_time`` on rows that have none yet, touching only
+        that column and ``updated_at``. Returns the number of rows claimed.
+        """
+        return self.filter(check_in_time__isnull=True).update(check_in_time=when, updated_at=when)
+
+    def record_check_out(self, when):
+        """Atomically close rows that are checked in but not out; returns the rows claimed"""
+        return self.filter(check_in_time__isnull=False, check_out_time__isnull=True).update(
+            check_out_time=when, updated_at=when
+        )
+
+    def with_duration(self):
+        """Annotate each session's worked time (NULL until checked out), computed in SQL"""
+        return self.annotate(duration=WORKED_DURATION)
+
+
 class Attendance(models.Model):
     attendance_id = models.AutoField(primary_key=True)
     employee = models.ForeignKey('employees.Employee', on_delete=models.CASCADE, related_name='attendances')
@@ -14,8 +57,24 @@ class Attendance(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = AttendanceQuerySet.as_manager()
+
     class Meta:
         ordering = ['-date', '-created_at']
+        indexes = [
+            # Day / date-range listings in the default ordering
+            models.Index(fields=['-date', '-created_at'], name='attendance_date_created_idx'),
+            # Per-employee history and (employee, date) session lookups
+            models.Index(fields=['employee', '-date', '-created_at'], name='attendance_emp_date_idx'),
+            # Open sessions awaiting check-out
+            models.Index(
+                fields=['employee', 'date'],
+                condition=models.Q(check_out_time__isnull=True),
+                name='attendance_open_session_idx',
+            ),
+            # Incremental sync: rows changed after a (updated_at, pk) watermark
+            models.Index(fields=['updated_at', 'attendance_id'], name='attendance_updated_idx'),
+        ]
         # Removed unique constraint to allow multiple sessions per day
         # unique_together = ['employee', 'date']  # One attendance record per employee per day
 
@@ -53,3 +112,48 @@ class Attendance(models.Model):
             return 'N/A'
         except Exception:
             return 'N/A'
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the loaded employee/date so moved sessions refresh both summaries
+        instance._loaded_summary_key = (
+            instance.__dict__.get('employee_id'), instance.__dict__.get('date')
+        )
+        return instance
+
+
+class DailyAttendanceSummary(models.Model):
+    """One row per employee-day rolled up from that day's attendance sessions"""
+    employee = models.ForeignKey('employees.Employee', on_delete=models.CASCADE, related_name='daily_summaries')
+    date = models.DateField()
+    worked_seconds = models.PositiveIntegerField(default=0)
+    first_check_in = models.DateTimeField(null=True, blank=True)
+    last_check_out = models.DateTimeField(null=True, blank=True)
+    session_count = models.PositiveIntegerField(default=0)
+    open_session_count = models.PositiveIntegerField(default=0)
+    expected_seconds = models.PositiveIntegerField(default=0)
+    shortfall_seconds = models.PositiveIntegerField(default=0)
+
+    # System fields
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['-date', 'employee_id']
+        constraints = [
+            models.UniqueConstraint(fields=['employee', 'date'], name='attendance_summary_employee_date_uniq'),
+        ]
+        indexes = [
+            models.Index(fields=['-date'], name='attendance_summary_date_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.employee_id} - {self.date} - {self.worked_seconds}s"
+
+    @property
+    def worked_hours(self):
+        return round(self.worked_seconds / 3600, 2)
+
+    @property
+    def shortfall_hours(self):
+        return round(self.shortfall_seconds / 3600, 2)
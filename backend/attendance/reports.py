@@ -0,0 +1,104 @@
+"""
+Set-based attendance reports.
+
+All duration arithmetic happens in the database: sessions are grouped by the
+requested dimension and calendar bucket and only the aggregated totals are
+returned to Python.
+"""
+from django.db.models import Count, DateField, Q, Sum
+from django.db.models.functions import Trunc
+
+from .models import Attendance, WORKED_DURATION
+
+CLOSED_SESSION = Q(check_in_time__isnull=False, check_out_time__isnull=False)
+OPEN_SESSION = Q(check_in_time__isnull=False, check_out_time__isnull=True)
+
+# group_by value -> (output key, queryset path) pairs
+GROUPINGS = {
+    'employee': (
+        ('employee_id', 'employee_id'),
+        ('first_name', 'employee__first_name'),
+        ('last_name', 'employee__last_name'),
+    ),
+    'department': (
+        ('department_id', 'employee__role__department_id'),
+        ('department_name', 'employee__role__department__name'),
+    ),
+    'job_role': (
+        ('job_role_id', 'employee__role_id'),
+        ('job_role_name', 'employee__role__name'),
+    ),
+}
+
+BUCKETS = ('day', 'week', 'month')
+
+
+def timesheet_queryset(start_date, end_date, group_by='employee', bucket='day', employee_ids=None):
+    """Build the grouped aggregate query behind ``timesheet_report``"""
+    if group_by not in GROUPINGS:
+        raise ValueError(f"group_by must be one of: {', '.join(GROUPINGS)}")
+    if bucket not in BUCKETS:
+        raise ValueError(f"bucket must be one of: {', '.join(BUCKETS)}")
+
+    sessions = Attendance.objects.filter(date__range=[start_date, end_date])
+    if employee_ids is not None:
+        sessions = sessions.filter(employee_id__in=employee_ids)
+
+    columns = GROUPINGS[group_by]
+    return (
+        sessions.order_by()
+        .annotate(bucket=Trunc('date', bucket, output_field=DateField()))
+        .values('bucket', *(path for _, path in columns))
+        .annotate(
+            worked=Sum(WORKED_DURATION, filter=CLOSED_SESSION),
+            session_count=Count('attendance_id'),
+            open_session_count=Count('attendance_id', filter=OPEN_SESSION),
+            employee_count=Count('employee_id', distinct=True),
+            day_count=Count('date', distinct=True),
+        )
+        .order_by('bucket', *(path for _, path in columns))
+    )
+
+
+def format_timesheet_row(row, group_by):
+    worked_seconds = int(row['worked'].total_seconds()) if row['worked'] else 0
+    entry = {'bucket': row['bucket']}
+    entry.update((key, row[path]) for key, path in GROUPINGS[group_by])
+    if group_by == 'employee':
+        entry['employee_name'] = f"{entry.pop('first_name')} {entry.pop('last_name')}"
+    entry.update({
+        'worked_seconds': worked_seconds,
+        'worked_hours': round(worked_seconds / 3600, 2),
+        'session_count': row['session_count'],
+        'open_session_count': row['open_session_count'],
+        'employee_count': row['employee_count'],
+        'day_count': row['day_count'],
+    })
+    return entry
+
+
+def timesheet_report(start_date, end_date, group_by='employee', bucket='day', employee_ids=None):
+    """
+    Aggregate worked time between ``start_date`` and ``end_date`` inclusive per
+    ``group_by`` dimension and ``bucket`` (day/week/month starting date).
+    Open sessions are counted but contribute no worked time.
+    """
+    rows = timesheet_queryset(start_date, end_date, group_by, bucket, employee_ids)
+    return [format_timesheet_row(row, group_by) for row in rows]
+
+
+async def atimesheet_report(start_date, end_date, group_by='employee', bucket='day', employee_ids=None):
+    """``timesheet_report`` for async views"""
+    rows = timesheet_queryset(start_date, end_date, group_by, bucket, employee_ids)
+    return [format_timesheet_row(row, group_by) async for row in rows]
+
+
+def timesheet_totals(results):
+    """Grand totals over the rows returned by ``timesheet_report``"""
+    worked_seconds = sum(row['worked_seconds'] for row in results)
+    return {
+        'worked_seconds': worked_seconds,
+        'worked_hours': round(worked_seconds / 3600, 2),
+        'session_count': sum(row['session_count'] for row in results),
+        'open_session_count': sum(row['open_session_count'] for row in results),
+    }
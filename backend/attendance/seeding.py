@@ -0,0 +1,301 @@
+"""
+Synthetic data helpers for benchmarks and load tests.
+
+Everything is inserted in bulk so large volumes can be generated quickly:
+people and org data with ``bulk_create``, attendance sessions and summaries
+with raw ``executemany`` (``SessionWriter``). Users get unusable passwords
+to avoid hashing per row.
+"""
+import random
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.utils import timezone
+
+from employees.hierarchy import add_employees
+from employees.search import add_to_index
+from employees.models import Department, JobRole, Employee
+from .models import Attendance, DailyAttendanceSummary
+from .team import DEFAULT_LATE_GRACE_MINUTES, DEFAULT_WORKDAY_START
+
+User = get_user_model()
+
+BATCH_SIZE = 5000
+
+
+def seed_roles(departments=5, roles_per_department=4, tag=None):
+    """Create departments with job roles and return the roles"""
+    tag = tag or uuid.uuid4().hex[:8]
+    created = Department.objects.bulk_create([
+        Department(name=f'Department {index} {tag}') for index in range(departments)
+    ])
+    return JobRole.objects.bulk_create([
+        JobRole(name=f'Role {index} {department.name}', department=department)
+        for department in created
+        for index in range(roles_per_department)
+    ])
+
+
+def seed_employees(count, roles, tag=None, rng=None, span=None, role_weights=None):
+    """
+    Create ``count`` users with employee profiles spread across ``roles``
+    (evenly, or by ``role_weights``). With ``span``, they form a manager tree
+    below the first employee where each manager has about ``span`` direct
+    reports.
+    """
+    tag = tag or uuid.uuid4().hex[:8]
+    rng = rng or random.Random()
+    employee_roles = rng.choices(roles, weights=role_weights, k=count)
+    users = User.objects.bulk_create([
+        User(
+            email=f'seed-{tag}-{index}@example.com',
+            username=f'seed-{tag}-{index}',
+            first_name='Seed',
+            last_name=str(index),
+            password='!',
+        )
+        for index in range(count)
+    ], batch_size=BATCH_SIZE)
+    employees = Employee.objects.bulk_create([
+        Employee(
+            user=user,
+            first_name=user.first_name,
+            last_name=user.last_name,
+            role=role,
+            expected_hours=rng.choice((6, 8, 8, 8, 9)),
+        )
+        for user, role in zip(users, employee_roles)
+    ], batch_size=BATCH_SIZE)
+    if span:
+        assign_managers(employees, span, rng)
+    add_employees(employees, batch_size=BATCH_SIZE)
+    add_to_index(employee.pk for employee in employees)
+    return employees
+
+
+def assign_managers(employees, span, rng=None):
+    """
+    Point each employee after the first at an earlier one, breadth first, so
+    the tree is about log(n) / log(span) levels deep. Call before
+    ``add_employees``; the closure rows are built from ``manager_id``.
+    """
+    rng = rng or random.Random()
+    for index, employee in enumerate(employees[1:], start=1):
+        # The manager ``span`` positions back in breadth-first order, jittered
+        parent = max((index - 1) // span + rng.randint(-1, 1), 0)
+        employee.manager_id = employees[min(parent, index - 1)].pk
+    Employee.objects.bulk_update(employees[1:], ['manager'], batch_size=BATCH_SIZE)
+
+
+class SessionWriter:
+    """
+    Buffered raw ``executemany`` inserts of attendance sessions and their
+    daily summaries, skipping model instances and per-field conversion; at
+    tens of millions of rows those cost more than the inserts themselves.
+    Callers pass database parameters, e.g. from ``day_params()``.
+    """
+
+    def __init__(self, batch_size=BATCH_SIZE, summaries=True):
+        self.batch_size = batch_size
+        self.summaries = summaries
+        self.sessions, self.rollups = [], []
+        self.session_count = self.summary_count = 0
+        self.session_sql = self.insert_sql(Attendance, [
+            'employee', 'date', 'status', 'check_in_time', 'check_out_time', 'created_at', 'updated_at',
+        ])
+        self.summary_sql = self.insert_sql(DailyAttendanceSummary, [
+            'employee', 'date', 'worked_seconds', 'first_check_in', 'last_check_out', 'session_count',
+            'open_session_count', 'expected_seconds', 'shortfall_seconds', 'updated_at',
+        ])
+        if connection.vendor == 'sqlite' and settings.USE_TZ:
+            # What the backend stores for aware datetimes, without its per-value checks
+            self.adapt_datetime = lambda value: str(value.astimezone(dt_timezone.utc).replace(tzinfo=None))
+        else:
+            self.adapt_datetime = connection.ops.adapt_datetimefield_value
+        self.tz = timezone.get_current_timezone()
+        self.now = self.adapt_datetime(timezone.now())
+
+    @staticmethod
+    def insert_sql(model, field_names):
+        columns = ', '.join(connection.ops.quote_name(model._meta.get_field(name).column) for name in field_names)
+        values = ', '.join(['%s'] * len(field_names))
+        return f'INSERT INTO {connection.ops.quote_name(model._meta.db_table)} ({columns}) VALUES ({values})'
+
+    def day_params(self, day):
+        """
+        ``(date, at)`` for ``day``, where ``at(minutes)`` is the parameter for
+        that many minutes after local midnight. Values are cached, as sessions
+        share a few hundred distinct minutes a day.
+        """
+        midnight = timezone.make_aware(datetime.combine(day, time(0)), self.tz)
+        cache = {}
+
+        def at(minutes):
+            value = cache.get(minutes)
+            if value is None:
+                value = cache[minutes] = self.adapt_datetime(midnight + timedelta(minutes=minutes))
+            return value
+
+        return connection.ops.adapt_datefield_value(day), at
+
+    def add_day(self, employee_id, date, expected_seconds, worked_seconds, sessions):
+        """Queue one employee-day: ``sessions`` are ``(status, check_in, check_out or None)`` in order"""
+        open_count = 0
+        last_check_out = None
+        for status, check_in, check_out in sessions:
+            self.sessions.append((employee_id, date, status, check_in, check_out, check_in, check_out or check_in))
+            if check_out is None:
+                open_count += 1
+            else:
+                last_check_out = check_out
+        if self.summaries:
+            self.rollups.append((
+                employee_id, date, worked_seconds, sessions[0][1], last_check_out, len(sessions), open_count,
+                expected_seconds, max(expected_seconds - worked_seconds, 0), self.now,
+            ))
+        if len(self.sessions) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        with connection.cursor() as cursor:
+            if self.sessions:
+                cursor.executemany(self.session_sql, self.sessions)
+                self.session_count += len(self.sessions)
+            if self.rollups:
+                cursor.executemany(self.summary_sql, self.rollups)
+                self.summary_count += len(self.rollups)
+        self.sessions, self.rollups = [], []
+
+
+@contextmanager
+def deferred_indexes(*models):
+    """
+    Drop the secondary indexes of ``models`` (``Meta.indexes`` and field
+    indexes such as foreign keys') for the duration of a bulk load and rebuild
+    them afterwards: one sorted build is much cheaper than keeping every index
+    up to date row by row. Primary keys and unique constraints are kept.
+    """
+    editor = connection.schema_editor()
+    indexes = []
+    for model in models:
+        statements = [index.create_sql(model, editor) for index in model._meta.indexes]
+        for field in model._meta.local_fields:
+            statements.extend(editor._field_indexes_sql(model, field))
+        indexes += [(model, str(statement.parts['name']), str(statement)) for statement in statements]
+
+    with connection.cursor() as cursor:
+        for model, name, _ in indexes:
+            # Index.remove_sql() needs an entered editor, which SQLite refuses inside a transaction
+            cursor.execute(editor.sql_delete_index % {'table': editor.quote_name(model._meta.db_table), 'name': name})
+        yield
+        for _, _, create_sql in indexes:
+            cursor.execute(create_sql)
+
+
+def seed_sessions(employees, start_date, end_date, rng=None, late_rate=0.08, missing_checkout_rate=0.01,
+                  split_shift_rate=0.15, absence_rate=0.04, weekends=False, summaries=True, batch_size=BATCH_SIZE,
+                  now=None):
+    """
+    Insert attendance sessions for ``employees`` (``(id, expected_hours)``
+    pairs, with no sessions in the range yet) on every weekday from
+    ``start_date`` to ``end_date``, and their daily summaries unless
+    ``summaries`` is false. Per employee-day:
+
+    - ``absence_rate``: no sessions
+    - ``late_rate``: first check-in after ATTENDANCE_WORKDAY_START plus the
+      grace period, with status "Late"; otherwise up to an hour early
+    - ``split_shift_rate``: two sessions around a 30-60 minute break
+    - ``missing_checkout_rate``: the last session is never checked out
+
+    Worked time is the employee's expected hours, give or take 45 minutes.
+    Sessions that would start after ``now`` (default: the current time) are
+    skipped, and later check-outs are left open. Returns ``(sessions, summaries)`` inserted.
+    """
+    rng = rng or random.Random()
+    # Inlined random() arithmetic; randint() costs more than the insert of a row
+    r = rng.random
+    employees = [
+        (employee_id, (expected_hours or 0) * 60, (expected_hours or 0) * 3600)
+        for employee_id, expected_hours in employees
+    ]
+    writer = SessionWriter(batch_size=batch_size, summaries=summaries)
+    workday_start = datetime.strptime(getattr(settings, 'ATTENDANCE_WORKDAY_START', DEFAULT_WORKDAY_START), '%H:%M')
+    start = workday_start.hour * 60 + workday_start.minute
+    late_start = start + getattr(settings, 'ATTENDANCE_LATE_GRACE_MINUTES', DEFAULT_LATE_GRACE_MINUTES) + 1
+    now = timezone.localtime(now)
+    today = now.date()
+
+    day = start_date
+    while day <= end_date:
+        if not weekends and day.weekday() >= 5:
+            day += timedelta(days=1)
+            continue
+        date, at = writer.day_params(day)
+        # Minutes since midnight after which nothing has happened yet
+        cutoff = float('inf') if day < today else (now.hour * 60 + now.minute if day == today else -1)
+        for employee_id, expected_minutes, expected_seconds in employees:
+            if r() < absence_rate:
+                continue
+            if r() < late_rate:
+                check_in, status = late_start + int(r() * 90), 'Late'
+            else:
+                check_in, status = start - int(r() * 61), 'Present'
+            if check_in >= cutoff:
+                continue
+            work = max(expected_minutes - 45 + int(r() * 91), 60)
+            if r() < split_shift_rate:
+                first = work // 3 + int(r() * (work // 3 + 1))
+                resume = check_in + first + 30 + int(r() * 31)
+                shifts = ((check_in, check_in + first), (resume, resume + work - first))
+            else:
+                shifts = ((check_in, check_in + work),)
+            missing_checkout = r() < missing_checkout_rate
+
+            sessions = []
+            worked = 0
+            for index, (session_start, session_end) in enumerate(shifts, start=1):
+                if session_start >= cutoff:
+                    break
+                if session_end >= cutoff or (missing_checkout and index == len(shifts)):
+                    sessions.append((status, at(session_start), None))
+                else:
+                    sessions.append((status, at(session_start), at(session_end)))
+                    worked += session_end - session_start
+                status = 'Present'
+            writer.add_day(employee_id, date, expected_seconds, worked * 60, sessions)
+        day += timedelta(days=1)
+
+    writer.flush()
+    return writer.session_count, writer.summary_count
+
+
+def seed_attendance(employee_ids, rows, end_date=None, rng=None):
+    """
+    Insert ``rows`` attendance sessions for ``employee_ids`` on consecutive days
+    ending at ``end_date``. Roughly 2% of sessions are left open.
+    """
+    rng = rng or random.Random()
+    end_date = end_date or timezone.now().date()
+    tz = timezone.get_current_timezone()
+    per_day = max(len(employee_ids), 1)
+
+    def build(index):
+        day = end_date - timedelta(days=index // per_day)
+        start = datetime.combine(day, time(8), tzinfo=tz) + timedelta(minutes=rng.randint(0, 120))
+        end = start + timedelta(minutes=rng.randint(240, 600))
+        return Attendance(
+            employee_id=employee_ids[index % per_day],
+            date=day,
+            status='Present',
+            check_in_time=start,
+            check_out_time=None if rng.random() < 0.02 else end,
+        )
+
+    for offset in range(0, rows, BATCH_SIZE):
+        Attendance.objects.bulk_create(
+            [build(index) for index in range(offset, min(offset + BATCH_SIZE, rows))]
+        )
@@ -1,5 +1,7 @@
 from rest_framework import serializers
-from .models import Attendance
+from backend.serializers import SparseFieldsMixin, ValueField, ValuesSerializer, format_date, format_datetime
+from employees.models import Employee
+from .models import Attendance, DailyAttendanceSummary
 
 
 class AttendanceCreateSerializer(serializers.ModelSerializer):
@@ -11,6 +13,45 @@ class AttendanceCreateSerializer(serializers.ModelSerializer):
 
 
 
+class PreloadedEmployeeField(serializers.PrimaryKeyRelatedField):
+    """
+    Resolves employees from an ``employees`` dict in the serializer context when
+    present, so validating a batch costs one ``in_bulk`` query instead of one per row.
+    """
+
+    def to_internal_value(self, data):
+        employees = self.context.get('employees')
+        if employees is None:
+            return super().to_internal_value(data)
+        if isinstance(data, bool):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        try:
+            pk = int(data)
+        except (TypeError, ValueError):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        if pk not in employees:
+            self.fail('does_not_exist', pk_value=data)
+        return employees[pk]
+
+
+class AttendanceScanSerializer(AttendanceCreateSerializer):
+    """A single kiosk badge scan, validated with the AttendanceCreateSerializer rules"""
+    ACTIONS = ('check_in', 'check_out')
+
+    employee = PreloadedEmployeeField(queryset=Employee.objects.all())
+    action = serializers.ChoiceField(choices=ACTIONS)
+    timestamp = serializers.DateTimeField(required=False)
+
+    class Meta(AttendanceCreateSerializer.Meta):
+        fields = ['employee', 'status', 'action', 'timestamp']
+        extra_kwargs = {'status': {'required': False}}
+
+    def validate_employee(self, employee):
+        if not employee.is_active:
+            raise serializers.ValidationError('Employee is inactive')
+        return employee
+
+
 class AttendanceUpdateSerializer(serializers.ModelSerializer):
     class Meta:
         model = Attendance
@@ -19,7 +60,7 @@ class AttendanceUpdateSerializer(serializers.ModelSerializer):
         ]
 
 
-class AttendanceDetailSerializer(serializers.ModelSerializer):
+class AttendanceDetailSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     employee_name = serializers.ReadOnlyField()
     employee_email = serializers.ReadOnlyField()
     department = serializers.ReadOnlyField()
@@ -32,9 +73,14 @@ class AttendanceDetailSerializer(serializers.ModelSerializer):
             'created_at', 'updated_at'
         ]
         read_only_fields = ['attendance_id', 'created_at', 'updated_at']
+        related = {
+            'employee_name': ('employee',),
+            'employee_email': ('employee__user',),
+            'department': ('employee__role__department',),
+        }
 
 
-class AttendanceListSerializer(serializers.ModelSerializer):
+class AttendanceListSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     employee_name = serializers.ReadOnlyField()
     employee_email = serializers.ReadOnlyField()
     department = serializers.ReadOnlyField()
@@ -45,3 +91,36 @@ class AttendanceListSerializer(serializers.ModelSerializer):
             'attendance_id', 'employee', 'employee_name', 'employee_email', 
             'department', 'date', 'status', 'check_in_time', 'check_out_time'
         ]
+        related = AttendanceDetailSerializer.Meta.related
+
+
+class AttendanceListValuesSerializer(ValuesSerializer):
+    """Same output as AttendanceListSerializer, built from ``.values()`` rows"""
+    fields = {
+        'attendance_id': ValueField('attendance_id'),
+        'employee': ValueField('employee_id'),
+        'employee_name': ValueField(
+            'employee__first_name', 'employee__last_name', render=lambda first, last: f"{first} {last}"
+        ),
+        'employee_email': ValueField('employee__user__email'),
+        'department': ValueField('employee__role__department__name', render=lambda name: name or 'N/A'),
+        'date': ValueField('date', render=format_date),
+        'status': ValueField('status'),
+        'check_in_time': ValueField('check_in_time', render=format_datetime),
+        'check_out_time': ValueField('check_out_time', render=format_datetime),
+    }
+    # Ordering / sync watermark columns
+    extra_values = ('attendance_id', 'date', 'created_at', 'updated_at')
+
+
+class DailyAttendanceSummarySerializer(serializers.ModelSerializer):
+    worked_hours = serializers.ReadOnlyField()
+    shortfall_hours = serializers.ReadOnlyField()
+
+    class Meta:
+        model = DailyAttendanceSummary
+        fields = [
+            'employee', 'date', 'worked_seconds', 'worked_hours', 'first_check_in',
+            'last_check_out', 'session_count', 'open_session_count', 'expected_seconds',
+            'shortfall_seconds', 'shortfall_hours', 'updated_at'
+        ]
@@ -0,0 +1,75 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from employees.models import Department, Employee, JobRole
+from .models import Attendance
+from .summaries import apply_expected_hours, refresh_daily_summaries
+
+User = get_user_model()
+
+
+@receiver(post_save, sender=Attendance)
+def refresh_summary_on_save(sender, instance, raw=False, **kwargs):
+    """Keep the employee-day rollup in step with every saved session"""
+    if raw:
+        return
+    keys = {(instance.employee_id, instance.date)}
+    loaded = getattr(instance, '_loaded_summary_key', None)
+    if loaded and None not in loaded:
+        keys.add(loaded)
+    refresh_daily_summaries(keys)
+    instance._loaded_summary_key = (instance.employee_id, instance.date)
+
+
+@receiver(post_delete, sender=Attendance)
+def refresh_summary_on_delete(sender, instance, **kwargs):
+    refresh_daily_summaries({(instance.employee_id, instance.date)})
+
+
+@receiver(post_save, sender=Employee)
+def apply_expected_hours_on_save(sender, instance, raw=False, update_fields=None, **kwargs):
+    """Summaries carry the employee's current expected hours, as a rebuild would compute them"""
+    if raw or 'expected_hours' not in instance.__dict__:
+        return
+    if update_fields is not None and 'expected_hours' not in update_fields:
+        return
+    apply_expected_hours(instance.pk, instance.expected_hours)
+
+
+def touch_attendance(attendance):
+    """
+    Bump ``updated_at`` on ``attendance``, so the changes feed resends rows
+    whose employee name, email or department changed
+    """
+    attendance.update(updated_at=timezone.now())
+
+
+@receiver(post_save, sender=Employee)
+def touch_attendance_on_employee_save(sender, instance, created, raw=False, **kwargs):
+    if raw or created:
+        return
+    values = instance.listing_values()
+    if getattr(instance, '_loaded_listing', None) != values:
+        touch_attendance(Attendance.objects.filter(employee=instance))
+    instance._loaded_listing = values
+
+
+@receiver(post_save, sender=User)
+def touch_attendance_on_user_save(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    if raw or created or (update_fields is not None and 'email' not in update_fields):
+        return
+    touch_attendance(Attendance.objects.filter(employee__user=instance))
+
+
+@receiver(post_save, sender=JobRole)
+def touch_attendance_on_role_save(sender, instance, created, raw=False, **kwargs):
+    if not created and not raw:
+        touch_attendance(Attendance.objects.filter(employee__role=instance))
+
+
+@receiver(post_save, sender=Department)
+def touch_attendance_on_department_save(sender, instance, created, raw=False, **kwargs):
+    if not created and not raw:
+        touch_attendance(Attendance.objects.filter(employee__role__department=instance))
@@ -0,0 +1,140 @@
+"""
+Maintenance of the DailyAttendanceSummary rollup.
+
+Summaries are recomputed per employee-day from the raw sessions with a single
+grouped aggregate query, so the incremental path (one employee-day after a
+check-in/check-out) and the bulk rebuild (a whole date range) share the same
+arithmetic.
+"""
+from datetime import timedelta
+from functools import reduce
+from operator import or_
+
+from django.db import transaction
+from django.db.models import Count, F, Max, Min, Q, Sum, Value
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from .models import Attendance, DailyAttendanceSummary, WORKED_DURATION
+
+SUMMARY_FIELDS = [
+    'worked_seconds', 'first_check_in', 'last_check_out', 'session_count',
+    'open_session_count', 'expected_seconds', 'shortfall_seconds', 'updated_at',
+]
+
+
+def _aggregate(queryset):
+    """Group sessions by employee-day and return unsaved summary rows"""
+    rows = (
+        queryset.order_by()
+        .values('employee_id', 'date', 'employee__expected_hours')
+        .annotate(
+            worked=Sum(WORKED_DURATION, filter=Q(check_in_time__isnull=False, check_out_time__isnull=False)),
+            first_check_in=Min('check_in_time'),
+            last_check_out=Max('check_out_time'),
+            session_count=Count('attendance_id'),
+            open_session_count=Count('attendance_id', filter=Q(
+                check_in_time__isnull=False, check_out_time__isnull=True
+            )),
+        )
+    )
+    summaries = []
+    for row in rows.iterator(chunk_size=2000):
+        worked = max(int(row['worked'].total_seconds()), 0) if row['worked'] else 0
+        expected = (row['employee__expected_hours'] or 0) * 3600
+        summaries.append(DailyAttendanceSummary(
+            employee_id=row['employee_id'],
+            date=row['date'],
+            worked_seconds=worked,
+            first_check_in=row['first_check_in'],
+            last_check_out=row['last_check_out'],
+            session_count=row['session_count'],
+            open_session_count=row['open_session_count'],
+            expected_seconds=expected,
+            shortfall_seconds=max(expected - worked, 0),
+        ))
+    return summaries
+
+
+def _upsert(summaries, batch_size=1000):
+    now = timezone.now()
+    for summary in summaries:
+        summary.updated_at = now
+    DailyAttendanceSummary.objects.bulk_create(
+        summaries,
+        batch_size=batch_size,
+        update_conflicts=True,
+        unique_fields=['employee', 'date'],
+        update_fields=SUMMARY_FIELDS,
+    )
+
+
+def apply_expected_hours(employee_id, expected_hours):
+    """
+    Re-derive ``expected_seconds`` and ``shortfall_seconds`` of every summary of
+    the employee from ``expected_hours``, as a rebuild would, in one UPDATE.
+    Returns the number of rows changed.
+    """
+    expected = (expected_hours or 0) * 3600
+    return (
+        DailyAttendanceSummary.objects
+        .filter(employee_id=employee_id)
+        .exclude(expected_seconds=expected)
+        .update(
+            expected_seconds=expected,
+            shortfall_seconds=Greatest(Value(expected) - F('worked_seconds'), Value(0)),
+            updated_at=timezone.now(),
+        )
+    )
+
+
+def refresh_daily_summary(employee_id, date):
+    """Recompute the summary for one employee-day, deleting it if no sessions remain"""
+    refresh_daily_summaries([(employee_id, date)])
+
+
+def refresh_daily_summaries(keys):
+    """
+    Recompute summaries for an iterable of ``(employee_id, date)`` pairs with
+    one aggregate query, deleting summaries whose sessions are all gone.
+    """
+    keys = set(keys)
+    if not keys:
+        return
+    by_date = {}
+    for employee_id, date in keys:
+        by_date.setdefault(date, set()).add(employee_id)
+    condition = reduce(or_, (Q(date=date, employee_id__in=ids) for date, ids in by_date.items()))
+
+    summaries = _aggregate(Attendance.objects.filter(condition))
+    _upsert(summaries)
+
+    emptied = keys - {(summary.employee_id, summary.date) for summary in summaries}
+    if emptied:
+        DailyAttendanceSummary.objects.filter(
+            reduce(or_, (Q(employee_id=employee_id, date=date) for employee_id, date in emptied))
+        ).delete()
+
+
+@transaction.atomic
+def rebuild_daily_summaries(start_date, end_date, employee_ids=None, window_days=31):
+    """
+    Rebuild every summary between ``start_date`` and ``end_date`` inclusive from
+    the raw sessions, ``window_days`` at a time. Returns the number of rows written.
+    """
+    written = 0
+    window_start = start_date
+    while window_start <= end_date:
+        window_end = min(window_start + timedelta(days=window_days - 1), end_date)
+        sessions = Attendance.objects.filter(date__range=[window_start, window_end])
+        stale = DailyAttendanceSummary.objects.filter(date__range=[window_start, window_end])
+        if employee_ids is not None:
+            sessions = sessions.filter(employee_id__in=employee_ids)
+            stale = stale.filter(employee_id__in=employee_ids)
+
+        summaries = _aggregate(sessions)
+        stale.delete()
+        _upsert(summaries)
+        written += len(summaries)
+        window_start = window_end + timedelta(days=1)
+    return written
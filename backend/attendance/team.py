@@ -0,0 +1,98 @@
+"""
+Team status dashboard for managers.
+
+A manager's team (direct reports, or everyone below them through the org
+chart closure table) is joined with the day's sessions and aggregated per
+employee in a single grouped query, so the cost does not grow with the
+size of the team. The day is part of the join condition, so the
+(employee, date) index bounds the join and the cost does not grow with
+attendance history either.
+"""
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.db.models import (
+    Count, DateTimeField, DurationField, ExpressionWrapper, F, FilteredRelation, Max, Min, Q, Sum,
+)
+from django.utils import timezone
+
+from backend.serializers import format_datetime
+from employees.hierarchy import reports_filter
+from employees.models import Employee
+
+DEFAULT_WORKDAY_START = '09:00'
+DEFAULT_LATE_GRACE_MINUTES = 10
+
+STATES = ('checked_in', 'checked_out', 'absent')
+
+
+def get_late_after(day):
+    """The aware datetime after which a first check-in on ``day`` counts as late"""
+    start = datetime.strptime(getattr(settings, 'ATTENDANCE_WORKDAY_START', DEFAULT_WORKDAY_START), '%H:%M').time()
+    grace = timedelta(minutes=getattr(settings, 'ATTENDANCE_LATE_GRACE_MINUTES', DEFAULT_LATE_GRACE_MINUTES))
+    return timezone.make_aware(datetime.combine(day, start)) + grace
+
+
+def team_status_queryset(manager_id, day, transitive=False):
+    """One row per active team member with the day's sessions aggregated"""
+    checked_in = Q(day_sessions__check_in_time__isnull=False)
+    closed = checked_in & Q(day_sessions__check_out_time__isnull=False)
+    worked = ExpressionWrapper(
+        F('day_sessions__check_out_time') - F('day_sessions__check_in_time'), output_field=DurationField()
+    )
+    return (
+        Employee.objects
+        .filter(reports_filter(manager_id, max_depth=None if transitive else 1), is_active=True)
+        # LEFT JOIN ... ON employee_id = ... AND date = day: only that day's sessions are read
+        .annotate(day_sessions=FilteredRelation('attendances', condition=Q(attendances__date=day)))
+        .values('id', 'first_name', 'last_name', 'user__email', 'expected_hours', 'ancestor_links__depth')
+        .annotate(
+            session_count=Count('day_sessions'),
+            open_session_count=Count('day_sessions', filter=checked_in & Q(day_sessions__check_out_time__isnull=True)),
+            marked_late=Count('day_sessions', filter=Q(day_sessions__status__iexact='late')),
+            first_check_in=Min('day_sessions__check_in_time', output_field=DateTimeField()),
+            last_check_out=Max('day_sessions__check_out_time', output_field=DateTimeField()),
+            worked=Sum(worked, filter=closed),
+        )
+        .order_by('first_name', 'last_name', 'id')
+    )
+
+
+def team_status(manager_id, day, transitive=False):
+    """
+    Per-member state for ``day`` plus team totals. A member is late when a
+    session is marked "Late" or their first check-in is after the configured
+    workday start plus grace period.
+    """
+    late_after = get_late_after(day)
+    members = []
+    for row in team_status_queryset(manager_id, day, transitive):
+        if row['open_session_count']:
+            state = 'checked_in'
+        elif row['session_count']:
+            state = 'checked_out'
+        else:
+            state = 'absent'
+        worked = max(int(row['worked'].total_seconds()), 0) if row['worked'] else 0
+        expected = (row['expected_hours'] or 0) * 3600
+        members.append({
+            'employee': row['id'],
+            'employee_name': f"{row['first_name']} {row['last_name']}",
+            'employee_email': row['user__email'],
+            'depth': row['ancestor_links__depth'],
+            'state': state,
+            'late': bool(row['marked_late']) or (row['first_check_in'] is not None and row['first_check_in'] > late_after),
+            'first_check_in': format_datetime(row['first_check_in']),
+            'last_check_out': format_datetime(row['last_check_out']),
+            'session_count': row['session_count'],
+            'open_session_count': row['open_session_count'],
+            'worked_seconds': worked,
+            'expected_seconds': expected,
+            'shortfall_seconds': max(expected - worked, 0),
+        })
+
+    summary = {'team_size': len(members), **{state: 0 for state in STATES}, 'late': 0}
+    for member in members:
+        summary[member['state']] += 1
+        summary['late'] += member['late']
+    return {'summary': summary, 'members': members}
@@ -1,3 +1,1038 @@
-from django.test import TestCase
+import asyncio
+import csv
+import io
+import itertools
+import json
+import random
+import re
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from pathlib import Path
+from unittest import skipUnless
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.db import connection, connections
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient, APITestCase, APITransactionTestCase
+
+from authentication.tokens import EmployeeRefreshToken
+from backend.database import sqlite_database
+from backend.metrics import install_on_open_connections, render_metrics
+from backend.pagination import encode_cursor
+from backend.renderers import ORJSONParser, ORJSONRenderer, orjson
+from employees.models import Department, JobRole, Employee
+from .events import get_broker
+from .models import Attendance, DailyAttendanceSummary
+from .seeding import seed_employees, seed_roles, seed_sessions
+from .serializers import AttendanceListSerializer, AttendanceListValuesSerializer
+from .summaries import rebuild_daily_summaries
+
+User = get_user_model()
+
+
+class AttendanceTestMixin:
+    """Shared fixtures for the attendance API tests"""
+    sequence = itertools.count()
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.department = Department.objects.create(name='Engineering')
+        cls.role = JobRole.objects.create(name='Developer', department=cls.department)
+        cls.user = User.objects.create_user(
+            email='owner@example.com', username='owner', password='testpass123'
+        )
+        cls.employee = Employee.objects.create(
+            user=cls.user, first_name='Ada', last_name='Lovelace', role=cls.role
+        )
+
+    def setUp(self):
+        self.client.force_authenticate(user=self.user)
+
+    @classmethod
+    def create_employee(cls):
+        index = next(cls.sequence)
+        user = User.objects.create_user(
+            email=f'employee{index}@example.com', username=f'employee{index}'
+        )
+        return Employee.objects.create(
+            user=user, first_name='Employee', last_name=str(index), role=cls.role
+        )
+
+    @classmethod
+    def create_attendances(cls, count, day=None):
+        day = day or timezone.now().date()
+        now = timezone.now()
+        records = []
+        for _ in range(count):
+            employee = cls.create_employee()
+            records.append(Attendance.objects.create(
+                employee=employee, date=day, status='Present', check_in_time=now
+            ))
+        return records
+
+
+class AttendanceQueryCountTests(AttendanceTestMixin, APITestCase):
+    def count_queries(self, url, params=None):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def assertConstantQueries(self, url, params=None):
+        self.create_attendances(1)
+        baseline = self.count_queries(url, params)
+        self.create_attendances(10)
+        self.assertEqual(self.count_queries(url, params), baseline)
+
+    def test_list_query_count_is_constant(self):
+        self.assertConstantQueries(reverse('attendance:attendance-list'))
+
+    def test_today_query_count_is_constant(self):
+        self.assertConstantQueries(reverse('attendance:today-attendance'))
+
+    def test_date_range_query_count_is_constant(self):
+        today = timezone.now().date()
+        self.assertConstantQueries(reverse('attendance:attendance-by-date-range'), {
+            'start_date': (today - timedelta(days=1)).isoformat(),
+            'end_date': today.isoformat(),
+        })
+
+    def test_by_employee_query_count_is_constant(self):
+        url = reverse('attendance:attendance-by-employee', args=[self.employee.pk])
+        Attendance.objects.create(employee=self.employee, date=date.today(), status='Present')
+        baseline = self.count_queries(url)
+        for _ in range(10):
+            Attendance.objects.create(employee=self.employee, date=date.today(), status='Present')
+        self.assertEqual(self.count_queries(url), baseline)
+
+    def test_detail_includes_employee_fields_in_one_query(self):
+        attendance = self.create_attendances(1)[0]
+        url = reverse('attendance:attendance-detail', args=[attendance.pk])
+        with self.assertNumQueries(1):
+            response = self.client.get(url)
+        self.assertEqual(response.data['employee_email'], attendance.employee.email)
+        self.assertEqual(response.data['department'], 'Engineering')
+
+
+class AttendancePaginationTests(AttendanceTestMixin, APITestCase):
+    def collect_pages(self, url, params):
+        rows, pages = [], 0
+        response = self.client.get(url, params)
+        while True:
+            self.assertEqual(response.status_code, 200)
+            rows.extend(response.data['results'])
+            pages += 1
+            if not response.data['next']:
+                return rows, pages
+            response = self.client.get(response.data['next'])
+
+    def test_cursor_walks_every_row_once_in_order(self):
+        today = timezone.now().date()
+        for offset in range(3):
+            self.create_attendances(3, day=today - timedelta(days=offset))
+
+        rows, pages = self.collect_pages(reverse('attendance:attendance-list'), {'page_size': 2})
+
+        self.assertEqual(pages, 5)
+        expected = list(
+            Attendance.objects.order_by('-date', '-created_at', '-attendance_id')
+            .values_list('attendance_id', flat=True)
+        )
+        self.assertEqual([row['attendance_id'] for row in rows], expected)
+
+    def test_previous_link_returns_preceding_page(self):
+        self.create_attendances(5)
+        url = reverse('attendance:today-attendance')
+        first = self.client.get(url, {'page_size': 2})
+        second = self.client.get(first.data['next'])
+        self.assertIsNone(first.data['previous'])
+
+        back = self.client.get(second.data['previous'])
+
+        self.assertEqual(back.data['results'], first.data['results'])
+
+    def test_date_range_is_paginated(self):
+        self.create_attendances(3)
+        today = timezone.now().date().isoformat()
+        response = self.client.get(reverse('attendance:attendance-by-date-range'), {
+            'start_date': today, 'end_date': today, 'page_size': 2,
+        })
+        self.assertEqual(len(response.data['results']), 2)
+        self.assertIsNotNone(response.data['next'])
+
+    def test_invalid_cursor_is_rejected(self):
+        response = self.client.get(reverse('attendance:attendance-list'), {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, 404)
+
+    def test_malformed_cursor_values_are_rejected(self):
+        self.create_attendances(2)
+        now = timezone.now().isoformat()
+        for position in (
+            ['abc', 'x', 1], [None, None, None], [1, 2, 3], ['2024-03-04', now, 'x'],
+            ['2024-03-04', now, 2 ** 80], ['2024-03-04', [now], 1],
+        ):
+            for name in ('attendance:attendance-list', 'attendance:today-attendance'):
+                response = self.client.get(reverse(name), {'cursor': encode_cursor({'p': position})})
+                self.assertEqual(response.status_code, 404, (name, position))
+                self.assertEqual(response.data['detail'], 'Invalid cursor')
+
+        # Well-formed values still page
+        response = self.client.get(
+            reverse('attendance:attendance-list'), {'cursor': encode_cursor({'p': ['2099-01-01', now, 1]})}
+        )
+        self.assertEqual(len(response.data['results']), 2)
+
+
+class DailyAttendanceSummaryTests(AttendanceTestMixin, APITestCase):
+    day = date(2025, 3, 3)
+
+    def at(self, hour, minute=0):
+        return datetime.combine(self.day, time(hour, minute), tzinfo=timezone.get_current_timezone())
+
+    def summary(self):
+        return DailyAttendanceSummary.objects.get(employee=self.employee, date=self.day)
+
+    def test_sessions_roll_up_incrementally(self):
+        morning = Attendance.objects.create(
+            employee=self.employee, date=self.day, status='Present',
+            check_in_time=self.at(9), check_out_time=self.at(12, 30),
+        )
+        afternoon = Attendance.objects.create(
+            employee=self.employee, date=self.day, status='Present', check_in_time=self.at(13),
+        )
+
+        summary = self.summary()
+        self.assertEqual(summary.session_count, 2)
+        self.assertEqual(summary.open_session_count, 1)
+        self.assertEqual(summary.worked_seconds, 3.5 * 3600)
+        self.assertEqual(summary.shortfall_seconds, 4.5 * 3600)
+        self.assertEqual(summary.first_check_in, morning.check_in_time)
+
+        afternoon.check_out_time = self.at(18)
+        afternoon.save()
+
+        summary = self.summary()
+        self.assertEqual(summary.open_session_count, 0)
+        self.assertEqual(summary.worked_seconds, 8.5 * 3600)
+        self.assertEqual(summary.shortfall_seconds, 0)
+        self.assertEqual(summary.last_check_out, self.at(18))
+
+        morning.delete()
+        afternoon.delete()
+        self.assertFalse(DailyAttendanceSummary.objects.exists())
+
+    def test_rebuild_matches_incremental_rows(self):
+        Attendance.objects.create(
+            employee=self.employee, date=self.day, status='Present',
+            check_in_time=self.at(9), check_out_time=self.at(17),
+        )
+        expected = self.summary()
+        DailyAttendanceSummary.objects.all().delete()
+
+        written = rebuild_daily_summaries(self.day - timedelta(days=40), self.day)
+
+        self.assertEqual(written, 1)
+        self.assertEqual(self.summary().worked_seconds, expected.worked_seconds)
+
+    def test_expected_hours_change_updates_summaries(self):
+        Attendance.objects.create(
+            employee=self.employee, date=self.day, status='Present',
+            check_in_time=self.at(9), check_out_time=self.at(15),
+        )
+        self.assertEqual(self.summary().shortfall_seconds, 2 * 3600)
+
+        self.employee.expected_hours = 4
+        self.employee.save()
+        summary = self.summary()
+        self.assertEqual(summary.expected_seconds, 4 * 3600)
+        self.assertEqual(summary.shortfall_seconds, 0)
+
+        self.employee.expected_hours = 10
+        self.employee.save(update_fields=['expected_hours'])
+        self.assertEqual(self.summary().shortfall_seconds, 4 * 3600)
+
+        # Matches a rebuild from the sessions
+        rebuild_daily_summaries(self.day, self.day)
+        self.assertEqual(self.summary().shortfall_seconds, 4 * 3600)
+
+    def test_summary_endpoint_filters_by_range(self):
+        Attendance.objects.create(
+            employee=self.employee, date=self.day, status='Present',
+            check_in_time=self.at(9), check_out_time=self.at(17),
+        )
+        response = self.client.get(reverse('attendance:daily-summaries'), {
+            'start_date': self.day.isoformat(), 'end_date': self.day.isoformat(),
+        })
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['results'][0]['worked_hours'], 8.0)
+
+
+class TimesheetReportTests(AttendanceTestMixin, APITestCase):
+    monday = date(2025, 3, 3)
+
+    def session(self, employee, day, start, end):
+        tz = timezone.get_current_timezone()
+        return Attendance.objects.create(
+            employee=employee, date=day, status='Present',
+            check_in_time=datetime.combine(day, time(start), tzinfo=tz),
+            check_out_time=datetime.combine(day, time(end), tzinfo=tz) if end else None,
+        )
+
+    def report(self, **params):
+        params.setdefault('start_date', self.monday.isoformat())
+        params.setdefault('end_date', (self.monday + timedelta(days=6)).isoformat())
+        return self.client.get(reverse('attendance:timesheet-report'), params)
+
+    def test_daily_totals_per_employee(self):
+        colleague = self.create_employee()
+        self.session(self.employee, self.monday, 9, 12)
+        self.session(self.employee, self.monday, 13, 17)
+        self.session(colleague, self.monday, 9, None)
+
+        response = self.report()
+
+        self.assertEqual(response.status_code, 200)
+        rows = {row['employee_id']: row for row in response.data['results']}
+        self.assertEqual(rows[self.employee.pk]['worked_seconds'], 7 * 3600)
+        self.assertEqual(rows[self.employee.pk]['employee_name'], 'Ada Lovelace')
+        self.assertEqual(rows[colleague.pk]['worked_seconds'], 0)
+        self.assertEqual(rows[colleague.pk]['open_session_count'], 1)
+        self.assertEqual(response.data['totals']['worked_hours'], 7.0)
+
+    def test_weekly_department_totals_in_one_query(self):
+        self.session(self.employee, self.monday, 9, 17)
+        self.session(self.employee, self.monday + timedelta(days=2), 9, 13)
+        self.session(self.create_employee(), self.monday + timedelta(days=4), 10, 12)
+
+        with self.assertNumQueries(1):
+            response = self.report(group_by='department', bucket='week')
+
+        self.assertEqual(len(response.data['results']), 1)
+        row = response.data['results'][0]
+        self.assertEqual(row['bucket'], self.monday)
+        self.assertEqual(row['department_name'], 'Engineering')
+        self.assertEqual(row['worked_hours'], 14.0)
+        self.assertEqual(row['employee_count'], 2)
+
+    def test_rejects_unknown_grouping(self):
+        response = self.report(group_by='planet')
+        self.assertEqual(response.status_code, 400)
+
+
+class AttendanceExportTests(AttendanceTestMixin, APITestCase):
+    def export(self, file_type):
+        today = timezone.now().date().isoformat()
+        response = self.client.get(reverse('attendance:attendance-export'), {
+            'start_date': today, 'end_date': today, 'file_type': file_type,
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return b''.join(response.streaming_content).decode('utf-8')
+
+    def test_ndjson_rows_match_list_serializer(self):
+        self.create_attendances(3)
+        expected = AttendanceListSerializer(Attendance.objects.for_listing(), many=True).data
+
+        records = [json.loads(line) for line in self.export('ndjson').splitlines()]
+
+        self.assertEqual(records, [dict(row) for row in expected])
+
+    def test_csv_has_header_and_one_line_per_session(self):
+        records = self.create_attendances(2)
+
+        rows = list(csv.DictReader(io.StringIO(self.export('csv'))))
+
+        self.assertEqual(len(rows), 2)
+        self.assertEqual({int(row['attendance_id']) for row in rows}, {r.pk for r in records})
+        self.assertEqual(rows[0]['department'], 'Engineering')
+
+    def test_rejects_unknown_format(self):
+        today = timezone.now().date().isoformat()
+        response = self.client.get(reverse('attendance:attendance-export'), {
+            'start_date': today, 'end_date': today, 'file_type': 'xlsx',
+        })
+        self.assertEqual(response.status_code, 400)
+
+
+class CheckInCheckOutTests(AttendanceTestMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.attendance = Attendance.objects.create(
+            employee=self.employee, date=timezone.now().date(), status='Present'
+        )
+
+    def post(self, name):
+        return self.client.post(reverse(f'attendance:{name}', args=[self.attendance.pk]))
+
+    def test_check_in_then_out_updates_only_time_columns(self):
+        Attendance.objects.filter(pk=self.attendance.pk).update(status='Edited elsewhere')
+        self.assertEqual(self.post('attendance-check-in').status_code, 200)
+        self.assertEqual(self.post('attendance-check-out').status_code, 200)
+
+        self.attendance.refresh_from_db()
+        self.assertIsNotNone(self.attendance.check_in_time)
+        self.assertIsNotNone(self.attendance.check_out_time)
+        # A stale in-memory copy would have overwritten this with save()
+        self.assertEqual(self.attendance.status, 'Edited elsewhere')
+        self.assertEqual(
+            DailyAttendanceSummary.objects.get(employee=self.employee).open_session_count, 0
+        )
+
+    def test_repeated_and_out_of_order_taps_are_rejected(self):
+        self.assertEqual(self.post('attendance-check-out').data['error'],
+                         'Employee must check in before checking out')
+        self.post('attendance-check-in')
+        self.assertEqual(self.post('attendance-check-in').status_code, 400)
+        self.post('attendance-check-out')
+        self.assertEqual(self.post('attendance-check-out').data['error'],
+                         'Employee has already checked out')
+
+    def test_missing_record_returns_404(self):
+        response = self.client.post(reverse('attendance:attendance-check-in', args=[999999]))
+        self.assertEqual(response.status_code, 404)
+
+
+class ConcurrentCheckInTests(AttendanceTestMixin, APITransactionTestCase):
+    workers = 16
+
+    def setUp(self):
+        self.setUpTestData()
+        self.attendance = Attendance.objects.create(
+            employee=self.employee, date=timezone.now().date(), status='Present'
+        )
+
+    def test_exactly_one_parallel_check_in_wins(self):
+        url = reverse('attendance:attendance-check-in', args=[self.attendance.pk])
+        barrier = threading.Barrier(self.workers)
+
+        def tap(_):
+            client = APIClient()
+            client.force_authenticate(user=self.user)
+            try:
+                barrier.wait()
+                while True:
+                    response = client.post(url)
+                    # The shared-cache in-memory test database reports table locks
+                    # instead of waiting on them; retry until the tap is decided
+                    if 'locked' not in str(response.data.get('error', '')):
+                        return response.status_code, response.data
+            finally:
+                connections.close_all()
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            results = list(pool.map(tap, range(self.workers)))
+
+        winners = [data['attendance'] for code, data in results if code == 200]
+        losers = [data['message'] for code, data in results if code != 200]
+        self.assertEqual(len(winners), 1)
+        self.assertEqual(losers, ['Check-in already recorded'] * (self.workers - 1))
+        self.attendance.refresh_from_db()
+        self.assertEqual(
+            winners[0]['check_in_time'],
+            AttendanceListSerializer(self.attendance).data['check_in_time'],
+        )
+
+
+class KioskScanTests(AttendanceTestMixin, APITestCase):
+    url = reverse('attendance:kiosk-scans')
+
+    def test_batch_applies_scans_in_order(self):
+        colleague = self.create_employee()
+        pending = Attendance.objects.create(
+            employee=colleague, date=timezone.now().date(), status='Scheduled'
+        )
+        scans = [
+            {'employee': self.employee.pk, 'action': 'check_in'},
+            {'employee': colleague.pk, 'action': 'check_in'},
+            {'employee': self.employee.pk, 'action': 'check_out'},
+            {'employee': self.employee.pk, 'action': 'check_in', 'status': 'Late'},
+        ]
+
+        response = self.client.post(self.url, {'scans': scans}, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['succeeded'], 4)
+        results = response.data['results']
+        self.assertEqual(results[1]['attendance_id'], pending.pk)
+        self.assertEqual(results[0]['attendance_id'], results[2]['attendance_id'])
+        sessions = Attendance.objects.filter(employee=self.employee).order_by('created_at', 'pk')
+        self.assertEqual([s.status for s in sessions], ['Present', 'Late'])
+        self.assertIsNotNone(sessions[0].check_out_time)
+        self.assertIsNone(sessions[1].check_out_time)
+        self.assertEqual(
+            DailyAttendanceSummary.objects.get(employee=self.employee).session_count, 2
+        )
+
+    def post_scans(self, scans):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post(self.url, {'scans': scans}, format='json')
+
+    async def test_every_scan_is_published_in_order(self):
+        scans = [
+            {'employee': self.employee.pk, 'action': 'check_in'},
+            {'employee': self.employee.pk, 'action': 'check_out'},
+        ]
+        subscription = get_broker().subscribe()
+        try:
+            response = await sync_to_async(self.post_scans)(scans)
+            events = [await subscription.get(timeout=1), await subscription.get(timeout=1)]
+        finally:
+            subscription.close()
+        self.assertEqual(response.data['succeeded'], 2)
+        self.assertEqual([event['type'] for event in events], ['check_in', 'check_out'])
+        attendance_id = response.data['results'][0]['attendance_id']
+        self.assertEqual([event['attendance']['attendance_id'] for event in events], [attendance_id] * 2)
+
+    def test_invalid_scans_do_not_abort_the_batch(self):
+        scans = [
+            {'employee': 999999, 'action': 'check_in'},
+            {'employee': self.employee.pk, 'action': 'dance'},
+            {'employee': self.employee.pk, 'action': 'check_out'},
+            {'employee': self.employee.pk, 'action': 'check_in'},
+            {'employee': self.employee.pk, 'action': 'check_in'},
+        ]
+
+        response = self.client.post(self.url, scans, format='json')
+
+        self.assertEqual([r['success'] for r in response.data['results']],
+                         [False, False, False, True, False])
+        self.assertIn('employee', response.data['results'][0]['errors'])
+        self.assertEqual(Attendance.objects.count(), 1)
+
+    def test_query_count_does_not_grow_with_batch_size(self):
+        def post(count):
+            employees = [self.create_employee() for _ in range(count)]
+            scans = [{'employee': e.pk, 'action': 'check_in'} for e in employees]
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.post(self.url, {'scans': scans}, format='json')
+            self.assertEqual(response.data['succeeded'], count)
+            return len(queries)
+
+        self.assertEqual(post(2), post(20))
+
+
+@override_settings(SYNC_OVERLAP_SECONDS=0)
+class AttendanceChangesTests(AttendanceTestMixin, APITestCase):
+    def poll(self, since=None, **params):
+        if since:
+            params['since'] = since
+        return self.client.get(reverse('attendance:attendance-changes'), params).data
+
+    def test_polls_return_only_rows_changed_since_watermark(self):
+        records = self.create_attendances(3)
+
+        first = self.poll(page_size=2)
+        self.assertTrue(first['has_more'])
+        second = self.poll(first['watermark'], page_size=2)
+        self.assertFalse(second['has_more'])
+        ids = [row['attendance_id'] for row in first['results'] + second['results']]
+        self.assertEqual(sorted(ids), sorted(r.pk for r in records))
+
+        idle = self.poll(second['watermark'])
+        self.assertEqual(idle['results'], [])
+        self.assertEqual(idle['watermark'], second['watermark'])
+
+        self.client.post(reverse('attendance:attendance-check-out', args=[records[0].pk]))
+        changed = self.poll(second['watermark'])
+        self.assertEqual([row['attendance_id'] for row in changed['results']], [records[0].pk])
+
+    def test_employee_detail_changes_resend_rows(self):
+        record = self.create_attendances(1)[0]
+        department = Department.objects.create(name='Research')
+        role = JobRole.objects.create(name='Researcher', department=department)
+        colleague = self.create_employee()
+        Employee.objects.filter(pk=colleague.pk).update(role=role)
+        other = Attendance.objects.create(employee=colleague, date=record.date, status='Present')
+        watermark = self.poll()['watermark']
+
+        def changed_since_last_poll():
+            nonlocal watermark
+            changes = self.poll(watermark)
+            watermark = changes['watermark']
+            return [row['attendance_id'] for row in changes['results']]
+
+        employee = Employee.objects.get(pk=record.employee_id)
+        employee.save()
+        self.assertEqual(changed_since_last_poll(), [])
+
+        employee.last_name = 'Byron'
+        employee.save()
+        self.assertEqual(changed_since_last_poll(), [record.pk])
+
+        employee.user.email = 'renamed@example.com'
+        employee.user.save()
+        self.assertEqual(changed_since_last_poll(), [record.pk])
+
+        department.name = 'Labs'
+        department.save()
+        self.assertEqual(changed_since_last_poll(), [other.pk])
+
+        self.role.name = 'Engineer'
+        self.role.save()
+        self.assertEqual(changed_since_last_poll(), [record.pk])
+
+        employee.role = role
+        employee.save()
+        self.assertEqual(changed_since_last_poll(), [record.pk])
+
+    @override_settings(SYNC_OVERLAP_SECONDS=30)
+    def test_rows_committed_late_are_read_in_the_overlap(self):
+        records = self.create_attendances(2)
+        first = self.poll()
+        self.assertEqual(len(first['results']), 2)
+
+        # Stamped before the last row of the poll, committed after it
+        late = self.create_attendances(1)[0]
+        Attendance.objects.filter(pk=late.pk).update(updated_at=records[0].updated_at)
+        second = self.poll(first['watermark'])
+        self.assertIn(late.pk, [row['attendance_id'] for row in second['results']])
+
+        # Full pages advance past the window so paging terminates
+        paged = self.poll(page_size=1)
+        self.assertTrue(paged['has_more'])
+        self.assertEqual(len(self.poll(paged['watermark'], page_size=1)['results']), 1)
+
+    def test_invalid_watermark_is_rejected(self):
+        response = self.client.get(reverse('attendance:attendance-changes'), {'since': 'not-a-cursor'})
+        self.assertEqual(response.status_code, 400)
+
+        watermarks = [
+            ['abc', 1],
+            [timezone.now().isoformat(), 'x'],
+            [timezone.now().isoformat(), None],
+            ['2024-01-01T00:00:00', 1],
+            [timezone.now().isoformat()],
+        ]
+        for url in (reverse('attendance:attendance-changes'), reverse('employees:employee-changes')):
+            for watermark in watermarks:
+                with self.subTest(url=url, watermark=watermark):
+                    response = self.client.get(url, {'since': encode_cursor({'w': watermark})})
+                    self.assertEqual(response.status_code, 400)
+                    self.assertEqual(response.data['message'], 'Invalid watermark')
+
+
+class AttendanceEventTests(AttendanceTestMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.token = str(EmployeeRefreshToken.for_user(self.user).access_token)
+        self.attendance = Attendance.objects.create(employee=self.employee, date=timezone.now().date(), status='Present')
+
+    def check_in(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('attendance:attendance-check-in', args=[self.attendance.pk]))
+
+    async def test_check_in_is_published(self):
+        subscription = get_broker().subscribe()
+        try:
+            await sync_to_async(self.check_in)()
+            event = await subscription.get(timeout=1)
+        finally:
+            subscription.close()
+        self.assertEqual(event['type'], 'check_in')
+        self.assertEqual(event['attendance']['attendance_id'], self.attendance.pk)
+        self.assertIsNotNone(event['attendance']['check_in_time'])
+
+    async def test_stream_requires_token(self):
+        response = await self.async_client.get(reverse('attendance:attendance-events'))
+        self.assertEqual(response.status_code, 401)
+
+    async def test_stream_forwards_events(self):
+        response = await self.async_client.get(reverse('attendance:attendance-events'), {'token': self.token})
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        chunks = aiter(response.streaming_content)
+        self.assertEqual(await anext(chunks), b'retry: 5000\n\n')
+
+        next_chunk = asyncio.ensure_future(anext(chunks))
+        await asyncio.sleep(0.05)
+        get_broker().publish({'type': 'updated', 'attendance': {'attendance_id': 1}})
+        message = (await asyncio.wait_for(next_chunk, 1)).decode()
+        await chunks.aclose()
+
+        self.assertIn('event: updated\n', message)
+        payload = json.loads(message.split('data: ', 1)[1])
+        self.assertEqual(payload['attendance'], {'attendance_id': 1})
+
+
+class AsyncReadViewTests(AttendanceTestMixin, APITestCase):
+    def setUp(self):
+        token = EmployeeRefreshToken.for_user(self.user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+    def assertSamePayload(self, name, *args, params=None, paginated=True):
+        sync_response = self.client.get(reverse(f'attendance:{name}', args=args), params)
+        async_response = self.client.get(reverse(f'attendance-async:{name}', args=args), params)
+        self.assertEqual(async_response.status_code, sync_response.status_code)
+        sync_data, async_data = sync_response.json(), async_response.json()
+        if paginated:
+            sync_data, async_data = sync_data['results'], async_data['results']
+        self.assertEqual(async_data, sync_data)
+        return async_data
+
+    def test_async_views_match_sync_views(self):
+        records = self.create_attendances(3)
+        today = timezone.now().date().isoformat()
+        self.assertEqual(len(self.assertSamePayload('today-attendance')), 3)
+        self.assertSamePayload('attendance-list')
+        self.assertSamePayload('attendance-detail', records[0].pk, paginated=False)
+        self.assertSamePayload('attendance-by-employee', records[0].employee_id)
+        self.assertSamePayload('attendance-by-date-range', params={'start_date': today, 'end_date': today})
+        self.assertSamePayload(
+            'timesheet-report', params={'start_date': today, 'end_date': today}, paginated=False
+        )
+
+    def test_async_errors_match_sync_views(self):
+        self.assertSamePayload('attendance-detail', 999999, paginated=False)
+        self.assertSamePayload('attendance-by-date-range', params={'start_date': 'x'}, paginated=False)
+        self.assertSamePayload('today-attendance', params={'fields': 'salary'}, paginated=False)
+
+    def test_async_field_selection_matches_sync_views(self):
+        record = self.create_attendances(1)[0]
+        self.assertSamePayload('attendance-list', params={'fields': 'attendance_id,status'})
+        self.assertSamePayload('attendance-detail', record.pk, params={'fields': 'department'}, paginated=False)
+
+    def test_async_views_require_authentication(self):
+        self.client.credentials()
+        response = self.client.get(reverse('attendance-async:today-attendance'))
+        self.assertEqual(response.status_code, 401)
+
+    def test_async_pagination_links_follow_through(self):
+        self.create_attendances(3)
+        url = reverse('attendance-async:attendance-list')
+        first = self.client.get(url, {'page_size': 2}).json()
+        second = self.client.get(first['next']).json()
+        self.assertEqual(len(first['results']) + len(second['results']), 3)
+        self.assertIsNone(second['next'])
+
+
+@override_settings(PERF_METRICS_SAMPLE_RATE=1.0, PERF_METRICS_TOKEN='scrape-token')
+class PerformanceMetricsTests(AttendanceTestMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        # The async test client loads the middleware in its event loop thread,
+        # after this thread's test connection was opened
+        install_on_open_connections()
+
+    def server_timing(self, response):
+        return dict(
+            (part.split(';')[0].strip(), part) for part in response['Server-Timing'].split(',')
+        )
+
+    def test_sampled_requests_report_timing_and_histograms(self):
+        self.create_attendances(2)
+        response = self.client.get(reverse('attendance:attendance-list'))
+        timing = self.server_timing(response)
+        self.assertEqual(set(timing), {'app', 'db', 'serialize'})
+        self.assertNotIn('"0 queries"', timing['db'])
+
+        scrape = self.client.get(reverse('metrics'), HTTP_AUTHORIZATION='Bearer scrape-token')
+        self.assertEqual(scrape.status_code, 200)
+        self.assertTrue(scrape['Content-Type'].startswith('text/plain; version=0.0.4'))
+        body = scrape.content.decode()
+        labels = 'view="attendance:attendance-list",method="GET"'
+        self.assertIn(f'http_requests_total{{{labels},status="200"}}', body)
+        self.assertIn(f'http_request_duration_seconds_bucket{{{labels},le="+Inf"}}', body)
+        self.assertIn(f'http_response_size_bytes_count{{{labels}}}', body)
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, 403)
+
+    async def test_async_views_count_queries_run_in_threads(self):
+        await sync_to_async(self.create_attendances)(1)
+        token = await sync_to_async(lambda: str(EmployeeRefreshToken.for_user(self.user).access_token))()
+        response = await self.async_client.get(
+            reverse('attendance-async:attendance-list'), headers={'Authorization': f'Bearer {token}'}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('"0 queries"', self.server_timing(response)['db'])
+        self.assertIn('view="attendance-async:attendance-list"', render_metrics())
+
+    @override_settings(PERF_METRICS_SAMPLE_RATE=0)
+    def test_unsampled_requests_are_untouched(self):
+        response = self.client.get(reverse('attendance:attendance-list'))
+        self.assertNotIn('Server-Timing', response)
+
+
+@skipUnless(orjson, 'orjson is not installed')
+class ORJSONRendererTests(AttendanceTestMixin, APITestCase):
+    def test_output_matches_drf_renderer(self):
+        self.create_attendances(3)
+        Attendance.objects.update(check_out_time=timezone.now())
+        data = {
+            'results': AttendanceListSerializer(Attendance.objects.for_listing(), many=True).data,
+            'raw': [timezone.now(), date(2024, 2, 29), time(9, 30, 0, 123456), Decimal('7.50'), timedelta(hours=1)],
+            'text': 'caf\u00e9 \u2028 line \u2029',
+            1: 'int key',
+        }
+        self.assertEqual(ORJSONRenderer().render(data), JSONRenderer().render(data))
+
+    def test_parser_round_trips_request_bodies(self):
+        body = JSONRenderer().render({'status': 'Present', 'employee': 1, 'note': 'café'})
+        self.assertEqual(
+            ORJSONParser().parse(io.BytesIO(body)),
+            JSONParser().parse(io.BytesIO(body)),
+        )
+        with self.assertRaises(ParseError):
+            ORJSONParser().parse(io.BytesIO(b'{"status": '))
+
+
+class LeanListSerializerTests(AttendanceTestMixin, APITestCase):
+    def test_values_serializer_matches_model_serializer(self):
+        records = self.create_attendances(3)
+        Attendance.objects.filter(pk=records[0].pk).update(check_out_time=timezone.now())
+        queryset = Attendance.objects.order_by('attendance_id')
+        for zone in ('UTC', 'Asia/Kolkata'):
+            with timezone.override(zone):
+                expected = AttendanceListSerializer(queryset.for_listing(), many=True).data
+                lean = AttendanceListValuesSerializer(AttendanceListValuesSerializer.project(queryset), many=True).data
+                self.assertEqual(lean, [dict(row) for row in expected])
+
+
+class FieldSelectionTests(AttendanceTestMixin, APITestCase):
+    MOBILE_FIELDS = ['attendance_id', 'date', 'status', 'check_in_time', 'check_out_time']
+
+    def test_fields_prune_output_and_joins(self):
+        self.create_attendances(3)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('attendance:attendance-list'), {
+                'fields': ','.join(self.MOBILE_FIELDS), 'page_size': 2,
+            })
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([list(row) for row in response.data['results']], [self.MOBILE_FIELDS] * 2)
+        self.assertNotIn('JOIN', queries[-1]['sql'])
+
+        # Cursors still carry the ordering columns
+        response = self.client.get(response.data['next'])
+        self.assertEqual([list(row) for row in response.data['results']], [self.MOBILE_FIELDS])
+
+    def test_detail_fields(self):
+        attendance = self.create_attendances(1)[0]
+        url = reverse('attendance:attendance-detail', args=[attendance.pk])
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, {'fields': 'attendance_id,employee_email'})
+        self.assertEqual(response.data, {
+            'attendance_id': attendance.pk, 'employee_email': attendance.employee.user.email,
+        })
+        self.assertEqual(len(queries), 1)
+
+    def test_unknown_fields_are_rejected(self):
+        for params in ({'fields': 'attendance_id,salary'}, {'expand': 'employee'}):
+            response = self.client.get(reverse('attendance:today-attendance'), params)
+            self.assertEqual(response.status_code, 400)
+            self.assertEqual(response.data['message'], 'Invalid field selection')
+
+    def test_unknown_fields_get_a_clean_error_from_handled_views(self):
+        # Views with a catch-all handler must not wrap the error in their own message
+        today = timezone.localdate().isoformat()
+        for url, params in (
+            (reverse('attendance:attendance-by-employee', args=[self.employee.pk]), {}),
+            (reverse('attendance:attendance-by-date-range'), {'start_date': today, 'end_date': today}),
+        ):
+            response = self.client.get(url, {**params, 'fields': 'bogus'})
+            self.assertEqual(response.status_code, 400)
+            self.assertEqual(response.data['message'], 'Invalid field selection')
+            self.assertIsInstance(response.data['error'], str)
+            self.assertIn('bogus', response.data['error'])
+
+
+class TeamAttendanceTests(AttendanceTestMixin, APITestCase):
+    def test_team_attendance_in_one_query(self):
+        lead, outsider = self.create_employee(), self.create_employee()
+        lead.manager = self.employee
+        lead.save()
+        report = Employee.objects.create(
+            user=User.objects.create_user(email='report@example.com', username='report'),
+            first_name='Team', last_name='Report', role=self.role, manager=lead,
+        )
+        today = timezone.now().date()
+        records = {
+            employee.pk: Attendance.objects.create(employee=employee, date=today, status='Present')
+            for employee in (self.employee, lead, report, outsider)
+        }
+        url = reverse('attendance:team-attendance', args=[self.employee.pk])
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(len(queries), 1)
+        self.assertEqual(
+            {row['attendance_id'] for row in response.data['results']},
+            {records[lead.pk].pk, records[report.pk].pk},
+        )
+
+        response = self.client.get(url, {'depth': 1, 'include_self': 'true'})
+        self.assertEqual(
+            {row['attendance_id'] for row in response.data['results']},
+            {records[self.employee.pk].pk, records[lead.pk].pk},
+        )
+        response = self.client.get(url, {
+            'start_date': (today - timedelta(days=2)).isoformat(),
+            'end_date': (today - timedelta(days=1)).isoformat(),
+        })
+        self.assertEqual(response.data['results'], [])
+        self.assertEqual(self.client.get(url, {'depth': 0}).status_code, 400)
+        self.assertEqual(self.client.get(reverse('attendance:team-attendance', args=[999999])).status_code, 404)
+
+
+class TeamStatusTests(AttendanceTestMixin, APITestCase):
+    def add_report(self, manager):
+        employee = self.create_employee()
+        employee.manager = manager
+        employee.save()
+        return employee
+
+    @override_settings(ATTENDANCE_WORKDAY_START='09:00', ATTENDANCE_LATE_GRACE_MINUTES=10)
+    def test_team_status_in_one_query(self):
+        day = date(2024, 3, 4)
+
+        def at(hour, minute=0):
+            return timezone.make_aware(datetime.combine(day, time(hour, minute)))
+
+        on_time, late, out, absent = (self.add_report(self.employee) for _ in range(4))
+        marked_late = self.add_report(on_time)
+        Attendance.objects.create(employee=on_time, date=day, status='Present', check_in_time=at(9, 5))
+        Attendance.objects.create(employee=late, date=day, status='Present', check_in_time=at(9, 30))
+        Attendance.objects.create(
+            employee=out, date=day, status='Present', check_in_time=at(8), check_out_time=at(12)
+        )
+        Attendance.objects.create(employee=marked_late, date=day, status='Late', check_in_time=at(8))
+        # Other days do not count
+        Attendance.objects.create(employee=absent, date=day - timedelta(days=1), status='Present', check_in_time=at(9))
+        url = reverse('attendance:team-status', args=[self.employee.pk])
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, {'date': day.isoformat()})
+        self.assertEqual(len(queries), 1)
+        members = {member['employee']: member for member in response.data['members']}
+        self.assertEqual(set(members), {on_time.pk, late.pk, out.pk, absent.pk})
+        self.assertEqual(
+            {pk: (member['state'], member['late']) for pk, member in members.items()},
+            {
+                on_time.pk: ('checked_in', False), late.pk: ('checked_in', True),
+                out.pk: ('checked_out', False), absent.pk: ('absent', False),
+            },
+        )
+        self.assertEqual(members[out.pk]['worked_seconds'], 4 * 3600)
+        self.assertEqual(members[out.pk]['shortfall_seconds'], 4 * 3600)
+        self.assertEqual(response.data['summary'], {
+            'team_size': 4, 'checked_in': 2, 'checked_out': 1, 'absent': 1, 'late': 1,
+        })
+
+        response = self.client.get(url, {'date': day.isoformat(), 'transitive': 'true'})
+        self.assertEqual(response.data['summary']['team_size'], 5)
+        self.assertEqual(response.data['summary']['late'], 2)
+
+    def test_day_is_part_of_the_join(self):
+        self.add_report(self.employee)
+        url = reverse('attendance:team-status', args=[self.employee.pk])
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(url, {'date': '2024-03-04'})
+        table = Attendance._meta.db_table
+        join = re.search(rf'LEFT OUTER JOIN "{table}" \S+ ON \((.*?)\) (?:INNER|LEFT|WHERE)', queries[0]['sql'])
+        self.assertIsNotNone(join)
+        self.assertIn('"date" = ', join.group(1))
+        self.assertIn('2024-03-04', join.group(1))
+
+    def test_errors(self):
+        url = reverse('attendance:team-status', args=[self.employee.pk])
+        self.assertEqual(self.client.get(url, {'date': '04/03/2024'}).status_code, 400)
+        self.assertEqual(self.client.get(url).data['summary']['team_size'], 0)
+        self.assertEqual(self.client.get(reverse('attendance:team-status', args=[999999])).status_code, 404)
+
+
+class SyntheticDataTests(APITestCase):
+    SUMMARY_FIELDS = (
+        'employee_id', 'date', 'worked_seconds', 'first_check_in', 'last_check_out', 'session_count',
+        'open_session_count', 'expected_seconds', 'shortfall_seconds',
+    )
+
+    def summaries(self):
+        return list(DailyAttendanceSummary.objects.order_by('employee_id', 'date').values_list(*self.SUMMARY_FIELDS))
+
+    def test_summaries_match_a_rebuild_from_the_sessions(self):
+        rng = random.Random(1)
+        roles = seed_roles(departments=2, roles_per_department=2)
+        employees = seed_employees(20, roles, rng=rng, span=4)
+        end_date = timezone.localdate() - timedelta(days=1)
+        start_date = end_date - timedelta(days=20)
+        sessions, summaries = seed_sessions(
+            [(employee.pk, employee.expected_hours) for employee in employees], start_date, end_date,
+            rng=rng, late_rate=0.3, missing_checkout_rate=0.2, split_shift_rate=0.5, absence_rate=0.1,
+        )
+
+        self.assertEqual(Attendance.objects.count(), sessions)
+        self.assertEqual(DailyAttendanceSummary.objects.count(), summaries)
+        self.assertTrue(Attendance.objects.filter(status='Late').exists())
+        self.assertTrue(Attendance.objects.filter(check_out_time__isnull=True).exists())
+        self.assertGreater(sessions, summaries)
+        self.assertFalse(Attendance.objects.filter(date__week_day__in=[1, 7]).exists())
+
+        written = self.summaries()
+        rebuild_daily_summaries(start_date, end_date)
+        self.assertEqual(self.summaries(), written)
+
+    def test_command_rebuilds_the_deferred_indexes(self):
+        def index_names():
+            with connection.cursor() as cursor:
+                constraints = connection.introspection.get_constraints(cursor, Attendance._meta.db_table)
+            return {name for name, constraint in constraints.items() if constraint['index']}
+
+        before = index_names()
+        output = io.StringIO()
+        call_command('generate_synthetic_data', employees=15, years=0.05, seed=3, stdout=output)
+
+        self.assertEqual(index_names(), before)
+        self.assertEqual(Employee.objects.count(), 15)
+        self.assertIn('rows/s', output.getvalue())
+        self.assertEqual(
+            DailyAttendanceSummary.objects.count(),
+            Attendance.objects.values('employee_id', 'date').distinct().count(),
+        )
+
+
+class SQLiteConfigurationTests(APITestCase):
+    def test_default_mode_is_stock_sqlite(self):
+        self.assertEqual(
+            sqlite_database('db.sqlite3', 'default'),
+            {'ENGINE': 'django.db.backends.sqlite3', 'NAME': 'db.sqlite3'},
+        )
+        with self.assertRaises(ImproperlyConfigured):
+            sqlite_database('db.sqlite3', 'fast')
+
+    def test_tuned_mode_applies_pragmas_on_connection(self):
+        database = sqlite_database('db.sqlite3', pragmas={'cache_size': -1024})
+        self.assertEqual(database['OPTIONS']['transaction_mode'], 'IMMEDIATE')
+        self.assertIn('PRAGMA cache_size = -1024', database['OPTIONS']['init_command'])
+        self.assertGreater(database['CONN_MAX_AGE'], 0)
+
+        # The test database is created from the tuned settings (in memory, so without WAL)
+        self.assertEqual(connection.transaction_mode, 'IMMEDIATE')
+        with connection.cursor() as cursor:
+            pragmas = {
+                name: cursor.execute(f'PRAGMA {name}').fetchone()[0]
+                for name in ('synchronous', 'busy_timeout', 'temp_store')
+            }
+        self.assertEqual(pragmas, {'synchronous': 1, 'busy_timeout': 20000, 'temp_store': 2})
+
+
+class APIBenchmarkTests(APITestCase):
+    def test_every_scenario_succeeds_and_is_compared_with_the_baseline(self):
+        with tempfile.TemporaryDirectory() as directory:
+            baseline = Path(directory) / 'baseline.json'
+            options = dict(employees=20, days=7, requests=2, signin_requests=1, warmup=0, baseline=baseline)
+            call_command('benchmark_api', save_baseline=True, stdout=io.StringIO(), **options)
+            results = json.loads(baseline.read_text())['results']
+            self.assertEqual({name: result['errors'] for name, result in results.items() if result['errors']}, {})
+
+            output = io.StringIO()
+            call_command('benchmark_api', scenarios=['today'], stdout=output, **options)
+            self.assertIn('Against the baseline', output.getvalue())
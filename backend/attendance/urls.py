@@ -12,9 +12,19 @@ urlpatterns = [
     # Check-in/Check-out endpoints
     path('<int:attendance_id>/check-in/', views.check_in, name='attendance-check-in'),
     path('<int:attendance_id>/check-out/', views.check_out, name='attendance-check-out'),
+    path('kiosk/scans/', views.kiosk_scans, name='kiosk-scans'),
     
     # Query endpoints
     path('employee/<int:employee_id>/', views.attendance_by_employee, name='attendance-by-employee'),
     path('date-range/', views.attendance_by_date_range, name='attendance-by-date-range'),
     path('today/', views.today_attendance, name='today-attendance'),
+    path('team/<int:manager_id>/', views.team_attendance, name='team-attendance'),
+    path('team/<int:manager_id>/status/', views.team_status_dashboard, name='team-status'),
+    path('changes/', views.attendance_changes, name='attendance-changes'),
+    path('events/', views.attendance_events, name='attendance-events'),
+    path('summaries/', views.daily_summaries, name='daily-summaries'),
+    
+    # Report endpoints
+    path('reports/timesheet/', views.timesheet, name='timesheet-report'),
+    path('export/', views.export_attendance, name='attendance-export'),
 ]
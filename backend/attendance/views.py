@@ -2,14 +2,30 @@ from rest_framework import status, generics
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
+from asgiref.sync import sync_to_async
+from django.db import transaction
+from django.http import HttpResponseNotAllowed, JsonResponse, StreamingHttpResponse
 from django.utils import timezone
-from datetime import datetime, timedelta
-from .models import Attendance
+from datetime import datetime
+from backend.pagination import paginated_response
+from backend.sync import changes_response
+from authentication.authentication import authenticate_bearer
+from employees.hierarchy import parse_max_depth, reports_filter
+from employees.models import Employee
+from rest_framework.exceptions import APIException, AuthenticationFailed
+from .models import Attendance, DailyAttendanceSummary
+from .events import KEEPALIVE_SECONDS, format_event, get_broker, publish_attendance_event
+from .exports import EXPORT_FORMATS, export_rows
+from .kiosk import MAX_SCANS, apply_scans
+from .reports import timesheet_report, timesheet_totals
+from .summaries import refresh_daily_summary
+from .team import team_status
 from .serializers import (
     AttendanceCreateSerializer,
     AttendanceUpdateSerializer,
     AttendanceDetailSerializer,
-    AttendanceListSerializer
+    AttendanceListValuesSerializer,
+    DailyAttendanceSummarySerializer
 )
 
 
@@ -22,6 +38,8 @@ class AttendanceCreateView(generics.CreateAPIView):
         serializer = self.get_serializer(data=request.data)
         if serializer.is_valid():
             attendance = serializer.save()
+            attendance = Attendance.objects.for_listing().get(pk=attendance.pk)
+            publish_attendance_event('created', attendance)
             detail_serializer = AttendanceDetailSerializer(attendance)
             return Response({
                 'message': 'Attendance marked successfully',
@@ -36,14 +54,22 @@ class AttendanceCreateView(generics.CreateAPIView):
 class AttendanceListView(generics.ListAPIView):
     queryset = Attendance.objects.all()
     permission_classes = (IsAuthenticated,)
-    serializer_class = AttendanceListSerializer
+    serializer_class = AttendanceListValuesSerializer
+
+    def get_queryset(self):
+        return AttendanceListValuesSerializer.project(super().get_queryset(), self.request)
 
 
 class AttendanceDetailView(generics.RetrieveUpdateAPIView):
-    queryset = Attendance.objects.all()
+    queryset = Attendance.objects.for_listing()
     permission_classes = (IsAuthenticated,)
     serializer_class = AttendanceDetailSerializer
 
+    def get_queryset(self):
+        if self.request.method == 'GET':
+            return AttendanceDetailSerializer.select_related_for(Attendance.objects.all(), self.request)
+        return super().get_queryset()
+
     def get_serializer_class(self):
         if self.request.method in ['PUT', 'PATCH']:
             return AttendanceUpdateSerializer
@@ -55,6 +81,7 @@ class AttendanceDetailView(generics.RetrieveUpdateAPIView):
         serializer = self.get_serializer(instance, data=request.data, partial=partial)
         if serializer.is_valid():
             attendance = serializer.save()
+            publish_attendance_event('updated', attendance)
             detail_serializer = AttendanceDetailSerializer(attendance)
             return Response({
                 'message': 'Attendance updated successfully',
@@ -71,9 +98,11 @@ class AttendanceDetailView(generics.RetrieveUpdateAPIView):
 def attendance_by_employee(request, employee_id):
     """Get attendance records for a specific employee"""
     try:
-        attendances = Attendance.objects.filter(employee_id=employee_id).order_by('-date')
-        serializer = AttendanceListSerializer(attendances, many=True)
-        return Response(serializer.data)
+        attendances = Attendance.objects.for_listing().filter(employee_id=employee_id)
+        return paginated_response(request, attendances, AttendanceListValuesSerializer)
+    except APIException:
+        # e.g. InvalidFieldSelection, which carries its own message/error body
+        raise
     except Exception as e:
         return Response({
             'message': 'Error fetching attendance records',
@@ -81,43 +110,54 @@ def attendance_by_employee(request, employee_id):
         }, status=status.HTTP_400_BAD_REQUEST)
 
 
-@api_view(['GET'])
-@permission_classes([IsAuthenticated])
-def attendance_by_date_range(request):
-    """Get attendance records for a specific date range"""
+def parse_date_range(request):
+    """
+    Read ``start_date``/``end_date`` (YYYY-MM-DD) from the query string.
+    Returns ``(start_date, end_date, None)`` or ``(None, None, error_response)``.
+    """
     start_date = request.query_params.get('start_date')
     end_date = request.query_params.get('end_date')
-    
+
     if not start_date or not end_date:
-        return Response({
+        return None, None, Response({
             'message': 'Both start_date and end_date are required',
             'error': 'Query parameters missing'
         }, status=status.HTTP_400_BAD_REQUEST)
-    
+
     try:
-        # Parse dates
         start_date = datetime.strptime(start_date, '%Y-%m-%d').date()
         end_date = datetime.strptime(end_date, '%Y-%m-%d').date()
-        
-        # Validate date range
-        if start_date > end_date:
-            return Response({
-                'message': 'Start date cannot be after end date',
-                'error': 'Invalid date range'
-            }, status=status.HTTP_400_BAD_REQUEST)
-        
-        attendances = Attendance.objects.filter(
-            date__range=[start_date, end_date]
-        ).order_by('-date', '-created_at')
-        
-        serializer = AttendanceListSerializer(attendances, many=True)
-        return Response(serializer.data)
-        
     except ValueError:
-        return Response({
+        return None, None, Response({
             'message': 'Invalid date format',
             'error': 'Use YYYY-MM-DD format for dates'
         }, status=status.HTTP_400_BAD_REQUEST)
+
+    if start_date > end_date:
+        return None, None, Response({
+            'message': 'Start date cannot be after end date',
+            'error': 'Invalid date range'
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    return start_date, end_date, None
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def attendance_by_date_range(request):
+    """Get attendance records for a specific date range"""
+    start_date, end_date, error_response = parse_date_range(request)
+    if error_response:
+        return error_response
+
+    try:
+        attendances = Attendance.objects.for_listing().filter(
+            date__range=[start_date, end_date]
+        )
+        return paginated_response(request, attendances, AttendanceListValuesSerializer)
+    except APIException:
+        # e.g. InvalidFieldSelection, which carries its own message/error body
+        raise
     except Exception as e:
         return Response({
             'message': 'Error fetching attendance records',
@@ -125,28 +165,105 @@ def attendance_by_date_range(request):
         }, status=status.HTTP_400_BAD_REQUEST)
 
 
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def daily_summaries(request):
+    """Get one precomputed summary row per employee-day for a date range"""
+    start_date, end_date, error_response = parse_date_range(request)
+    if error_response:
+        return error_response
+
+    summaries = DailyAttendanceSummary.objects.filter(date__range=[start_date, end_date])
+    employee_id = request.query_params.get('employee')
+    if employee_id:
+        if not employee_id.isdigit():
+            return Response({
+                'message': 'Invalid employee',
+                'error': 'employee must be an integer id'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        summaries = summaries.filter(employee_id=employee_id)
+    return paginated_response(request, summaries, DailyAttendanceSummarySerializer)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def timesheet(request):
+    """Get worked-time totals per employee, department or job role over day/week/month buckets"""
+    start_date, end_date, error_response = parse_date_range(request)
+    if error_response:
+        return error_response
+
+    group_by = request.query_params.get('group_by', 'employee')
+    bucket = request.query_params.get('bucket', 'day')
+    try:
+        results = timesheet_report(start_date, end_date, group_by=group_by, bucket=bucket)
+    except ValueError as e:
+        return Response({
+            'message': 'Invalid report parameters',
+            'error': str(e)
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    return Response({
+        'start_date': start_date,
+        'end_date': end_date,
+        'group_by': group_by,
+        'bucket': bucket,
+        'totals': timesheet_totals(results),
+        'results': results,
+    })
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def export_attendance(request):
+    """Stream attendance rows for a date range as CSV or NDJSON"""
+    start_date, end_date, error_response = parse_date_range(request)
+    if error_response:
+        return error_response
+
+    file_type = request.query_params.get('file_type', 'csv')
+    if file_type not in EXPORT_FORMATS:
+        return Response({
+            'message': 'Invalid export format',
+            'error': f"file_type must be one of: {', '.join(EXPORT_FORMATS)}"
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    content_type, extension = EXPORT_FORMATS[file_type]
+    response = StreamingHttpResponse(
+        export_rows(start_date, end_date, file_type), content_type=content_type
+    )
+    response['Content-Disposition'] = (
+        f'attachment; filename="attendance_{start_date}_{end_date}.{extension}"'
+    )
+    return response
+
+
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def check_in(request, attendance_id):
     """Mark check-in time for an attendance record"""
     try:
-        attendance = Attendance.objects.get(attendance_id=attendance_id)
-        
-        if attendance.check_in_time:
+        # Conditional UPDATE ... WHERE check_in_time IS NULL: concurrent taps race in
+        # the database and exactly one of them claims the row
+        with transaction.atomic():
+            claimed = Attendance.objects.filter(attendance_id=attendance_id).record_check_in(timezone.now())
+            attendance = Attendance.objects.for_listing().get(attendance_id=attendance_id)
+            if claimed:
+                refresh_daily_summary(attendance.employee_id, attendance.date)
+                publish_attendance_event('check_in', attendance)
+
+        if not claimed:
             return Response({
                 'message': 'Check-in already recorded',
                 'error': 'Employee has already checked in'
             }, status=status.HTTP_400_BAD_REQUEST)
-        
-        attendance.check_in_time = timezone.now()
-        attendance.save()
-        
+
         serializer = AttendanceDetailSerializer(attendance)
         return Response({
             'message': 'Check-in recorded successfully',
             'attendance': serializer.data
         }, status=status.HTTP_200_OK)
-        
+
     except Attendance.DoesNotExist:
         return Response({
             'message': 'Attendance record not found'
@@ -163,29 +280,31 @@ def check_in(request, attendance_id):
 def check_out(request, attendance_id):
     """Mark check-out time for an attendance record"""
     try:
-        attendance = Attendance.objects.get(attendance_id=attendance_id)
-        
-        if not attendance.check_in_time:
+        with transaction.atomic():
+            claimed = Attendance.objects.filter(attendance_id=attendance_id).record_check_out(timezone.now())
+            attendance = Attendance.objects.for_listing().get(attendance_id=attendance_id)
+            if claimed:
+                refresh_daily_summary(attendance.employee_id, attendance.date)
+                publish_attendance_event('check_out', attendance)
+
+        if not claimed and not attendance.check_in_time:
             return Response({
                 'message': 'Check-out failed',
                 'error': 'Employee must check in before checking out'
             }, status=status.HTTP_400_BAD_REQUEST)
-        
-        if attendance.check_out_time:
+
+        if not claimed:
             return Response({
                 'message': 'Check-out already recorded',
                 'error': 'Employee has already checked out'
             }, status=status.HTTP_400_BAD_REQUEST)
-        
-        attendance.check_out_time = timezone.now()
-        attendance.save()
-        
+
         serializer = AttendanceDetailSerializer(attendance)
         return Response({
             'message': 'Check-out recorded successfully',
             'attendance': serializer.data
         }, status=status.HTTP_200_OK)
-        
+
     except Attendance.DoesNotExist:
         return Response({
             'message': 'Attendance record not found'
@@ -197,11 +316,160 @@ def check_out(request, attendance_id):
         }, status=status.HTTP_400_BAD_REQUEST)
 
 
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def kiosk_scans(request):
+    """Apply a batch of buffered badge scans (check-in/check-out) in one transaction"""
+    scans = request.data.get('scans') if isinstance(request.data, dict) else request.data
+    if not isinstance(scans, list) or not scans:
+        return Response({
+            'message': 'Kiosk scan processing failed',
+            'error': 'Provide a non-empty list of scans'
+        }, status=status.HTTP_400_BAD_REQUEST)
+    if len(scans) > MAX_SCANS:
+        return Response({
+            'message': 'Kiosk scan processing failed',
+            'error': f'At most {MAX_SCANS} scans can be sent per request'
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    results = apply_scans(scans)
+    succeeded = sum(1 for result in results if result['success'])
+    # One event per applied scan, in scan order: a batch can check the same
+    # session in and then out
+    applied = [(result['attendance_id'], result['action']) for result in results if result['success']]
+    sessions = Attendance.objects.for_listing().in_bulk({attendance_id for attendance_id, _ in applied})
+    for attendance_id, action in applied:
+        publish_attendance_event(action, sessions[attendance_id])
+    return Response({
+        'message': 'Kiosk scans processed',
+        'succeeded': succeeded,
+        'failed': len(results) - succeeded,
+        'results': results
+    }, status=status.HTTP_200_OK)
+
+
+async def attendance_events(request):
+    """
+    Server-Sent Events stream of attendance changes (``created``, ``updated``,
+    ``check_in``, ``check_out``). Plain async Django view, so it must be served
+    through backend/asgi.py; EventSource cannot set headers, so the access token
+    may also be passed as ``?token=``.
+    """
+    if request.method != 'GET':
+        return HttpResponseNotAllowed(['GET'])
+    try:
+        user = await sync_to_async(authenticate_bearer)(request, query_param='token')
+    except AuthenticationFailed as e:
+        return JsonResponse({
+            'message': 'Authentication failed',
+            'error': e.detail
+        }, status=status.HTTP_401_UNAUTHORIZED)
+    if user is None:
+        return JsonResponse({
+            'message': 'Authentication failed',
+            'error': 'Authentication credentials were not provided.'
+        }, status=status.HTTP_401_UNAUTHORIZED)
+
+    async def stream():
+        subscription = get_broker().subscribe()
+        try:
+            yield 'retry: 5000\n\n'
+            while True:
+                event = await subscription.get(timeout=KEEPALIVE_SECONDS)
+                yield format_event(event) if event else ': keepalive\n\n'
+        finally:
+            subscription.close()
+
+    response = StreamingHttpResponse(stream(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def today_attendance(request):
     """Get today's attendance records"""
     today = timezone.now().date()
-    attendances = Attendance.objects.filter(date=today).order_by('-created_at')
-    serializer = AttendanceListSerializer(attendances, many=True)
-    return Response(serializer.data)
+    attendances = Attendance.objects.for_listing().filter(date=today)
+    return paginated_response(request, attendances, AttendanceListValuesSerializer)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def team_attendance(request, manager_id):
+    """
+    Attendance of everyone under a manager, in one query through the org chart
+    closure table. Optional ``depth`` (1 = direct reports), ``include_self``
+    and a ``start_date``/``end_date`` range.
+    """
+    try:
+        max_depth = parse_max_depth(request.query_params.get('depth'))
+    except ValueError:
+        return Response({
+            'message': 'Invalid depth',
+            'error': 'depth must be a positive integer'
+        }, status=status.HTTP_400_BAD_REQUEST)
+    include_self = request.query_params.get('include_self', '').lower() in ('1', 'true', 'yes')
+
+    attendances = Attendance.objects.filter(
+        reports_filter(manager_id, prefix='employee__', max_depth=max_depth, include_self=include_self)
+    )
+    if 'start_date' in request.query_params or 'end_date' in request.query_params:
+        start_date, end_date, error_response = parse_date_range(request)
+        if error_response:
+            return error_response
+        attendances = attendances.filter(date__range=[start_date, end_date])
+
+    response = paginated_response(request, attendances, AttendanceListValuesSerializer)
+    if not response.data['results'] and 'cursor' not in request.query_params \
+            and not Employee.objects.filter(pk=manager_id).exists():
+        return Response({
+            'message': 'Employee not found'
+        }, status=status.HTTP_404_NOT_FOUND)
+    return response
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def team_status_dashboard(request, manager_id):
+    """
+    Who on a manager's team is checked in, checked out, absent or late on
+    ``date`` (default today). Direct reports only unless ``transitive=true``.
+    """
+    day = request.query_params.get('date')
+    try:
+        day = datetime.strptime(day, '%Y-%m-%d').date() if day else timezone.now().date()
+    except ValueError:
+        return Response({
+            'message': 'Invalid date format',
+            'error': 'Use YYYY-MM-DD format for dates'
+        }, status=status.HTTP_400_BAD_REQUEST)
+    transitive = request.query_params.get('transitive', '').lower() in ('1', 'true', 'yes')
+
+    data = team_status(manager_id, day, transitive=transitive)
+    if not data['members'] and not Employee.objects.filter(pk=manager_id).exists():
+        return Response({
+            'message': 'Employee not found'
+        }, status=status.HTTP_404_NOT_FOUND)
+    return Response({'manager': manager_id, 'date': day, 'transitive': transitive, **data})
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def attendance_changes(request):
+    """
+    Attendance records created or updated after the ``since`` watermark,
+    optionally limited to one ``date`` (YYYY-MM-DD).
+    """
+    attendances = Attendance.objects.for_listing()
+    day = request.query_params.get('date')
+    if day:
+        try:
+            attendances = attendances.filter(date=datetime.strptime(day, '%Y-%m-%d').date())
+        except ValueError:
+            return Response({
+                'message': 'Invalid date format',
+                'error': 'Use YYYY-MM-DD format for dates'
+            }, status=status.HTTP_400_BAD_REQUEST)
+    return changes_response(request, attendances, AttendanceListValuesSerializer)
@@ -0,0 +1,99 @@
+"""
+JWT authentication backed by a short-lived user cache.
+
+``CachedJWTAuthentication`` keeps the authenticated user (and their employee
+id) in the cache configured by ``AUTH_USER_CACHE`` for
+``AUTH_USER_CACHE_TIMEOUT`` seconds, so repeat requests with the same token
+cost no authentication queries. Saving or deleting a user or employee drops
+the entry (see signals.py); with the default local-memory cache that only
+reaches the current process, so the timeout bounds staleness elsewhere.
+"""
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import F
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from .tokens import EMPLOYEE_ID_CLAIM
+
+
+def get_cache():
+    return caches[getattr(settings, 'AUTH_USER_CACHE', 'default')]
+
+
+def get_timeout():
+    return getattr(settings, 'AUTH_USER_CACHE_TIMEOUT', 60)
+
+
+def cache_key(user_id):
+    return f'authentication:user:{user_id}'
+
+
+def invalidate_cached_user(user_id):
+    get_cache().delete(cache_key(user_id))
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    Drop-in replacement for ``JWTAuthentication`` that serves users from the
+    cache. The returned user has an ``employee_id`` attribute taken from the
+    token claim, falling back to the value resolved when the user was loaded.
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError as e:
+            raise InvalidToken(_('Token contained no recognizable user identification')) from e
+
+        cache = get_cache()
+        key = cache_key(user_id)
+        user = cache.get(key)
+        if user is None:
+            user = self.load_user(user_id)
+            cache.set(key, user, get_timeout())
+
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_('User is inactive'), code='user_inactive')
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed(
+                    _("The user's password has been changed."), code='password_changed'
+                )
+
+        claimed = validated_token.get(EMPLOYEE_ID_CLAIM)
+        if claimed is not None:
+            user.employee_id = claimed
+        return user
+
+    def load_user(self, user_id):
+        """Fetch the user and their employee id in one query"""
+        try:
+            return (
+                self.user_model.objects
+                .annotate(employee_id=F('employee_profile__id'))
+                .get(**{api_settings.USER_ID_FIELD: user_id})
+            )
+        except self.user_model.DoesNotExist as e:
+            raise AuthenticationFailed(_('User not found'), code='user_not_found') from e
+
+
+def authenticate_bearer(request, query_param=None):
+    """
+    Authenticate a plain Django request for views that run outside DRF. The
+    token is read from the Authorization header or, if ``query_param`` is given,
+    from that query parameter. Returns the user, or None when no token was
+    sent; raises ``AuthenticationFailed`` for an invalid one.
+    """
+    authenticator = CachedJWTAuthentication()
+    raw_token = request.GET.get(query_param) if query_param else None
+    if not raw_token:
+        header = authenticator.get_header(request)
+        raw_token = authenticator.get_raw_token(header) if header else None
+    if not raw_token:
+        return None
+    return authenticator.get_user(authenticator.get_validated_token(raw_token))
@@ -1,3 +1,52 @@
-from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APITestCase
 
-# Create your tests here.
+from employees.models import Department, Employee, JobRole
+from .authentication import get_cache
+from .models import CustomUser
+from .tokens import EmployeeRefreshToken
+
+
+class CachedJWTAuthenticationTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        department = Department.objects.create(name='Engineering')
+        role = JobRole.objects.create(name='Developer', department=department)
+        cls.user = CustomUser.objects.create_user(email='ada@example.com', username='ada')
+        cls.employee = Employee.objects.create(
+            user=cls.user, first_name='Ada', last_name='Lovelace', role=role
+        )
+
+    def setUp(self):
+        get_cache().clear()
+        token = EmployeeRefreshToken.for_user(self.user).access_token
+        self.assertEqual(token['employee_id'], self.employee.pk)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+    def test_repeat_requests_cost_no_auth_queries(self):
+        url = reverse('employees:department-list')
+        self.client.get(url)
+        with self.assertNumQueries(0):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+
+    def test_profile_uses_employee_id_from_token(self):
+        url = reverse('employees:current-user-employee-profile')
+        self.client.get(url)
+        with self.assertNumQueries(1):
+            response = self.client.get(url)
+        self.assertEqual(response.data['employee']['id'], self.employee.pk)
+
+    def test_deactivation_invalidates_cached_user(self):
+        url = reverse('employees:department-list')
+        self.assertEqual(self.client.get(url).status_code, 200)
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.client.get(url).status_code, 401)
+
+    def test_employee_deactivation_is_seen_immediately(self):
+        url = reverse('employees:current-user-employee-profile')
+        self.assertEqual(self.client.get(url).status_code, 200)
+        response = self.client.delete(reverse('employees:employee-delete', args=[self.employee.pk]))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.client.get(url).status_code, 400)
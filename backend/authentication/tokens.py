@@ -0,0 +1,20 @@
+from rest_framework_simplejwt.tokens import RefreshToken
+
+EMPLOYEE_ID_CLAIM = 'employee_id'
+
+
+class EmployeeRefreshToken(RefreshToken):
+    """
+    Refresh token that also carries the user's employee id. Access tokens copy
+    the claim, so authenticated requests know the employee without a lookup.
+    """
+
+    @classmethod
+    def for_user(cls, user):
+        from employees.models import Employee
+
+        token = super().for_user(user)
+        token[EMPLOYEE_ID_CLAIM] = (
+            Employee.objects.filter(user=user).values_list('id', flat=True).first()
+        )
+        return token
@@ -6,6 +6,7 @@ from rest_framework_simplejwt.tokens import RefreshToken
 from django.contrib.auth import authenticate
 from .serializers import UserRegistrationSerializer, UserLoginSerializer, UserProfileSerializer
 from .models import CustomUser
+from .tokens import EmployeeRefreshToken
 
 
 class UserRegistrationView(generics.CreateAPIView):
@@ -17,7 +18,7 @@ class UserRegistrationView(generics.CreateAPIView):
         serializer = self.get_serializer(data=request.data)
         if serializer.is_valid():
             user = serializer.save()
-            refresh = RefreshToken.for_user(user)
+            refresh = EmployeeRefreshToken.for_user(user)
             return Response({
                 'message': 'User registered successfully',
                 'user': {
@@ -41,7 +42,7 @@ def user_login(request):
     serializer = UserLoginSerializer(data=request.data)
     if serializer.is_valid():
         user = serializer.validated_data['user']
-        refresh = RefreshToken.for_user(user)
+        refresh = EmployeeRefreshToken.for_user(user)
         return Response({
             'message': 'Login successful',
             'user': {
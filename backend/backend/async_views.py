@@ -0,0 +1,96 @@
+"""
+Helpers for async-native read views.
+
+DRF's ``APIView`` only runs synchronously, so the async read endpoints are
+plain ``async def`` Django views. ``async_api_view`` gives them the same JWT
+authentication, status codes and JSON rendering as the DRF endpoints, and
+``apaginated_data`` applies the configured keyset pagination through the async
+ORM. Rows are fetched with the async ORM; serialization runs through
+``sync_to_async`` since lean serializers may consult the reference cache.
+"""
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse
+from rest_framework import status
+from rest_framework.exceptions import APIException, AuthenticationFailed
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+from authentication.authentication import authenticate_bearer
+
+from .metrics import timer
+
+
+def render(data, status_code=status.HTTP_200_OK):
+    """Render ``data`` with the first configured DRF renderer"""
+    renderer = api_settings.DEFAULT_RENDERER_CLASSES[0]()
+    return HttpResponse(
+        renderer.render(data),
+        content_type=f'{renderer.media_type}; charset={renderer.charset}' if renderer.charset else renderer.media_type,
+        status=status_code,
+    )
+
+
+def not_authenticated(detail='Authentication credentials were not provided.'):
+    response = render({'detail': detail}, status.HTTP_401_UNAUTHORIZED)
+    response['WWW-Authenticate'] = 'Bearer realm="api"'
+    return response
+
+
+def async_api_view(view):
+    """
+    Wrap an ``async def view(request, ...)`` as an authenticated, GET-only API
+    view. The view receives a DRF ``Request`` (for ``query_params``) and
+    returns ``(data, status)`` or ``data``.
+    """
+
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            response = render(
+                {'detail': f'Method "{request.method}" not allowed.'},
+                status.HTTP_405_METHOD_NOT_ALLOWED,
+            )
+            response['Allow'] = 'GET, HEAD'
+            return response
+
+        try:
+            user = await sync_to_async(authenticate_bearer)(request)
+        except AuthenticationFailed as e:
+            return not_authenticated(e.detail)
+        if user is None:
+            return not_authenticated()
+
+        drf_request = Request(request)
+        drf_request.user = user
+        try:
+            result = await view(drf_request, *args, **kwargs)
+        except APIException as e:
+            return render(e.detail, e.status_code)
+        if isinstance(result, HttpResponse):
+            return result
+        data, status_code = result if isinstance(result, tuple) else (result, status.HTTP_200_OK)
+        return render(data, status_code)
+
+    return wrapper
+
+
+def serialize(serializer_class, rows, **serializer_kwargs):
+    with timer():
+        return serializer_class(rows, many=True, **serializer_kwargs).data
+
+
+async def apaginated_data(request, queryset, serializer_class, **serializer_kwargs):
+    """Async counterpart of ``paginated_response``; returns the response body"""
+    if hasattr(serializer_class, 'project'):
+        queryset = serializer_class.project(queryset, request)
+    serializer_kwargs.setdefault('context', {'request': request})
+    paginator = api_settings.DEFAULT_PAGINATION_CLASS()
+    page = await paginator.apaginate_queryset(queryset, request)
+    paginated = page is not None
+    if not paginated:
+        page = [row async for row in queryset]
+    # Serializers may consult caches or lookup tables synchronously
+    data = await sync_to_async(serialize)(serializer_class, page, **serializer_kwargs)
+    return paginator.get_paginated_response(data).data if paginated else data
@@ -0,0 +1,60 @@
+"""
+SQLite connection settings.
+
+``sqlite_database(name, mode)`` builds a ``DATABASES`` entry. ``'default'``
+is Django's stock configuration. ``'tuned'`` is for serving concurrent
+requests from one database file:
+
+- WAL journaling: readers do not block the writer and the writer does not
+  block readers; only writers queue behind each other.
+- ``synchronous=NORMAL``: commits skip the fsync that WAL makes
+  unnecessary for consistency. A power loss can lose the last commits but
+  does not corrupt the file.
+- A busy timeout, so a writer waits for the lock instead of failing with
+  "database is locked".
+- ``BEGIN IMMEDIATE`` for atomic blocks. A deferred transaction that reads
+  before it writes holds a read lock while waiting for the write lock; two
+  of them deadlock, and SQLite fails one at once without waiting out the
+  busy timeout. Taking the write lock up front queues them instead.
+- Memory-mapped reads, a larger page cache and in-memory temporary tables.
+- Persistent connections (``CONN_MAX_AGE``), so requests do not reopen the
+  file and rerun the pragmas.
+
+``init_command`` and ``transaction_mode`` need the SQLite backend of Django
+5.1 or later (requirements.txt).
+
+The journal mode is stored in the database file: switching back to
+``'default'`` keeps WAL until ``PRAGMA journal_mode=DELETE`` is run.
+"""
+from django.core.exceptions import ImproperlyConfigured
+
+SQLITE_MODES = ('default', 'tuned')
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'mmap_size': 256 * 1024 * 1024,
+    # Negative sizes are in KiB: 64 MiB per connection
+    'cache_size': -64 * 1024,
+    'temp_store': 'MEMORY',
+}
+BUSY_TIMEOUT = 20  # seconds
+CONN_MAX_AGE = 600  # seconds
+
+
+def sqlite_database(name, mode='tuned', pragmas=None, timeout=BUSY_TIMEOUT, conn_max_age=CONN_MAX_AGE):
+    """``DATABASES`` entry for the SQLite file ``name``; ``pragmas`` override SQLITE_PRAGMAS"""
+    if mode not in SQLITE_MODES:
+        raise ImproperlyConfigured(f"SQLite mode must be one of {', '.join(SQLITE_MODES)}, not {mode!r}")
+    database = {'ENGINE': 'django.db.backends.sqlite3', 'NAME': name}
+    if mode == 'default':
+        return database
+    pragmas = {**SQLITE_PRAGMAS, **(pragmas or {})}
+    database.update(
+        CONN_MAX_AGE=conn_max_age,
+        OPTIONS={
+            'init_command': '; '.join(f'PRAGMA {pragma} = {value}' for pragma, value in pragmas.items()),
+            'timeout': timeout,
+            'transaction_mode': 'IMMEDIATE',
+        },
+    )
+    return database
@@ -0,0 +1,215 @@
+"""
+Per-request performance metrics.
+
+``PerformanceMetricsMiddleware`` (middleware.py) opens a ``RequestStats`` for
+each sampled request. Database time is collected by an execute wrapper that
+every connection gets when it opens, and serialization time by ``timer()``
+blocks in the renderers and list helpers; both find the request's stats
+through a context variable, so queries and rendering done in
+``sync_to_async`` threads are counted for async views too. Unsampled
+requests cost one context variable lookup per query.
+
+Totals are aggregated into in-process histograms and served in the
+Prometheus text format by ``metrics_view``. Each worker process keeps its own
+registry, so scrape every worker (or run one per scrape target).
+"""
+import hmac
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.http import HttpResponse, HttpResponseForbidden
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+_current = ContextVar('request_stats', default=None)
+
+
+class RequestStats:
+    __slots__ = ('start', 'duration', 'db_queries', 'db_time', 'serialize_time', 'serializing')
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.duration = 0.0
+        self.db_queries = 0
+        self.db_time = 0.0
+        self.serialize_time = 0.0
+        self.serializing = False
+
+    def finish(self):
+        self.duration = time.perf_counter() - self.start
+
+    def server_timing(self):
+        """``Server-Timing`` header value, durations in milliseconds"""
+        return (
+            f'app;dur={self.duration * 1000:.1f}, '
+            f'db;dur={self.db_time * 1000:.1f};desc="{self.db_queries} queries", '
+            f'serialize;dur={self.serialize_time * 1000:.1f}'
+        )
+
+
+def start_request():
+    """Begin collecting for the current request; returns the token for ``end_request``"""
+    stats = RequestStats()
+    return stats, _current.set(stats)
+
+
+def end_request(token):
+    _current.reset(token)
+
+
+@contextmanager
+def timer():
+    """
+    Count the enclosed block as serialization time of the current request.
+    Nested blocks are not counted twice; queries run inside (e.g. lazily
+    loaded relations) count towards both database and serialization time.
+    """
+    stats = _current.get()
+    if stats is None or stats.serializing:
+        yield
+        return
+    stats.serializing = True
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        stats.serialize_time += time.perf_counter() - start
+        stats.serializing = False
+
+
+def record_query(execute, sql, params, many, context):
+    stats = _current.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.db_time += time.perf_counter() - start
+        stats.db_queries += 1
+
+
+def install_query_recorder(connection, **kwargs):
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+def install_on_open_connections():
+    connection_created.connect(install_query_recorder, dispatch_uid='backend.metrics.record_query')
+    for connection in connections.all(initialized_only=True):
+        install_query_recorder(connection)
+
+
+class Histogram:
+    """Cumulative-bucket histogram keyed by label values"""
+
+    def __init__(self, name, documentation, buckets, labels=('view', 'method')):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(buckets)
+        self.labels = labels
+        self.series = {}
+        self.lock = threading.Lock()
+
+    def observe(self, label_values, value):
+        index = bisect_left(self.buckets, value)
+        with self.lock:
+            series = self.series.get(label_values)
+            if series is None:
+                # Per-bucket (not yet cumulative) counts, then sum
+                series = self.series[label_values] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def collect(self):
+        yield f'# HELP {self.name} {self.documentation}'
+        yield f'# TYPE {self.name} histogram'
+        with self.lock:
+            series = [(label_values, list(counts), total) for label_values, (counts, total) in self.series.items()]
+        for label_values, counts, total in sorted(series):
+            labels = format_labels(self.labels, label_values)
+            cumulative = 0
+            for bound, count in zip(self.buckets + ('+Inf',), counts):
+                cumulative += count
+                yield f'{self.name}_bucket{{{labels},le="{bound}"}} {cumulative}'
+            yield f'{self.name}_sum{{{labels}}} {total}'
+            yield f'{self.name}_count{{{labels}}} {cumulative}'
+
+
+class Counter:
+    def __init__(self, name, documentation, labels):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self.values = {}
+        self.lock = threading.Lock()
+
+    def inc(self, label_values):
+        with self.lock:
+            self.values[label_values] = self.values.get(label_values, 0) + 1
+
+    def collect(self):
+        yield f'# HELP {self.name} {self.documentation}'
+        yield f'# TYPE {self.name} counter'
+        with self.lock:
+            values = sorted(self.values.items())
+        for label_values, value in values:
+            yield f'{self.name}{{{format_labels(self.labels, label_values)}}} {value}'
+
+
+def escape_label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def format_labels(names, values):
+    return ','.join(f'{name}="{escape_label(value)}"' for name, value in zip(names, values))
+
+
+REQUESTS = Counter('http_requests_total', 'Sampled requests.', ('view', 'method', 'status'))
+DURATION = Histogram('http_request_duration_seconds', 'Wall time spent handling the request.', DURATION_BUCKETS)
+DB_QUERIES = Histogram('http_request_db_queries', 'Database queries per request.', QUERY_BUCKETS)
+DB_DURATION = Histogram('http_request_db_duration_seconds', 'Time spent in database queries.', DURATION_BUCKETS)
+SERIALIZE_DURATION = Histogram(
+    'http_request_serialize_duration_seconds', 'Time spent serializing and rendering the response.', DURATION_BUCKETS
+)
+RESPONSE_SIZE = Histogram('http_response_size_bytes', 'Response body size (streaming responses excluded).', SIZE_BUCKETS)
+METRICS = (REQUESTS, DURATION, DB_QUERIES, DB_DURATION, SERIALIZE_DURATION, RESPONSE_SIZE)
+
+
+def observe(view, method, status, stats, size=None):
+    labels = (view, method)
+    REQUESTS.inc((view, method, str(status)))
+    DURATION.observe(labels, stats.duration)
+    DB_QUERIES.observe(labels, stats.db_queries)
+    DB_DURATION.observe(labels, stats.db_time)
+    SERIALIZE_DURATION.observe(labels, stats.serialize_time)
+    if size is not None:
+        RESPONSE_SIZE.observe(labels, size)
+
+
+def render_metrics():
+    return '\n'.join(line for metric in METRICS for line in metric.collect()) + '\n'
+
+
+def metrics_view(request):
+    """
+    Prometheus scrape endpoint. With ``PERF_METRICS_TOKEN`` set, scrapers must
+    send it as a bearer token; without one it is only served when DEBUG is on.
+    """
+    token = getattr(settings, 'PERF_METRICS_TOKEN', None)
+    if token:
+        if not hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {token}'):
+            return HttpResponseForbidden()
+    elif not settings.DEBUG:
+        return HttpResponseForbidden()
+    return HttpResponse(render_metrics(), content_type=CONTENT_TYPE)
@@ -0,0 +1,65 @@
+import random
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+from . import metrics
+
+UNRESOLVED_VIEW = '<unresolved>'
+
+
+class PerformanceMetricsMiddleware:
+    """
+    Record wall time, database queries and time, serialization time and
+    response size for a ``PERF_METRICS_SAMPLE_RATE`` fraction of requests.
+    Sampled responses get a ``Server-Timing`` header (when
+    ``PERF_METRICS_SERVER_TIMING`` is on) and are added to the histograms
+    served by ``metrics.metrics_view``. Place it first in MIDDLEWARE so the
+    wall time covers the rest of the stack.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+        metrics.install_on_open_connections()
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if not self.sampled():
+            return self.get_response(request)
+        stats, token = metrics.start_request()
+        try:
+            response = self.get_response(request)
+        finally:
+            metrics.end_request(token)
+        return self.record(request, response, stats)
+
+    async def __acall__(self, request):
+        if not self.sampled():
+            return await self.get_response(request)
+        stats, token = metrics.start_request()
+        try:
+            response = await self.get_response(request)
+        finally:
+            metrics.end_request(token)
+        return self.record(request, response, stats)
+
+    @staticmethod
+    def sampled():
+        rate = getattr(settings, 'PERF_METRICS_SAMPLE_RATE', 0)
+        return rate >= 1 or (rate > 0 and random.random() < rate)
+
+    def record(self, request, response, stats):
+        stats.finish()
+        match = getattr(request, 'resolver_match', None)
+        view = (match.view_name or match.route) if match else UNRESOLVED_VIEW
+        size = None if response.streaming else len(response.content)
+        metrics.observe(view, request.method, response.status_code, stats, size)
+        if getattr(settings, 'PERF_METRICS_SERVER_TIMING', True):
+            response['Server-Timing'] = stats.server_timing()
+        return response
@@ -0,0 +1,253 @@
+"""
+Keyset (cursor) pagination shared by the attendance and employee APIs.
+
+Pages are addressed by the ordering values of the last row served instead of
+an OFFSET, so fetching page N costs the same index range scan as page 1.
+"""
+import base64
+import binascii
+import datetime
+import json
+from functools import reduce
+from operator import or_
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+from .metrics import timer
+
+
+def encode_cursor(payload):
+    """Encode a JSON-serializable payload as an opaque URL-safe token"""
+    data = json.dumps(payload, separators=(',', ':'), default=_cursor_default)
+    return base64.urlsafe_b64encode(data.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(token):
+    """Decode a token produced by ``encode_cursor``; raises ValueError if malformed"""
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        return json.loads(base64.urlsafe_b64decode(padded.encode('ascii')).decode('utf-8'))
+    except (binascii.Error, UnicodeError, json.JSONDecodeError) as exc:
+        raise ValueError('Invalid cursor') from exc
+
+
+def _cursor_default(value):
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.isoformat()
+    return str(value)
+
+
+def ordering_field(queryset, name):
+    """The model field or annotation output field that ``name`` orders by"""
+    annotation = queryset.query.annotations.get(name)
+    if annotation is not None:
+        return annotation.output_field
+    model, parts = queryset.model, name.split('__')
+    for part in parts[:-1]:
+        model = model._meta.get_field(part).related_model
+    return model._meta.get_field(parts[-1])
+
+
+def clean_position(position, fields):
+    """
+    Convert the raw cursor values in ``position`` with their ordering
+    ``fields``; raises ValueError when one is missing, malformed or out of range
+    """
+    values = []
+    for value, field in zip(position, fields):
+        if value is None or isinstance(value, (bool, list, dict)):
+            raise ValueError('Invalid cursor')
+        try:
+            value = field.to_python(value)
+            field.run_validators(value)
+        except (ValidationError, TypeError, ValueError, OverflowError) as exc:
+            raise ValueError('Invalid cursor') from exc
+        if value is None:
+            raise ValueError('Invalid cursor')
+        values.append(value)
+    return values
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination over a multi-column ordering.
+
+    The ordering defaults to the model's ``Meta.ordering`` with the primary key
+    appended as a tie-breaker, and can be overridden per view through a
+    ``pagination_ordering`` attribute. Ordering columns must be non-null.
+    """
+    page_size = api_settings.PAGE_SIZE
+    page_size_query_param = 'page_size'
+    max_page_size = 1000
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        queryset = self.get_page_queryset(queryset, request, view)
+        if queryset is None:
+            return None
+        return self.set_page(list(queryset))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """``paginate_queryset`` for async views, fetching the page with the async ORM"""
+        queryset = self.get_page_queryset(queryset, request, view)
+        if queryset is None:
+            return None
+        return self.set_page([row async for row in queryset])
+
+    def get_page_queryset(self, queryset, request, view=None):
+        """Order and filter ``queryset`` to the requested page, plus one look-ahead row"""
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(queryset, view)
+        self.ordering_fields = [ordering_field(queryset, field.lstrip('-')) for field in self.ordering]
+
+        self.position, self.reverse = self.decode_position(request)
+        order_by = [self._flip(field) if self.reverse else field for field in self.ordering]
+        queryset = queryset.order_by(*order_by)
+        if self.position is not None:
+            queryset = queryset.filter(self.get_keyset_filter(self.position, self.reverse))
+        return queryset[:self.page_size + 1]
+
+    def set_page(self, results):
+        has_more = len(results) > self.page_size
+        results = results[:self.page_size]
+        if self.reverse:
+            results.reverse()
+
+        self.has_next = has_more if not self.reverse else self.position is not None
+        self.has_previous = self.position is not None if not self.reverse else has_more
+        self.page = results
+        return results
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    def get_page_size(self, request):
+        if self.page_size_query_param:
+            try:
+                size = int(request.query_params[self.page_size_query_param])
+                if size > 0:
+                    return min(size, self.max_page_size)
+            except (KeyError, ValueError):
+                pass
+        return self.page_size
+
+    def get_ordering(self, queryset, view=None):
+        ordering = getattr(view, 'pagination_ordering', None) or queryset.model._meta.ordering
+        pk_name = queryset.model._meta.pk.attname
+        ordering = [
+            field.replace('pk', pk_name) if field.lstrip('-') == 'pk' else field
+            for field in ordering if isinstance(field, str)
+        ]
+        if not any(field.lstrip('-') == pk_name for field in ordering):
+            descending = ordering[0].startswith('-') if ordering else False
+            ordering.append(f'-{pk_name}' if descending else pk_name)
+        return ordering
+
+    def decode_position(self, request):
+        token = request.query_params.get(self.cursor_query_param)
+        if not token:
+            return None, False
+        try:
+            payload = decode_cursor(token)
+            position, reverse = payload['p'], bool(payload.get('r', False))
+        except (ValueError, KeyError, TypeError):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(position, list) or len(position) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        try:
+            return clean_position(position, self.ordering_fields), reverse
+        except ValueError:
+            raise NotFound(self.invalid_cursor_message)
+
+    def get_keyset_filter(self, position, reverse=False):
+        """
+        Build ``(a, b, c) < (x, y, z)`` style row comparisons from the ordering,
+        expanded to OR-ed prefixes so every backend can use the index.
+        """
+        terms = []
+        for index, field in enumerate(self.ordering):
+            name = field.lstrip('-')
+            lookup = 'lt' if field.startswith('-') != reverse else 'gt'
+            equal = {other.lstrip('-'): position[i] for i, other in enumerate(self.ordering[:index])}
+            terms.append(Q(**equal, **{f'{name}__{lookup}': position[index]}))
+        keyset = reduce(or_, terms)
+
+        # Redundant bound on the leading column lets the planner start an index range scan
+        leading = self.ordering[0]
+        bound = 'lte' if leading.startswith('-') != reverse else 'gte'
+        return Q(**{f'{leading.lstrip("-")}__{bound}': position[0]}) & keyset
+
+    def get_position(self, item):
+        values = []
+        for field in self.ordering:
+            name = field.lstrip('-')
+            if isinstance(item, dict):
+                value = item[name]
+            else:
+                value = item
+                for part in name.split('__'):
+                    value = getattr(value, part)
+            values.append(value)
+        return values
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self._link(self.get_position(self.page[-1]), reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self._link(self.get_position(self.page[0]), reverse=True)
+
+    def _link(self, position, reverse):
+        payload = {'p': position}
+        if reverse:
+            payload['r'] = True
+        return replace_query_param(self.base_url, self.cursor_query_param, encode_cursor(payload))
+
+    @staticmethod
+    def _flip(field):
+        return field[1:] if field.startswith('-') else f'-{field}'
+
+
+def paginated_response(request, queryset, serializer_class, view=None, **serializer_kwargs):
+    """
+    Paginate a queryset from a function-based view with the configured pagination
+    class. Lean ``ValuesSerializer`` classes get the queryset in their projection,
+    and serializers see the request for ``?fields=`` / ``?expand=``.
+    """
+    if hasattr(serializer_class, 'project'):
+        queryset = serializer_class.project(queryset, request)
+    serializer_kwargs.setdefault('context', {'request': request})
+    paginator = api_settings.DEFAULT_PAGINATION_CLASS()
+    page = paginator.paginate_queryset(queryset, request, view=view)
+    with timer():
+        data = serializer_class(queryset if page is None else page, many=True, **serializer_kwargs).data
+    return Response(data) if page is None else paginator.get_paginated_response(data)
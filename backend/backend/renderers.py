@@ -0,0 +1,65 @@
+"""
+orjson-backed JSON renderer and parser for the REST API.
+
+Both classes are drop-in replacements for DRF's ``JSONRenderer`` and
+``JSONParser`` and produce the same bytes for the API's payloads: dates,
+datetimes and times are handed to DRF's encoder so they keep DRF's format
+(millisecond precision, ``Z`` for UTC), as are Decimals, lazy strings and
+the other types DRF knows about. If orjson is not installed, or a request
+asks for options orjson cannot honour (e.g. ``indent=4``), they fall back
+to the DRF implementations.
+"""
+import codecs
+
+from rest_framework import renderers
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.utils import encoders
+
+from .metrics import timer
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+_encoder = encoders.JSONEncoder()
+
+
+def _default(obj):
+    return _encoder.default(obj)
+
+
+class ORJSONRenderer(renderers.JSONRenderer):
+    """``JSONRenderer`` that encodes with orjson when it can produce identical output"""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        with timer():
+            return self._render(data, accepted_media_type, renderer_context)
+
+    def _render(self, data, accepted_media_type, renderer_context):
+        if data is None:
+            return b''
+        indent = self.get_indent(accepted_media_type, renderer_context or {})
+        if orjson is None or indent is not None or self.ensure_ascii or not self.compact:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        ret = orjson.dumps(data, default=_default, option=orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS)
+        # Keep DRF's escaping of U+2028/U+2029 so output stays a strict JavaScript subset
+        if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return ret
+
+
+class ORJSONParser(JSONParser):
+    """``JSONParser`` that decodes UTF-8 request bodies with orjson"""
+    renderer_class = ORJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        encoding = (parser_context or {}).get('encoding') or 'utf-8'
+        if orjson is None or codecs.lookup(encoding).name != 'utf-8':
+            return super().parse(stream, media_type, parser_context)
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError('JSON parse error - %s' % str(exc))
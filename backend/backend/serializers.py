@@ -0,0 +1,208 @@
+"""
+Lean read-only serializers for high-volume list endpoints.
+
+A ``ValuesSerializer`` reads flat rows from a ``QuerySet.values()``
+projection and builds each output dict directly, skipping model instantiation
+and DRF's per-field ``to_representation`` machinery. Subclasses must produce
+exactly the same shape and formatting as the ``ModelSerializer`` they stand in
+for, so endpoints can switch between the two without clients noticing.
+
+Both kinds of serializer honour the ``?fields=`` and ``?expand=`` query
+parameters (``FieldSelection``): ``fields`` limits the keys returned, and
+``expand`` lists the nested objects to embed, the rest being returned as ids.
+The selection also prunes the query, either the ``.values()`` columns or the
+``select_related`` joins, so unrequested data is never fetched.
+"""
+from operator import itemgetter
+
+from django.utils import timezone
+from rest_framework import serializers, status
+from rest_framework.exceptions import APIException
+
+from .metrics import timer
+
+FIELDS_QUERY_PARAM = 'fields'
+EXPAND_QUERY_PARAM = 'expand'
+
+
+def format_datetime(value):
+    """Format a datetime the way DRF's DateTimeField does (current timezone, ``Z`` for UTC)"""
+    if value is None:
+        return None
+    value = timezone.localtime(value).isoformat()
+    if value.endswith('+00:00'):
+        value = value[:-6] + 'Z'
+    return value
+
+
+def format_date(value):
+    return value.isoformat() if value is not None else None
+
+
+class InvalidFieldSelection(APIException):
+    status_code = status.HTTP_400_BAD_REQUEST
+    default_code = 'invalid_field_selection'
+
+    def __init__(self, error):
+        super().__init__({'message': 'Invalid field selection', 'error': error})
+
+
+def _parse_names(value):
+    return [name.strip() for name in value.split(',') if name.strip()]
+
+
+class FieldSelection:
+    """
+    The ``?fields=`` and ``?expand=`` parameters of a request. ``None`` means
+    the parameter was not sent: every field is returned and every expandable
+    field is embedded, as before the parameters existed. ``?expand=`` with no
+    value embeds nothing.
+    """
+
+    def __init__(self, fields=None, expand=None):
+        self.fields = fields
+        self.expand = expand
+
+    @classmethod
+    def from_request(cls, request):
+        if request is None:
+            return cls()
+        params = getattr(request, 'query_params', request.GET)
+        fields = _parse_names(params.get(FIELDS_QUERY_PARAM, ''))
+        expand = params.get(EXPAND_QUERY_PARAM)
+        return cls(
+            fields=fields or None,
+            expand=_parse_names(expand) if expand is not None else None,
+        )
+
+    def includes(self, name):
+        return self.fields is None or name in self.fields
+
+    def expands(self, name):
+        return self.expand is None or name in self.expand
+
+    def validate(self, available, expandable):
+        """Raise InvalidFieldSelection for names the serializer does not have"""
+        unknown = [name for name in self.fields or () if name not in available]
+        if unknown:
+            raise InvalidFieldSelection(
+                f"Unknown fields: {', '.join(unknown)}. Available: {', '.join(available)}"
+            )
+        unknown = [name for name in self.expand or () if name not in expandable]
+        if unknown:
+            raise InvalidFieldSelection(
+                f"Cannot expand: {', '.join(unknown)}. Expandable: {', '.join(expandable) or 'none'}"
+            )
+
+
+class ValueField:
+    """
+    One output key of a ``ValuesSerializer``: the ``.values()`` paths it reads
+    and how they are rendered. ``render`` is a function of the path values, or
+    the name of a serializer method taking them; without it the single path's
+    value is returned as is.
+    """
+
+    def __init__(self, *paths, render=None):
+        self.paths = paths
+        self.render = render
+
+    def bind(self, serializer):
+        """Return a ``row -> value`` function for ``serializer``"""
+        render = getattr(serializer, self.render) if isinstance(self.render, str) else self.render
+        if render is None:
+            return itemgetter(self.paths[0])
+        if len(self.paths) == 1:
+            path = self.paths[0]
+            return lambda row: render(row[path])
+        return lambda row: render(*(row[path] for path in self.paths))
+
+
+class ValuesSerializer:
+    """
+    Minimal read-only serializer interface (``instance``, ``many``, ``data``)
+    over ``.values()`` rows. ``fields`` maps each output key to a ``ValueField``,
+    in output order; ``expandable`` gives the field used in place of a nested
+    one when it is not expanded. ``extra_values`` are fetched but not rendered:
+    list the pagination ordering and sync columns there so cursors and
+    watermarks can be built from the rows whatever fields are selected.
+    """
+    fields = {}
+    expandable = {}
+    extra_values = ()
+
+    def __init__(self, instance=None, many=False, context=None, **kwargs):
+        self.instance = instance
+        self.many = many
+        self.context = context or {}
+        self.selected = self.get_selected_fields(FieldSelection.from_request(self.context.get('request')))
+        self.getters = [(name, field.bind(self)) for name, field in self.selected.items()]
+
+    @classmethod
+    def get_selected_fields(cls, selection):
+        selection.validate(cls.fields, cls.expandable)
+        return {
+            name: field if name not in cls.expandable or selection.expands(name) else cls.expandable[name]
+            for name, field in cls.fields.items() if selection.includes(name)
+        }
+
+    @classmethod
+    def project(cls, queryset, request=None):
+        """Return ``queryset`` as the flat ``.values()`` rows this serializer reads"""
+        fields = cls.get_selected_fields(FieldSelection.from_request(request))
+        paths = dict.fromkeys(path for field in fields.values() for path in field.paths)
+        paths.update(dict.fromkeys(cls.extra_values))
+        return queryset.values(*paths)
+
+    def to_representation(self, row):
+        return {name: getter(row) for name, getter in self.getters}
+
+    @property
+    def data(self):
+        with timer():
+            if self.many:
+                return [self.to_representation(row) for row in self.instance]
+            return self.to_representation(self.instance)
+
+
+class SparseFieldsMixin:
+    """
+    ``?fields=`` / ``?expand=`` support for ModelSerializers.
+
+    ``Meta.expandable`` maps nested fields to the attribute rendered as an id
+    when they are not expanded (e.g. ``{'role': 'role_id'}``), and
+    ``Meta.related`` maps fields to the ``select_related`` paths they read, so
+    ``select_related_for()`` joins only what the response needs. Only the
+    top-level serializer of a request applies the selection.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        selection = FieldSelection.from_request(self.context.get('request'))
+        if selection.fields is None and selection.expand is None:
+            return
+        expandable = getattr(self.Meta, 'expandable', {})
+        selection.validate(list(self.fields), expandable)
+        for name in list(self.fields):
+            if not selection.includes(name):
+                self.fields.pop(name)
+            elif name in expandable and not selection.expands(name):
+                self.fields[name] = serializers.ReadOnlyField(source=expandable[name], allow_null=True)
+
+    @classmethod
+    def select_related_for(cls, queryset, request=None):
+        """Apply the joins needed for the fields ``request`` selects"""
+        selection = FieldSelection.from_request(request)
+        expandable = getattr(cls.Meta, 'expandable', {})
+        selection.validate(cls.Meta.fields, expandable)
+        paths = []
+        for name in cls.Meta.fields:
+            if not selection.includes(name):
+                continue
+            if name in expandable and not selection.expands(name):
+                parent = '__'.join(expandable[name].split('.')[:-1])
+                paths.extend([parent] if parent else [])
+            else:
+                paths.extend(getattr(cls.Meta, 'related', {}).get(name, ()))
+        # select_related() with no arguments would follow every foreign key
+        return queryset.select_related(*dict.fromkeys(paths)) if paths else queryset
@@ -10,9 +10,12 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.1/ref/settings/
 """
 
+import os
 from pathlib import Path
 from datetime import timedelta
 
+from .database import sqlite_database
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -47,6 +50,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # First, so its wall time covers the rest of the stack
+    'backend.middleware.PerformanceMetricsMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -81,11 +86,12 @@ WSGI_APPLICATION = 'backend.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.1/ref/settings/#databases
 
+# 'tuned': WAL, pragmas, busy timeout, immediate write transactions and
+# persistent connections (backend/database.py); 'default': stock SQLite
+SQLITE_MODE = 'tuned'
+
 DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
-    }
+    'default': sqlite_database(BASE_DIR / 'db.sqlite3', SQLITE_MODE),
 }
 
 
@@ -136,12 +142,65 @@ AUTH_USER_MODEL = 'authentication.CustomUser'
 # REST Framework Configuration
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        # JWTAuthentication that serves the user from AUTH_USER_CACHE
+        'authentication.authentication.CachedJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
     ),
+    # orjson-backed JSON (same output as DRF's JSONRenderer/JSONParser, which
+    # they fall back to when orjson is not installed)
+    'DEFAULT_RENDERER_CLASSES': (
+        'backend.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
+    'DEFAULT_PARSER_CLASSES': (
+        'backend.renderers.ORJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ),
+    # Keyset pagination ordered by each model's Meta.ordering (plus pk);
+    # clients may request up to KeysetPagination.max_page_size rows via ?page_size=
+    'DEFAULT_PAGINATION_CLASS': 'backend.pagination.KeysetPagination',
+    'PAGE_SIZE': 100,
+}
+
+# Caches
+# Department/job role reference data is cached under EMPLOYEES_REFERENCE_CACHE.
+# Local memory is per process; switch the backend to Redis or Memcached to share
+# the cache (and its invalidation) across workers.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'odoo-clone-default',
+    },
 }
+EMPLOYEES_REFERENCE_CACHE = 'default'
+EMPLOYEES_REFERENCE_CACHE_TIMEOUT = 300  # seconds
+# Authenticated users are cached briefly so requests skip the user lookup;
+# saves invalidate the local process, the timeout bounds staleness elsewhere.
+AUTH_USER_CACHE = 'default'
+AUTH_USER_CACHE_TIMEOUT = 60  # seconds
+
+# Live attendance events (SSE at /api/attendance/events/, served through asgi.py).
+# LocalBroker only reaches clients connected to the same process.
+ATTENDANCE_EVENT_BROKER = 'attendance.events.LocalBroker'
+
+# Team status dashboard: a first check-in after start + grace (TIME_ZONE) is late
+ATTENDANCE_WORKDAY_START = '09:00'
+ATTENDANCE_LATE_GRACE_MINUTES = 10
+
+# changes/ feeds re-read this many seconds behind the watermark, so rows whose
+# transaction commits after a poll but carries an older updated_at are not skipped
+SYNC_OVERLAP_SECONDS = 30
+
+# Request performance metrics (Server-Timing headers and Prometheus histograms at
+# /metrics) for this fraction of requests; 0 turns the middleware into a pass-through.
+# Every request in development, none otherwise unless the environment sets a rate.
+# /metrics requires PERF_METRICS_TOKEN as a bearer token, or DEBUG when it is unset.
+PERF_METRICS_SAMPLE_RATE = float(os.environ.get('PERF_METRICS_SAMPLE_RATE', 1.0 if DEBUG else 0.0))
+PERF_METRICS_SERVER_TIMING = True
+PERF_METRICS_TOKEN = None
 
 # JWT Configuration
 SIMPLE_JWT = {
@@ -175,3 +234,7 @@ CORS_ALLOW_CREDENTIALS = True
 # Media files configuration for profile images
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
+# Square profile image renditions (pixels, by name), written after upload by a
+# pool of EMPLOYEES_IMAGE_WORKERS threads; 0 generates them inline
+EMPLOYEES_PROFILE_IMAGE_SIZES = {'thumb': 48, 'small': 96, 'medium': 256}
+EMPLOYEES_IMAGE_WORKERS = 2
@@ -0,0 +1,130 @@
+"""
+Incremental ("changes since") sync feeds.
+
+Rows are walked in ``(updated_at, pk)`` order from a client-held watermark, so
+a poll reads only the rows touched since the previous one through the
+``updated_at`` index. The watermark is an opaque token built with the same
+encoding as the pagination cursors.
+
+``updated_at`` is set from the application clock before commit, so a
+transaction that commits after a poll can carry a timestamp older than that
+poll's watermark. The last page of a poll therefore holds the watermark
+``SYNC_OVERLAP_SECONDS`` behind the current time, and the next poll reads
+that window again. Rows changed within it are sent more than once, which
+clients absorb by applying rows as upserts. A transaction that commits more
+than the overlap after it stamped its rows can still be missed.
+
+Only changes that update a row's ``updated_at`` are seen. Writes through
+``QuerySet.update()`` must set it themselves, and so must changes to related
+data that the feed serializes; for employees and attendance the model signals
+do this.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.response import Response
+
+from .metrics import timer
+from .pagination import KeysetPagination, clean_position, decode_cursor, encode_cursor
+
+WATERMARK_QUERY_PARAM = 'since'
+DEFAULT_OVERLAP_SECONDS = 30
+
+
+class InvalidWatermark(ValueError):
+    pass
+
+
+class ChangeFeed(KeysetPagination):
+    """
+    Reuses the keyset machinery with a fixed ascending ``(updated_at, pk)``
+    ordering; ``page_size`` caps how many changes one poll returns.
+    """
+
+    def __init__(self, queryset):
+        meta = queryset.model._meta
+        self.ordering = ['updated_at', meta.pk.attname]
+        self.ordering_fields = [meta.get_field('updated_at'), meta.pk]
+
+    def decode_watermark(self, token):
+        """The ``[updated_at, pk]`` position of ``token``, with both values checked and converted"""
+        try:
+            position = decode_cursor(token)['w']
+            if not isinstance(position, list) or len(position) != len(self.ordering):
+                raise ValueError('Invalid watermark')
+            position = clean_position(position, self.ordering_fields)
+        except (ValueError, KeyError, TypeError) as exc:
+            raise InvalidWatermark('Invalid watermark') from exc
+        if timezone.is_naive(position[0]):
+            raise InvalidWatermark('Invalid watermark')
+        return position
+
+    def changes(self, queryset, request):
+        """Return ``(rows, watermark, has_more)`` for the rows changed after ``?since=``"""
+        page_size = self.get_page_size(request)
+        token = request.query_params.get(WATERMARK_QUERY_PARAM)
+        queryset = queryset.order_by(*self.ordering)
+        if token:
+            queryset = queryset.filter(self.get_keyset_filter(self.decode_watermark(token)))
+
+        rows = list(queryset[:page_size + 1])
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+        if rows:
+            position = self.get_position(rows[-1])
+        elif token:
+            position = self.decode_watermark(token)
+        else:
+            return rows, None, has_more
+        if not has_more:
+            # Full pages advance, so paging through a backlog terminates
+            position = self.hold_back(position)
+        return rows, encode_cursor({'w': position}), has_more
+
+    @staticmethod
+    def hold_back(position):
+        """``position``, moved back to the start of the overlap window if it is inside it"""
+        overlap = getattr(settings, 'SYNC_OVERLAP_SECONDS', DEFAULT_OVERLAP_SECONDS)
+        if not overlap:
+            return position
+        settled = timezone.now() - timedelta(seconds=overlap)
+        if position[0] <= settled:
+            return position
+        return [settled, 0]
+
+
+def changes_response(request, queryset, serializer_class, is_tombstone=None):
+    """
+    Serve one page of changes. Rows for which ``is_tombstone(row)`` is true are
+    reported by id under ``deleted`` instead of being serialized.
+
+    Clients store ``watermark`` and send it back as ``?since=``; while
+    ``has_more`` is true they should poll again straight away.
+    """
+    if hasattr(serializer_class, 'project'):
+        queryset = serializer_class.project(queryset, request)
+    feed = ChangeFeed(queryset)
+    try:
+        rows, watermark, has_more = feed.changes(queryset, request)
+    except InvalidWatermark as e:
+        return Response({
+            'message': 'Invalid watermark',
+            'error': str(e)
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    pk_name = feed.ordering[-1]
+    deleted = [
+        row[pk_name] if isinstance(row, dict) else row.pk
+        for row in rows if is_tombstone and is_tombstone(row)
+    ]
+    changed = [row for row in rows if not (is_tombstone and is_tombstone(row))]
+    with timer():
+        results = serializer_class(changed, many=True, context={'request': request}).data
+    return Response({
+        'results': results,
+        'deleted': deleted,
+        'watermark': watermark,
+        'has_more': has_more,
+    })
@@ -18,14 +18,35 @@ from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
+from django.views.static import serve
+
+from backend.metrics import metrics_view
+from employees.images import RENDITION_DIR
+
+
+def serve_immutable(request, path, document_root=None):
+    """Serve a content-addressed media file that clients may cache forever"""
+    response = serve(request, path, document_root=document_root)
+    response['Cache-Control'] = 'public, max-age=31536000, immutable'
+    return response
+
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/auth/', include('authentication.urls')),
     path('api/attendance/', include('attendance.urls')),
     path('api/employees/', include('employees.urls')),
+    # Async-native read endpoints (same payloads), for serving through asgi.py
+    path('api/async/attendance/', include('attendance.async_urls')),
+    path('api/async/employees/', include('employees.async_urls')),
+    # Prometheus scrape endpoint for the performance middleware
+    path('metrics', metrics_view, name='metrics'),
 ]
 
 # Serve media files during development
 if settings.DEBUG:
+    urlpatterns += static(
+        f'{settings.MEDIA_URL}{RENDITION_DIR}/', view=serve_immutable,
+        document_root=settings.MEDIA_ROOT / RENDITION_DIR,
+    )
     urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
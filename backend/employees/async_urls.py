@@ -0,0 +1,11 @@
+from django.urls import path
+from . import async_views
+
+app_name = 'employees-async'
+
+urlpatterns = [
+    path('employees/', async_views.employee_list, name='employee-list'),
+    path('employees/<int:pk>/', async_views.employee_detail, name='employee-detail'),
+    path('employees/active/', async_views.employee_active, name='employee-active'),
+    path('employees/inactive/', async_views.employee_inactive, name='employee-inactive'),
+]
@@ -0,0 +1,36 @@
+"""
+Async-native versions of the employee read endpoints, mounted under
+/api/async/employees/. Payloads match the DRF views in views.py.
+"""
+from rest_framework import status
+
+from backend.async_views import apaginated_data, async_api_view
+from .models import Employee
+from .serializers import EmployeeListValuesSerializer, EmployeeProfileSerializer
+
+
+@async_api_view
+async def employee_list(request):
+    employees = Employee.objects.all()
+    return await apaginated_data(request, employees, EmployeeListValuesSerializer)
+
+
+@async_api_view
+async def employee_detail(request, pk):
+    try:
+        employee = await EmployeeProfileSerializer.select_related_for(Employee.objects.all(), request).aget(pk=pk)
+    except Employee.DoesNotExist:
+        return {'detail': 'No Employee matches the given query.'}, status.HTTP_404_NOT_FOUND
+    return EmployeeProfileSerializer(employee, context={'request': request}).data
+
+
+@async_api_view
+async def employee_active(request):
+    employees = Employee.objects.filter(is_active=True)
+    return await apaginated_data(request, employees, EmployeeListValuesSerializer)
+
+
+@async_api_view
+async def employee_inactive(request):
+    employees = Employee.objects.filter(is_active=False)
+    return await apaginated_data(request, employees, EmployeeListValuesSerializer)
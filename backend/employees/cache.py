@@ -0,0 +1,87 @@
+"""
+Versioned cache for department and job role reference data.
+
+Serialized payloads are stored under keys that embed a single version number.
+Saving or deleting a Department or JobRole bumps the version (see signals.py),
+which orphans every cached payload at once. Each payload is cached with a hash
+of its content, which serves as the ETag: a 304 Not Modified is only sent for
+the payload the process would serve, and processes holding the same data send
+the same ETag.
+
+The cache alias is configurable through ``EMPLOYEES_REFERENCE_CACHE``. With the
+default local-memory backend each process has its own version, so a write in
+one process reaches the others when their payloads expire
+(``EMPLOYEES_REFERENCE_CACHE_TIMEOUT``), on both the 200 and the 304 path;
+point the alias at a shared backend (Redis, Memcached) for immediate
+cross-process invalidation.
+"""
+import hashlib
+import json
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework import status
+from rest_framework.utils.encoders import JSONEncoder
+from rest_framework.response import Response
+
+VERSION_KEY = 'employees:reference:version'
+
+
+def get_cache():
+    return caches[getattr(settings, 'EMPLOYEES_REFERENCE_CACHE', 'default')]
+
+
+def get_timeout():
+    return getattr(settings, 'EMPLOYEES_REFERENCE_CACHE_TIMEOUT', 300)
+
+
+def get_version():
+    cache = get_cache()
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        # Seed from the clock so a lost version key never resurrects old payloads
+        cache.add(VERSION_KEY, int(time.time() * 1000), None)
+        version = cache.get(VERSION_KEY)
+    return version
+
+
+def bump_version():
+    cache = get_cache()
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.set(VERSION_KEY, int(time.time() * 1000), None)
+
+
+def content_hash(payload):
+    encoded = json.dumps(payload, cls=JSONEncoder, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(encoded.encode()).hexdigest()[:20]
+
+
+def get_or_build(name, builder):
+    """Return ``(payload, content hash)`` for ``name``, building and caching both on a miss"""
+    cache = get_cache()
+    key = f'employees:reference:{name}:v{get_version()}'
+    entry = cache.get(key)
+    if entry is None:
+        payload = builder()
+        entry = (payload, content_hash(payload))
+        cache.set(key, entry, get_timeout())
+    return entry
+
+
+def cached_response(request, name, builder):
+    """
+    Serve a reference payload with an ETag, answering 304 when the client's
+    ``If-None-Match`` matches the hash of the payload that would be served.
+    """
+    payload, digest = get_or_build(name, builder)
+    etag = f'"{name}-{digest}"'
+    if etag in [tag.strip() for tag in request.headers.get('If-None-Match', '').split(',')]:
+        response = Response(status=status.HTTP_304_NOT_MODIFIED)
+    else:
+        response = Response(payload)
+    response['ETag'] = etag
+    response['Cache-Control'] = 'private, no-cache'
+    return response
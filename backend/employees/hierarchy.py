@@ -0,0 +1,127 @@
+"""
+Closure table maintenance and queries for the manager hierarchy.
+
+``EmployeeHierarchy`` holds one row per (ancestor, descendant) pair with the
+distance between them, so "everyone under this director" and "the chain
+above this person" are single indexed joins instead of one query per level.
+Rows are written when employees are created (signals.py, the importer and
+the seeding helpers) and moved when a manager changes; ``rebuild()`` recreates
+the table from ``Employee.manager`` after raw or bulk updates.
+"""
+from django.db import transaction
+from django.db.models import F, Q
+
+from .models import Employee, EmployeeHierarchy
+
+BATCH_SIZE = 1000
+
+
+class HierarchyCycle(ValueError):
+    pass
+
+
+def parse_max_depth(value):
+    """``?depth=`` as a positive int, or None when absent; raises ValueError"""
+    if value in (None, ''):
+        return None
+    depth = int(value)
+    if depth < 1:
+        raise ValueError('depth must be a positive integer')
+    return depth
+
+
+def reports_filter(manager_id, prefix='', max_depth=None, include_self=False):
+    """
+    ``Q`` matching the employees under ``manager_id``; ``prefix`` is the path
+    to the employee (e.g. ``'employee__'`` when filtering attendance).
+    """
+    path = f'{prefix}ancestor_links__'
+    lookups = {f'{path}ancestor_id': manager_id, f'{path}depth__gte': 0 if include_self else 1}
+    if max_depth is not None:
+        lookups[f'{path}depth__lte'] = max_depth
+    return Q(**lookups)
+
+
+def reports(manager_id, max_depth=None, include_self=False):
+    """Employees under ``manager_id``, annotated with their ``depth`` below them"""
+    return Employee.objects.filter(
+        reports_filter(manager_id, max_depth=max_depth, include_self=include_self)
+    ).annotate(depth=F('ancestor_links__depth'))
+
+
+def managers(employee_id):
+    """Managers above ``employee_id``, nearest first, annotated with ``depth``"""
+    return Employee.objects.filter(
+        descendant_links__descendant_id=employee_id, descendant_links__depth__gte=1
+    ).annotate(depth=F('descendant_links__depth')).order_by('depth')
+
+
+def is_report(employee_id, manager_id):
+    """Whether ``employee_id`` is somewhere under ``manager_id``"""
+    return EmployeeHierarchy.objects.filter(
+        ancestor_id=manager_id, descendant_id=employee_id, depth__gte=1
+    ).exists()
+
+
+def add_employees(employees, batch_size=BATCH_SIZE):
+    """
+    Insert the closure rows for newly created ``employees``. Their managers
+    may be existing employees or other employees in the same call.
+    """
+    pending = {employee.pk: employee.manager_id for employee in employees}
+    if not pending:
+        return
+
+    # Chains (ancestor, depth) of the managers outside this call, including themselves
+    chains = {}
+    outside = {manager_id for manager_id in pending.values() if manager_id is not None and manager_id not in pending}
+    for ancestor_id, descendant_id, depth in EmployeeHierarchy.objects.filter(
+        descendant_id__in=outside
+    ).values_list('ancestor_id', 'descendant_id', 'depth'):
+        chains.setdefault(descendant_id, []).append((ancestor_id, depth))
+
+    for employee_id in pending:
+        # Walk up to the nearest known chain, then fill in chains on the way back down
+        path, current = [], employee_id
+        while current in pending and current not in chains and current not in path:
+            path.append(current)
+            current = pending[current]
+        # A manager cycle in existing data is cut where it closes
+        above = [] if current in path else chains.get(current, [])
+        for node in reversed(path):
+            above = chains[node] = [(node, 0)] + [(ancestor_id, depth + 1) for ancestor_id, depth in above]
+
+    EmployeeHierarchy.objects.bulk_create([
+        EmployeeHierarchy(ancestor_id=ancestor_id, descendant_id=employee_id, depth=depth)
+        for employee_id in pending
+        for ancestor_id, depth in chains[employee_id]
+    ], batch_size=batch_size)
+
+
+def move_subtree(employee_id, manager_id, batch_size=BATCH_SIZE):
+    """Re-link ``employee_id`` and everyone under them below ``manager_id`` (None for the top)"""
+    with transaction.atomic():
+        subtree = list(EmployeeHierarchy.objects.filter(ancestor_id=employee_id).values_list('descendant_id', 'depth'))
+        if not subtree:
+            EmployeeHierarchy.objects.create(ancestor_id=employee_id, descendant_id=employee_id, depth=0)
+            subtree = [(employee_id, 0)]
+        if manager_id is not None and any(descendant_id == manager_id for descendant_id, _ in subtree):
+            raise HierarchyCycle("Manager cannot be one of the employee's reports")
+
+        subtree_ids = EmployeeHierarchy.objects.filter(ancestor_id=employee_id).values('descendant_id')
+        EmployeeHierarchy.objects.filter(descendant_id__in=subtree_ids).exclude(ancestor_id__in=subtree_ids).delete()
+        if manager_id is None:
+            return
+        above = list(EmployeeHierarchy.objects.filter(descendant_id=manager_id).values_list('ancestor_id', 'depth'))
+        EmployeeHierarchy.objects.bulk_create([
+            EmployeeHierarchy(ancestor_id=ancestor_id, descendant_id=descendant_id, depth=above_depth + depth + 1)
+            for ancestor_id, above_depth in above
+            for descendant_id, depth in subtree
+        ], batch_size=batch_size)
+
+
+def rebuild(batch_size=BATCH_SIZE):
+    """Recreate the whole closure table from ``Employee.manager``"""
+    with transaction.atomic():
+        EmployeeHierarchy.objects.all().delete()
+        add_employees(Employee.objects.only('id', 'manager'), batch_size=batch_size)
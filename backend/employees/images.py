@@ -0,0 +1,167 @@
+"""
+Pre-sized profile image renditions.
+
+Originals are stored as uploaded. After the upload is committed, a small
+worker pool decodes the image once and writes square WebP and JPEG
+renditions at each size in PROFILE_IMAGE_SIZES. Renditions are named after
+a hash of the original's content, so their URLs never change meaning and can
+be cached forever; the hash is stored on ``Employee.profile_image_digest``,
+which is empty until the renditions exist.
+
+Set ``EMPLOYEES_IMAGE_WORKERS = 0`` to generate renditions inline (tests,
+management commands).
+"""
+import hashlib
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+from PIL import Image, ImageOps
+
+from .models import Employee
+
+logger = logging.getLogger(__name__)
+
+RENDITION_DIR = 'profile_images/renditions'
+# Square edge lengths in pixels, by name
+PROFILE_IMAGE_SIZES = {'thumb': 48, 'small': 96, 'medium': 256}
+# (extension, Pillow format, save options)
+FORMATS = (
+    ('webp', 'WEBP', {'quality': 80, 'method': 4}),
+    ('jpg', 'JPEG', {'quality': 82, 'optimize': True, 'progressive': True}),
+)
+DEFAULT_WORKERS = 2
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_sizes():
+    return getattr(settings, 'EMPLOYEES_PROFILE_IMAGE_SIZES', PROFILE_IMAGE_SIZES)
+
+
+def content_digest(file, chunk_size=64 * 1024):
+    """First 32 hex digits of the SHA-256 of ``file``'s content"""
+    digest = hashlib.sha256()
+    file.seek(0)
+    for chunk in iter(lambda: file.read(chunk_size), b''):
+        digest.update(chunk)
+    return digest.hexdigest()[:32]
+
+
+def rendition_name(digest, size, extension):
+    return f'{RENDITION_DIR}/{digest[:2]}/{digest}-{size}.{extension}'
+
+
+def rendition_urls(digest, build_absolute_uri=None):
+    """``{name: {'webp': url, 'jpeg': url}}`` for ``digest``, or None when there are no renditions yet"""
+    if not digest:
+        return None
+    urls = {}
+    for name, size in get_sizes().items():
+        urls[name] = {}
+        for extension, image_format, _ in FORMATS:
+            url = default_storage.url(rendition_name(digest, size, extension))
+            urls[name][image_format.lower()] = build_absolute_uri(url) if build_absolute_uri else url
+    return urls
+
+
+def render(file, sizes):
+    """Encode every rendition of the image in ``file``; yields ``(size, extension, bytes)``"""
+    file.seek(0)
+    with Image.open(file) as image:
+        # JPEG sources decode straight to roughly the largest size needed
+        largest = max(sizes)
+        image.draft('RGB', (largest * 2, largest * 2))
+        image = ImageOps.exif_transpose(image)
+        if image.mode in ('RGBA', 'LA', 'P'):
+            # JPEG has no alpha channel: flatten onto white
+            image = image.convert('RGBA')
+            background = Image.new('RGB', image.size, 'white')
+            background.paste(image, mask=image.getchannel('A'))
+            image = background
+        elif image.mode != 'RGB':
+            image = image.convert('RGB')
+
+        # Crop and scale once, then scale the smaller sizes down from the larger ones
+        for size in sorted(sizes, reverse=True):
+            image = ImageOps.fit(image, (size, size), Image.Resampling.LANCZOS)
+            for extension, image_format, options in FORMATS:
+                output = BytesIO()
+                image.save(output, image_format, **options)
+                yield size, extension, output.getvalue()
+
+
+def generate_renditions(employee_id, force=False):
+    """
+    Write the renditions of the employee's current profile image and record
+    its digest. Returns the digest, or None when there is no image.
+    """
+    employee = Employee.objects.filter(pk=employee_id).values('profile_image', 'profile_image_digest').first()
+    if employee is None or not employee['profile_image']:
+        return None
+    name = employee['profile_image']
+    with default_storage.open(name, 'rb') as original:
+        digest = content_digest(original)
+        sizes = set(get_sizes().values())
+        missing = force or any(
+            not default_storage.exists(rendition_name(digest, size, extension))
+            for size in sizes for extension, _, _ in FORMATS
+        )
+        if missing:
+            for size, extension, content in render(original, sizes):
+                path = rendition_name(digest, size, extension)
+                if default_storage.exists(path):
+                    default_storage.delete(path)
+                default_storage.save(path, ContentFile(content))
+
+    if digest != employee['profile_image_digest']:
+        # Only if the image was not replaced meanwhile; update() skips the save signals
+        Employee.objects.filter(pk=employee_id, profile_image=name).update(
+            profile_image_digest=digest, updated_at=timezone.now()
+        )
+    return digest
+
+
+def get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, 'EMPLOYEES_IMAGE_WORKERS', DEFAULT_WORKERS),
+                thread_name_prefix='profile-images',
+            )
+        return _executor
+
+
+def _generate(employee_id):
+    try:
+        generate_renditions(employee_id)
+    except Exception:
+        logger.exception('Could not generate profile image renditions for employee %s', employee_id)
+
+
+def _generate_in_worker(employee_id):
+    # Worker threads hold their own connections; drop them like a request would
+    close_old_connections()
+    try:
+        _generate(employee_id)
+    finally:
+        close_old_connections()
+
+
+def schedule_renditions(employee_id):
+    """Generate renditions once the current transaction commits, on the worker pool"""
+    def submit():
+        if getattr(settings, 'EMPLOYEES_IMAGE_WORKERS', DEFAULT_WORKERS) == 0:
+            _generate(employee_id)
+        else:
+            get_executor().submit(_generate_in_worker, employee_id)
+
+    transaction.on_commit(submit)
@@ -0,0 +1,275 @@
+"""
+Bulk employee onboarding.
+
+Rows are validated up front against in-memory lookups (existing users, job
+roles, managers), passwords are hashed in a thread pool, and valid rows are
+inserted with ``bulk_create`` in per-batch transactions, managers before
+their reports. Invalid rows are reported individually and never abort the
+rest of the import; a batch that fails in the database fails the rows that
+report to it as well.
+"""
+import csv
+import io
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import DatabaseError, transaction
+from django.utils import timezone
+from rest_framework import serializers
+
+from .hierarchy import add_employees
+from .search import add_to_index
+from .models import Employee, JobRole
+
+User = get_user_model()
+
+BATCH_SIZE = 500
+HASH_WORKERS = 4
+
+
+class EmployeeImportRowSerializer(serializers.Serializer):
+    """One onboarding row; ``role`` is a job role id or name, ``manager`` an employee id or email"""
+    email = serializers.EmailField()
+    username = serializers.CharField(max_length=150)
+    password = serializers.CharField(min_length=8, required=False)
+    first_name = serializers.CharField(max_length=50)
+    last_name = serializers.CharField(max_length=50)
+    phone_number = serializers.CharField(max_length=15, required=False)
+    address = serializers.CharField(required=False)
+    role = serializers.CharField()
+    manager = serializers.CharField(required=False)
+    expected_hours = serializers.IntegerField(min_value=1, max_value=24, default=8)
+
+    def validate_role(self, value):
+        roles = self.context['roles']
+        role = roles.get(value.strip().lower())
+        if role is None:
+            raise serializers.ValidationError(f'Unknown job role "{value}"')
+        return role
+
+
+def parse_rows(content, file_type):
+    """Parse CSV or JSON text into a list of row dicts; blank CSV cells are dropped"""
+    if file_type == 'json':
+        rows = json.loads(content)
+        if isinstance(rows, dict):
+            rows = rows.get('employees')
+        if not isinstance(rows, list):
+            raise ValueError('JSON imports must be a list of employee objects')
+        return rows
+    if file_type == 'csv':
+        reader = csv.DictReader(io.StringIO(content))
+        return [
+            {key.strip(): value.strip() for key, value in row.items() if key and value and value.strip()}
+            for row in reader
+        ]
+    raise ValueError('file_type must be csv or json')
+
+
+class EmployeeImporter:
+    """
+    Validate and insert a batch of employee rows.
+
+    ``run()`` returns ``{'created': [...], 'errors': [...]}`` where every entry
+    carries the 1-based ``row`` number of the input it refers to.
+    """
+
+    def __init__(self, rows, batch_size=BATCH_SIZE):
+        self.rows = rows
+        self.batch_size = batch_size
+        self.errors = {}
+
+    def run(self):
+        valid = self.validate()
+        valid = self.resolve_managers(valid)
+        created = self.insert(valid)
+        return {
+            'created': created,
+            'errors': [{'row': index + 1, 'errors': self.errors[index]} for index in sorted(self.errors)],
+        }
+
+    def fail(self, index, errors):
+        self.errors.setdefault(index, {}).update(errors)
+
+    def validate(self):
+        roles = {}
+        for role in JobRole.objects.all():
+            roles[str(role.pk)] = role
+            roles[role.name.lower()] = role
+        context = {'roles': roles}
+
+        valid = {}
+        for index, row in enumerate(self.rows):
+            serializer = EmployeeImportRowSerializer(data=row, context=context)
+            if serializer.is_valid():
+                data = dict(serializer.validated_data)
+                data['email'] = User.objects.normalize_email(data['email'])
+                valid[index] = data
+            else:
+                self.fail(index, serializer.errors)
+
+        # Uniqueness against the database and within the batch, in two queries
+        emails = {data['email'].lower() for data in valid.values()}
+        usernames = {data['username'] for data in valid.values()}
+        taken_emails = {
+            email.lower() for email in User.objects.filter(email__in=emails).values_list('email', flat=True)
+        } if emails else set()
+        taken_usernames = set(
+            User.objects.filter(username__in=usernames).values_list('username', flat=True)
+        ) if usernames else set()
+
+        seen_emails, seen_usernames = set(), set()
+        for index, data in list(valid.items()):
+            email = data['email'].lower()
+            if email in taken_emails or email in seen_emails:
+                self.fail(index, {'email': ['A user with this email already exists.']})
+            if data['username'] in taken_usernames or data['username'] in seen_usernames:
+                self.fail(index, {'username': ['A user with this username already exists.']})
+            seen_emails.add(email)
+            seen_usernames.add(data['username'])
+            if index in self.errors:
+                del valid[index]
+        return valid
+
+    def resolve_managers(self, valid):
+        """Map manager references to existing employees or to rows in this batch"""
+        references = {data['manager'].strip() for data in valid.values() if data.get('manager')}
+        ids = {int(ref) for ref in references if ref.isdigit()}
+        emails = {ref.lower() for ref in references if not ref.isdigit()}
+        existing_by_id = Employee.objects.in_bulk(ids) if ids else {}
+        existing_by_email = {
+            employee.user.email.lower(): employee
+            for employee in Employee.objects.select_related('user').filter(user__email__in=emails)
+        } if emails else {}
+        batch_by_email = {data['email'].lower(): index for index, data in valid.items()}
+
+        for index, data in list(valid.items()):
+            reference = (data.pop('manager', None) or '').strip()
+            data['manager_employee'] = data['manager_row'] = None
+            if not reference:
+                continue
+            if reference.isdigit():
+                data['manager_employee'] = existing_by_id.get(int(reference))
+            elif reference.lower() in batch_by_email:
+                data['manager_row'] = batch_by_email[reference.lower()]
+            else:
+                data['manager_employee'] = existing_by_email.get(reference.lower())
+            if data['manager_employee'] is None and data['manager_row'] is None:
+                self.fail(index, {'manager': [f'Unknown manager "{reference}"']})
+            elif data['manager_row'] == index:
+                self.fail(index, {'manager': ['An employee cannot be their own manager']})
+
+        # Rows whose in-batch manager failed, or that form a reporting cycle, fail too
+        changed = True
+        while changed:
+            changed = False
+            for index, data in list(valid.items()):
+                if index in self.errors:
+                    del valid[index]
+                    changed = True
+                elif data['manager_row'] is not None and data['manager_row'] not in valid:
+                    self.fail(index, {'manager': ['Manager row could not be imported']})
+                    changed = True
+        for index in self._cycle_rows(valid):
+            self.fail(index, {'manager': ['Manager references form a cycle']})
+            valid.pop(index, None)
+        return valid
+
+    @staticmethod
+    def _cycle_rows(valid):
+        cyclic = set()
+        for start in valid:
+            path, current = [], start
+            while current is not None and current not in path and current not in cyclic:
+                path.append(current)
+                current = valid[current]['manager_row'] if current in valid else None
+            if current is not None and current in path:
+                cyclic.update(path[path.index(current):])
+        return cyclic
+
+    @staticmethod
+    def _insert_order(valid):
+        """Row indexes ordered so every in-batch manager comes before its reports"""
+        depths = {}
+        for start in valid:
+            path, current = [], start
+            while current is not None and current not in depths:
+                path.append(current)
+                current = valid[current]['manager_row']
+            depth = -1 if current is None else depths[current]
+            for index in reversed(path):
+                depth += 1
+                depths[index] = depth
+        return sorted(valid, key=lambda index: (depths[index], index))
+
+    def insert(self, valid):
+        indexes = self._insert_order(valid)
+        with ThreadPoolExecutor(max_workers=HASH_WORKERS) as pool:
+            # PBKDF2 releases the GIL, so hashing parallelises across threads
+            hashes = pool.map(make_password, [valid[index].get('password') for index in indexes])
+            for index, password in zip(indexes, hashes):
+                valid[index]['password'] = password
+
+        employees_by_row, failed = {}, set()
+        for start in range(0, len(indexes), self.batch_size):
+            batch = []
+            for index in indexes[start:start + self.batch_size]:
+                # Managers are inserted first, so a failed one is already known
+                if valid[index]['manager_row'] in failed:
+                    self.fail(index, {'manager': ['Manager row could not be imported']})
+                    failed.add(index)
+                else:
+                    batch.append(index)
+            if not batch:
+                continue
+            try:
+                with transaction.atomic():
+                    users = User.objects.bulk_create([
+                        User(
+                            email=valid[index]['email'],
+                            username=valid[index]['username'],
+                            password=valid[index]['password'],
+                            first_name=valid[index]['first_name'],
+                            last_name=valid[index]['last_name'],
+                            phone_number=valid[index].get('phone_number', ''),
+                        )
+                        for index in batch
+                    ])
+                    employees = Employee.objects.bulk_create([
+                        Employee(
+                            user=user,
+                            first_name=valid[index]['first_name'],
+                            last_name=valid[index]['last_name'],
+                            address=valid[index].get('address'),
+                            role=valid[index]['role'],
+                            manager=valid[index]['manager_employee'],
+                            expected_hours=valid[index]['expected_hours'],
+                        )
+                        for index, user in zip(batch, users)
+                    ])
+            except DatabaseError as e:
+                for index in batch:
+                    self.fail(index, {'non_field_errors': [f'Database error: {e}']})
+                failed.update(batch)
+                continue
+            employees_by_row.update(zip(batch, employees))
+
+        # Link managers that were created in this import; bulk_update skips auto_now
+        linked, now = [], timezone.now()
+        for index, employee in employees_by_row.items():
+            manager_row = valid[index]['manager_row']
+            if manager_row is not None and manager_row in employees_by_row:
+                employee.manager = employees_by_row[manager_row]
+                employee.updated_at = now
+                linked.append(employee)
+        Employee.objects.bulk_update(linked, ['manager', 'updated_at'], batch_size=self.batch_size)
+        # bulk_create skips the signals that maintain the org chart and search index
+        add_employees(employees_by_row.values(), batch_size=self.batch_size)
+        add_to_index(employee.pk for employee in employees_by_row.values())
+
+        return [
+            {'row': index + 1, 'id': employee.pk, 'email': employee.user.email}
+            for index, employee in sorted(employees_by_row.items())
+        ]
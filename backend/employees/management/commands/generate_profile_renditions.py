@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+from employees.images import generate_renditions
+from employees.models import Employee
+
+
+class Command(BaseCommand):
+    help = (
+        'Generate the pre-sized profile image renditions of every employee with an image, '
+        'e.g. for images uploaded before renditions existed or after changing '
+        'EMPLOYEES_PROFILE_IMAGE_SIZES.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help='Re-encode renditions that already exist')
+
+    def handle(self, *args, **options):
+        employee_ids = Employee.objects.exclude(profile_image='').exclude(
+            profile_image__isnull=True
+        ).values_list('pk', flat=True)
+        count = 0
+        for employee_id in employee_ids.iterator():
+            try:
+                if generate_renditions(employee_id, force=options['force']):
+                    count += 1
+            except (OSError, ValueError) as e:
+                self.stderr.write(f'Employee {employee_id}: {e}')
+        self.stdout.write(self.style.SUCCESS(f'Generated renditions for {count} employees.'))
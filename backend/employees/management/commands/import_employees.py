@@ -0,0 +1,33 @@
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from employees.importers import BATCH_SIZE, EmployeeImporter, parse_rows
+
+
+class Command(BaseCommand):
+    help = 'Bulk-import employees (and their user accounts) from a CSV or JSON file.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV or JSON file to import')
+        parser.add_argument('--file-type', choices=['csv', 'json'],
+                            help='Input format; defaults to the file extension')
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE,
+                            help='Rows inserted per transaction')
+
+    def handle(self, *args, **options):
+        path = Path(options['path'])
+        file_type = options['file_type'] or path.suffix.lstrip('.').lower()
+        try:
+            rows = parse_rows(path.read_text(encoding='utf-8-sig'), file_type)
+        except (OSError, ValueError) as e:
+            raise CommandError(str(e))
+
+        report = EmployeeImporter(rows, batch_size=options['batch_size']).run()
+
+        for error in report['errors']:
+            self.stderr.write(f"Row {error['row']}: {error['errors']}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {len(report['created'])} of {len(rows)} employees "
+            f"({len(report['errors'])} rows rejected)."
+        ))
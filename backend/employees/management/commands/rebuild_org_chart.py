@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from employees import hierarchy
+from employees.models import EmployeeHierarchy
+
+
+class Command(BaseCommand):
+    help = (
+        'Recreate the org chart closure table from Employee.manager. Run after '
+        'raw SQL or queryset.update() changes to managers, which skip the signals.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=hierarchy.BATCH_SIZE,
+                            help='Rows inserted per query')
+
+    def handle(self, *args, **options):
+        hierarchy.rebuild(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Rebuilt the org chart: {EmployeeHierarchy.objects.count()} closure rows.'
+        ))
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from employees.search import has_index, rebuild_index
+
+
+class Command(BaseCommand):
+    help = (
+        'Recreate the employee full-text search index from the employee, user, '
+        'job role and department tables, e.g. after raw SQL or queryset.update() changes.'
+    )
+
+    def handle(self, *args, **options):
+        if not has_index():
+            raise CommandError('This database has no employee search index; searches use icontains lookups')
+        rebuild_index()
+        self.stdout.write(self.style.SUCCESS('Rebuilt the employee search index.'))
@@ -0,0 +1,45 @@
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def populate_hierarchy(apps, schema_editor):
+    Employee = apps.get_model('employees', 'Employee')
+    EmployeeHierarchy = apps.get_model('employees', 'EmployeeHierarchy')
+    managers = dict(Employee.objects.values_list('id', 'manager_id'))
+    rows = []
+    for employee_id in managers:
+        current, depth, seen = employee_id, 0, set()
+        while current is not None and current not in seen:
+            rows.append(EmployeeHierarchy(ancestor_id=current, descendant_id=employee_id, depth=depth))
+            seen.add(current)
+            current, depth = managers.get(current), depth + 1
+    EmployeeHierarchy.objects.bulk_create(rows, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employees', '0003_employee_updated_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EmployeeHierarchy',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('depth', models.PositiveIntegerField()),
+                ('ancestor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='descendant_links', to='employees.employee')),
+                ('descendant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ancestor_links', to='employees.employee')),
+            ],
+            options={
+                'indexes': [
+                    models.Index(fields=['ancestor', 'depth'], name='employee_hierarchy_down_idx'),
+                    models.Index(fields=['descendant', 'depth'], name='employee_hierarchy_up_idx'),
+                ],
+                'constraints': [
+                    models.UniqueConstraint(fields=('ancestor', 'descendant'), name='employee_hierarchy_unique'),
+                ],
+            },
+        ),
+        migrations.RunPython(populate_hierarchy, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,55 @@
+from django.db import migrations
+
+INDEX_TABLE = 'employees_employee_search'
+
+SOURCE = """
+    SELECT e.id, e.first_name || ' ' || e.last_name, u.email, r.name, COALESCE(d.name, '')
+    FROM employees_employee e
+    INNER JOIN {user_table} u ON u.id = e.user_id
+    INNER JOIN employees_jobrole r ON r.id = e.role_id
+    LEFT JOIN employees_department d ON d.id = r.department_id
+"""
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    source = SOURCE.format(user_table=apps.get_model('authentication', 'CustomUser')._meta.db_table)
+    if vendor == 'sqlite':
+        schema_editor.execute(
+            f"CREATE VIRTUAL TABLE {INDEX_TABLE} USING fts5("
+            "name, email, role, department, tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+        )
+        schema_editor.execute(f'INSERT INTO {INDEX_TABLE} (rowid, name, email, role, department) {source}')
+    elif vendor == 'postgresql':
+        schema_editor.execute(
+            f'CREATE TABLE {INDEX_TABLE} ('
+            'employee_id bigint PRIMARY KEY REFERENCES employees_employee (id) ON DELETE CASCADE '
+            'DEFERRABLE INITIALLY DEFERRED, document tsvector NOT NULL)'
+        )
+        schema_editor.execute(f'CREATE INDEX {INDEX_TABLE}_document ON {INDEX_TABLE} USING GIN (document)')
+        schema_editor.execute(f"""
+            INSERT INTO {INDEX_TABLE} (employee_id, document)
+            SELECT id,
+                setweight(to_tsvector('simple', name), 'A')
+                || setweight(to_tsvector('simple', email), 'B')
+                || setweight(to_tsvector('simple', role), 'C')
+                || setweight(to_tsvector('simple', department), 'D')
+            FROM ({source}) AS source (id, name, email, role, department)
+        """)
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor in ('sqlite', 'postgresql'):
+        schema_editor.execute(f'DROP TABLE IF EXISTS {INDEX_TABLE}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0001_initial'),
+        ('employees', '0004_employeehierarchy'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -51,6 +51,8 @@ class Employee(models.Model):
         blank=True,
         null=True
     )
+    # Content hash naming the pre-sized renditions (images.py); empty until they exist
+    profile_image_digest = models.CharField(max_length=64, blank=True, default='', editable=False)
     role = models.ForeignKey(JobRole, on_delete=models.CASCADE)
     expected_hours = models.IntegerField(default=8, help_text="Expected working hours per day")
     
@@ -61,6 +63,10 @@ class Employee(models.Model):
 
     class Meta:
         ordering = ['-date_joined']
+        indexes = [
+            # Incremental sync: rows changed after a (updated_at, pk) watermark
+            models.Index(fields=['updated_at', 'id'], name='employee_updated_idx'),
+        ]
 
     def __str__(self):
         try:
@@ -101,3 +107,43 @@ class Employee(models.Model):
         except Exception:
             return None
 
+    def listing_values(self):
+        """The loaded name and role columns; deferred ones are None"""
+        return tuple(self.__dict__.get(name) for name in ('first_name', 'last_name', 'role_id'))
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the loaded manager so a change can move the employee's subtree
+        instance._loaded_manager_id = instance.__dict__.get('manager_id')
+        # ... and the loaded image, so a new upload gets new renditions
+        instance._loaded_profile_image = instance.__dict__.get('profile_image')
+        # ... and the name and role, which attendance listings carry
+        instance._loaded_listing = instance.listing_values()
+        return instance
+
+
+class EmployeeHierarchy(models.Model):
+    """
+    Closure table of the manager hierarchy: one row for every (manager, report)
+    pair at any distance, plus each employee paired with themself at depth 0.
+    Kept in sync with ``Employee.manager`` by hierarchy.py.
+    """
+    ancestor = models.ForeignKey(Employee, on_delete=models.CASCADE, related_name='descendant_links')
+    descendant = models.ForeignKey(Employee, on_delete=models.CASCADE, related_name='ancestor_links')
+    depth = models.PositiveIntegerField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['ancestor', 'descendant'], name='employee_hierarchy_unique'),
+        ]
+        indexes = [
+            # Subtree below a manager, optionally limited in depth
+            models.Index(fields=['ancestor', 'depth'], name='employee_hierarchy_down_idx'),
+            # Chain of managers above an employee, nearest first
+            models.Index(fields=['descendant', 'depth'], name='employee_hierarchy_up_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.ancestor_id} -> {self.descendant_id} ({self.depth})"
+
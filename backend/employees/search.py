@@ -0,0 +1,173 @@
+"""
+Full-text employee search index.
+
+Each employee's name, email, job role and department are denormalised into
+one search row: an FTS5 table on SQLite, a weighted ``tsvector`` with a GIN
+index on PostgreSQL (both created by migration 0005). Rows are rewritten with
+set-based ``INSERT ... SELECT`` statements when an employee, their user, role
+or department changes (signals.py), and after bulk inserts. Searches match
+every query word as a prefix, for typeahead, and rank name matches above
+email, role and department matches. On SQLite, a query matching more than
+RANK_CANDIDATES employees returns name matches first, without bm25 scores.
+
+On other databases there is no index and ``search_employee_ids`` falls back
+to ``icontains`` lookups.
+"""
+import re
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.db.models import Q
+
+from .models import Department, Employee, JobRole
+
+User = get_user_model()
+
+INDEX_TABLE = 'employees_employee_search'
+MAX_TERMS = 8
+CHUNK_SIZE = 500
+
+# bm25() column weights on SQLite, in (name, email, role, department) order;
+# PostgreSQL uses the A-D tsvector weights for the same columns
+COLUMN_WEIGHTS = (10.0, 5.0, 2.0, 1.0)
+# Broader SQLite matches are not scored with bm25(), which costs a few µs per row
+RANK_CANDIDATES = 2000
+
+
+def search_terms(query):
+    """Lower-cased words of ``query``, at most MAX_TERMS"""
+    return re.findall(r'\w+', query.lower())[:MAX_TERMS]
+
+
+def has_index():
+    return connection.vendor in ('sqlite', 'postgresql')
+
+
+def _document_source(where):
+    """SELECT of (employee id, name, email, role, department) for the employees matching ``where``"""
+    return f"""
+        SELECT e.id, e.first_name || ' ' || e.last_name, u.email, r.name, COALESCE(d.name, '')
+        FROM {Employee._meta.db_table} e
+        INNER JOIN {User._meta.db_table} u ON u.id = e.user_id
+        INNER JOIN {JobRole._meta.db_table} r ON r.id = e.role_id
+        LEFT JOIN {Department._meta.db_table} d ON d.id = r.department_id
+        WHERE e.id IN ({where})
+    """
+
+
+def update_index(queryset):
+    """Rewrite the search rows of the employees in ``queryset`` from a single ``INSERT ... SELECT``"""
+    if not has_index():
+        return
+    ids_sql, params = queryset.order_by().values('id').query.sql_with_params()
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            cursor.execute(f'DELETE FROM {INDEX_TABLE} WHERE rowid IN ({ids_sql})', params)
+            cursor.execute(
+                f'INSERT INTO {INDEX_TABLE} (rowid, name, email, role, department) {_document_source(ids_sql)}',
+                params,
+            )
+        else:
+            cursor.execute(f"""
+                INSERT INTO {INDEX_TABLE} (employee_id, document)
+                SELECT id,
+                    setweight(to_tsvector('simple', name), 'A')
+                    || setweight(to_tsvector('simple', email), 'B')
+                    || setweight(to_tsvector('simple', role), 'C')
+                    || setweight(to_tsvector('simple', department), 'D')
+                FROM ({_document_source(ids_sql)}) AS source (id, name, email, role, department)
+                ON CONFLICT (employee_id) DO UPDATE SET document = EXCLUDED.document
+            """, params)
+
+
+def add_to_index(ids):
+    """Index employees by id, e.g. after ``bulk_create`` skipped the save signals"""
+    ids = list(ids)
+    for start in range(0, len(ids), CHUNK_SIZE):
+        update_index(Employee.objects.filter(pk__in=ids[start:start + CHUNK_SIZE]))
+
+
+def remove_from_index(ids):
+    if not has_index():
+        return
+    ids = list(ids)
+    column = 'rowid' if connection.vendor == 'sqlite' else 'employee_id'
+    with connection.cursor() as cursor:
+        for start in range(0, len(ids), CHUNK_SIZE):
+            chunk = ids[start:start + CHUNK_SIZE]
+            cursor.execute(
+                f"DELETE FROM {INDEX_TABLE} WHERE {column} IN ({', '.join(['%s'] * len(chunk))})", chunk
+            )
+
+
+def rebuild_index():
+    """Recreate every search row from the employee tables"""
+    if not has_index():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {INDEX_TABLE}')
+    update_index(Employee.objects.all())
+
+
+def search_employee_ids(query, limit=20, active_only=True):
+    """Ids of the employees matching every word of ``query`` as a prefix, best match first"""
+    terms = search_terms(query)
+    if not terms:
+        return []
+    if not has_index():
+        return scan_employee_ids(query, limit, active_only)
+
+    active = 'AND e.is_active' if active_only else ''
+    if connection.vendor == 'sqlite':
+        return _search_sqlite(terms, limit, active)
+
+    match = ' & '.join(f'{term}:*' for term in terms)
+    with connection.cursor() as cursor:
+        cursor.execute(f"""
+            SELECT s.employee_id FROM {INDEX_TABLE} s
+            INNER JOIN {Employee._meta.db_table} e ON e.id = s.employee_id
+            WHERE s.document @@ to_tsquery('simple', %s) {active}
+            ORDER BY ts_rank(s.document, to_tsquery('simple', %s)) DESC, s.employee_id
+            LIMIT %s
+        """, [match, match, limit])
+        return [row[0] for row in cursor.fetchall()]
+
+
+def _search_sqlite(terms, limit, active):
+    # Quoted terms cannot be read as FTS5 operators; '*' makes each a prefix query.
+    # FTS5 tables cannot be aliased in MATCH / bm25().
+    match = ' '.join(f'"{term}"*' for term in terms)
+    matches = f"""
+        SELECT {INDEX_TABLE}.rowid FROM {INDEX_TABLE}
+        INNER JOIN {Employee._meta.db_table} e ON e.id = {INDEX_TABLE}.rowid
+        WHERE {INDEX_TABLE} MATCH %s {active}
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(f'SELECT COUNT(*) FROM ({matches} LIMIT %s)', [match, RANK_CANDIDATES + 1])
+        if cursor.fetchone()[0] <= RANK_CANDIDATES:
+            weights = ', '.join(map(str, COLUMN_WEIGHTS))
+            cursor.execute(
+                f'{matches} ORDER BY bm25({INDEX_TABLE}, {weights}), {INDEX_TABLE}.rowid LIMIT %s', [match, limit]
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+        # Too broad to score every match (e.g. a one-letter prefix): name matches
+        # first, then the other columns, each in index order
+        cursor.execute(f'{matches} LIMIT %s', [f'{{name}} : ({match})', limit])
+        ids = [row[0] for row in cursor.fetchall()]
+        if len(ids) < limit:
+            cursor.execute(f'{matches} LIMIT %s', [match, limit + len(ids)])
+            seen = set(ids)
+            ids += [row[0] for row in cursor.fetchall() if row[0] not in seen][:limit - len(ids)]
+        return ids
+
+
+def scan_employee_ids(query, limit=20, active_only=True):
+    """Unindexed ``icontains`` search over the joined columns, ordered by name"""
+    employees = Employee.objects.filter(is_active=True) if active_only else Employee.objects.all()
+    for term in search_terms(query):
+        employees = employees.filter(
+            Q(first_name__icontains=term) | Q(last_name__icontains=term) | Q(user__email__icontains=term)
+            | Q(role__name__icontains=term) | Q(role__department__name__icontains=term)
+        )
+    return list(employees.order_by('first_name', 'last_name', 'id').values_list('id', flat=True)[:limit])
@@ -1,5 +1,9 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
+from backend.serializers import SparseFieldsMixin, ValueField, ValuesSerializer, format_date
+from .cache import get_or_build
+from .hierarchy import is_report
+from .images import rendition_urls
 from .models import Employee, JobRole, Department
 
 User = get_user_model()
@@ -19,6 +23,71 @@ class JobRoleSerializer(serializers.ModelSerializer):
         fields = ['id', 'name', 'description', 'department', 'created_at', 'updated_at']
 
 
+class EmployeeListValuesSerializer(ValuesSerializer):
+    """
+    Same output as EmployeeListSerializer, built from ``.values()`` rows. Nested
+    roles come from the cached job role payload (see cache.py) instead of being
+    serialized per row.
+    """
+    fields = {
+        'id': ValueField('id'),
+        'first_name': ValueField('first_name'),
+        'last_name': ValueField('last_name'),
+        'email': ValueField('user__email'),
+        'role': ValueField('role_id', render='get_role'),
+        'date_joined': ValueField('date_joined', render=format_date),
+        'is_active': ValueField('is_active'),
+        'full_name': ValueField('first_name', 'last_name', render=lambda first, last: f"{first} {last}"),
+        'profile_image_renditions': ValueField('profile_image_digest', render='get_profile_image_renditions'),
+    }
+    expandable = {'role': ValueField('role_id')}
+    # Ordering / sync watermark / tombstone columns
+    extra_values = ('id', 'date_joined', 'updated_at', 'is_active')
+
+    @property
+    def data(self):
+        if self.selected.get('role') is self.fields['role']:
+            rows = [self.instance] if not self.many else list(self.instance)
+            self.roles = job_roles_by_id({row['role_id'] for row in rows})
+        return super().data
+
+    def get_role(self, role_id):
+        return self.roles.get(role_id)
+
+    def get_profile_image_renditions(self, digest):
+        return profile_image_renditions(digest, self.context)
+
+
+class OrgChartValuesSerializer(EmployeeListValuesSerializer):
+    """List employee fields plus ``manager`` (id) and ``depth``, annotated by hierarchy.py"""
+    fields = {
+        **EmployeeListValuesSerializer.fields,
+        'manager': ValueField('manager_id'),
+        'depth': ValueField('depth'),
+    }
+    extra_values = EmployeeListValuesSerializer.extra_values + ('depth',)
+
+
+def profile_image_renditions(digest, context):
+    """Rendition URLs, absolute when the serializer has a request (like DRF's ImageField)"""
+    request = context.get('request')
+    return rendition_urls(digest, request.build_absolute_uri if request is not None else None)
+
+
+def job_roles_by_id(role_ids):
+    """Serialized job roles for ``role_ids``, from the reference cache where possible"""
+    roles, _ = get_or_build('job-roles', lambda: list(
+        JobRoleSerializer(JobRole.objects.select_related('department'), many=True).data
+    ))
+    by_id = {role['id']: role for role in roles}
+    missing = set(role_ids) - by_id.keys()
+    if missing:
+        # Created since another process cached the payload
+        for role in JobRoleSerializer(JobRole.objects.select_related('department').filter(pk__in=missing), many=True).data:
+            by_id[role['id']] = role
+    return by_id
+
+
 class EmployeeCreateSerializer(serializers.ModelSerializer):
     # User fields for creation (following authentication profile pattern)
     email = serializers.EmailField()
@@ -87,26 +156,42 @@ class EmployeeUpdateSerializer(serializers.ModelSerializer):
         if 'expected_hours' in attrs:
             if attrs['expected_hours'] < 1 or attrs['expected_hours'] > 24:
                 raise serializers.ValidationError("Expected hours must be between 1 and 24")
+
+        # Validate manager (no reporting cycles)
+        manager = attrs.get('manager')
+        if manager is not None and self.instance is not None:
+            if manager.pk == self.instance.pk or is_report(manager.pk, self.instance.pk):
+                raise serializers.ValidationError("Manager cannot be the employee or one of their reports")
         
         return attrs
 
 
-class EmployeeProfileSerializer(serializers.ModelSerializer):
+class EmployeeProfileSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     full_name = serializers.ReadOnlyField()
     email = serializers.ReadOnlyField()
     phone_number = serializers.ReadOnlyField()
     role = JobRoleSerializer(read_only=True)
     manager = serializers.SerializerMethodField()
     department = serializers.SerializerMethodField()
+    profile_image_renditions = serializers.SerializerMethodField()
     
     class Meta:
         model = Employee
         fields = [
             'id', 'first_name', 'last_name', 'email', 'address', 
             'phone_number', 'manager', 'date_joined', 'profile_image', 
-            'role', 'department', 'is_active', 'expected_hours', 'created_at', 'updated_at', 'full_name'
+            'role', 'department', 'is_active', 'expected_hours', 'created_at', 'updated_at', 'full_name',
+            'profile_image_renditions'
         ]
         read_only_fields = ['id', 'date_joined', 'created_at', 'updated_at']
+        expandable = {'role': 'role_id', 'manager': 'manager_id', 'department': 'role.department_id'}
+        related = {
+            'email': ('user',),
+            'phone_number': ('user',),
+            'role': ('role__department',),
+            'manager': ('manager__user',),
+            'department': ('role__department',),
+        }
     
     def get_manager(self, obj):
         if obj.manager:
@@ -124,15 +209,24 @@ class EmployeeProfileSerializer(serializers.ModelSerializer):
             'description': obj.department.description
         }
 
+    def get_profile_image_renditions(self, obj):
+        return profile_image_renditions(obj.profile_image_digest, self.context)
+
 
-class EmployeeListSerializer(serializers.ModelSerializer):
+class EmployeeListSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     full_name = serializers.ReadOnlyField()
     email = serializers.ReadOnlyField()
     role = JobRoleSerializer(read_only=True)
+    profile_image_renditions = serializers.SerializerMethodField()
     
     class Meta:
         model = Employee
         fields = [
             'id', 'first_name', 'last_name', 'email', 'role', 
-            'date_joined', 'is_active', 'full_name'
+            'date_joined', 'is_active', 'full_name', 'profile_image_renditions'
         ]
+        expandable = {'role': 'role_id'}
+        related = {'email': ('user',), 'role': ('role__department',)}
+
+    def get_profile_image_renditions(self, obj):
+        return profile_image_renditions(obj.profile_image_digest, self.context)
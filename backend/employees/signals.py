@@ -0,0 +1,133 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from authentication.authentication import invalidate_cached_user
+
+from . import hierarchy, images, search
+from .cache import bump_version
+from .models import Department, Employee, JobRole
+
+User = get_user_model()
+
+
+@receiver(post_save, sender=Department)
+@receiver(post_delete, sender=Department)
+@receiver(post_save, sender=JobRole)
+@receiver(post_delete, sender=JobRole)
+def invalidate_reference_cache(sender, **kwargs):
+    """Any change to a department or job role orphans every cached reference payload"""
+    bump_version()
+
+
+@receiver(post_save, sender=Employee)
+@receiver(post_delete, sender=Employee)
+def invalidate_cached_user_on_employee_change(sender, instance, **kwargs):
+    """Employee activation and deletion change what the cached auth user carries"""
+    invalidate_cached_user(instance.user_id)
+
+
+def manager_changed(instance):
+    # Deferred and never assigned: the save does not write the manager
+    if 'manager_id' not in instance.__dict__:
+        return False
+    return not hasattr(instance, '_loaded_manager_id') or instance.manager_id != instance._loaded_manager_id
+
+
+@receiver(pre_save, sender=Employee)
+def prevent_manager_cycles(sender, instance, raw=False, **kwargs):
+    if raw or instance.pk is None or not manager_changed(instance) or instance.manager_id is None:
+        return
+    if instance.manager_id == instance.pk or hierarchy.is_report(instance.manager_id, instance.pk):
+        raise hierarchy.HierarchyCycle("Manager cannot be the employee or one of their reports")
+
+
+@receiver(post_save, sender=Employee)
+def update_hierarchy(sender, instance, created, raw=False, **kwargs):
+    """Add new employees to the closure table and move subtrees whose manager changed"""
+    if raw:
+        return
+    if created:
+        hierarchy.add_employees([instance])
+    elif manager_changed(instance):
+        hierarchy.move_subtree(instance.pk, instance.manager_id)
+    instance._loaded_manager_id = instance.__dict__.get('manager_id')
+
+
+@receiver(pre_delete, sender=Employee)
+def detach_reports(sender, instance, **kwargs):
+    """Reports lose their manager (SET_NULL) without a save, so detach their subtrees here"""
+    for report_id in instance.subordinates.values_list('pk', flat=True):
+        hierarchy.move_subtree(report_id, None)
+
+
+@receiver(post_save, sender=Employee)
+def index_employee(sender, instance, raw=False, **kwargs):
+    if not raw:
+        search.update_index(Employee.objects.filter(pk=instance.pk))
+
+
+@receiver(post_delete, sender=Employee)
+def unindex_employee(sender, instance, **kwargs):
+    search.remove_from_index([instance.pk])
+
+
+def related_data_changed(employees):
+    """
+    Reindex ``employees`` and bump their ``updated_at``, so the changes feed
+    resends rows whose email, role or department changed
+    """
+    search.update_index(employees)
+    employees.update(updated_at=timezone.now())
+
+
+@receiver(post_save, sender=User)
+def reindex_user_employee(sender, instance, raw=False, update_fields=None, **kwargs):
+    """Email changes; saves that only touch other columns (e.g. last_login) are skipped"""
+    if raw or (update_fields is not None and 'email' not in update_fields):
+        return
+    related_data_changed(Employee.objects.filter(user_id=instance.pk))
+
+
+@receiver(post_save, sender=JobRole)
+def reindex_role_employees(sender, instance, created, raw=False, **kwargs):
+    if not created and not raw:
+        related_data_changed(Employee.objects.filter(role=instance))
+
+
+@receiver(post_save, sender=Department)
+def reindex_department_employees(sender, instance, created, raw=False, **kwargs):
+    if not created and not raw:
+        related_data_changed(Employee.objects.filter(role__department=instance))
+
+
+def profile_image_name(instance):
+    """The assigned profile image's name, or None when the field was deferred"""
+    if 'profile_image' not in instance.__dict__:
+        return None
+    return instance.profile_image.name or ''
+
+
+def profile_image_changed(instance):
+    name = profile_image_name(instance)
+    if name is None:
+        return False
+    loaded = getattr(instance, '_loaded_profile_image', None)
+    return name != (getattr(loaded, 'name', loaded) or '')
+
+
+@receiver(pre_save, sender=Employee)
+def reset_profile_image_digest(sender, instance, raw=False, **kwargs):
+    """A new or cleared image has no renditions until they are generated"""
+    if not raw and profile_image_changed(instance):
+        instance.profile_image_digest = ''
+
+
+@receiver(post_save, sender=Employee)
+def render_profile_image(sender, instance, raw=False, **kwargs):
+    if raw or not profile_image_changed(instance):
+        return
+    if instance.profile_image:
+        images.schedule_renditions(instance.pk)
+    instance._loaded_profile_image = instance.profile_image.name
@@ -1,3 +1,539 @@
-from django.test import TestCase
+import io
+import itertools
+import shutil
+import tempfile
+import time
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.db import DatabaseError, connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from PIL import Image
+from rest_framework.test import APITestCase
+
+from authentication.tokens import EmployeeRefreshToken
+from backend.pagination import encode_cursor
+from .cache import get_cache, get_timeout
+from .hierarchy import HierarchyCycle
+from .images import rendition_name
+from .importers import EmployeeImporter
+from .models import Department, JobRole, Employee, EmployeeHierarchy
+from .serializers import EmployeeListSerializer, EmployeeListValuesSerializer, JobRoleSerializer, job_roles_by_id
+
+User = get_user_model()
+
+
+class EmployeeTestMixin:
+    """Shared fixtures for the employee API tests"""
+    sequence = itertools.count()
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.department = Department.objects.create(name='Engineering', description='Builds things')
+        cls.role = JobRole.objects.create(name='Developer', department=cls.department)
+        cls.user = User.objects.create_user(
+            email='owner@example.com', username='owner', password='testpass123'
+        )
+        cls.employee = Employee.objects.create(
+            user=cls.user, first_name='Ada', last_name='Lovelace', role=cls.role
+        )
+
+    def setUp(self):
+        self.client.force_authenticate(user=self.user)
+
+    @classmethod
+    def create_employee(cls, **kwargs):
+        index = next(cls.sequence)
+        user = User.objects.create_user(
+            email=f'employee{index}@example.com', username=f'employee{index}'
+        )
+        kwargs.setdefault('role', cls.role)
+        return Employee.objects.create(
+            user=user, first_name='Employee', last_name=str(index), **kwargs
+        )
+
+
+class EmployeePaginationTests(EmployeeTestMixin, APITestCase):
+    def test_cursor_walks_every_employee_once(self):
+        for _ in range(4):
+            self.create_employee()
+        url = reverse('employees:employee-list')
+
+        ids = []
+        response = self.client.get(url, {'page_size': 2})
+        while True:
+            ids.extend(row['id'] for row in response.data['results'])
+            if not response.data['next']:
+                break
+            response = self.client.get(response.data['next'])
+
+        expected = list(Employee.objects.order_by('-date_joined', '-id').values_list('id', flat=True))
+        self.assertEqual(ids, expected)
+
+    def test_malformed_cursor_values_are_rejected(self):
+        for url, position in (
+            (reverse('employees:employee-list'), ['abc', 1]),
+            (reverse('employees:employee-list'), ['2024-03-04', 'x']),
+            (reverse('employees:employee-list'), [None, 1]),
+            # Ordered by the annotated depth
+            (reverse('employees:employee-reports', args=[self.employee.pk]), ['deep', 1]),
+        ):
+            response = self.client.get(url, {'cursor': encode_cursor({'p': position})})
+            self.assertEqual(response.status_code, 404, (url, position))
+
+    def test_reference_lists_are_not_paginated(self):
+        response = self.client.get(reverse('employees:department-list'))
+        self.assertEqual(response.data[0]['name'], 'Engineering')
+
+
+class ReferenceCacheTests(EmployeeTestMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        get_cache().clear()
+
+    def test_cached_list_skips_the_database(self):
+        url = reverse('employees:job-role-list')
+        self.client.get(url)
+        with self.assertNumQueries(0):
+            response = self.client.get(url)
+        self.assertEqual(response.data[0]['department']['name'], 'Engineering')
+
+    def test_matching_etag_returns_304(self):
+        url = reverse('employees:department-list')
+        etag = self.client.get(url)['ETag']
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+
+    def test_expired_payload_is_not_answered_with_304(self):
+        url = reverse('employees:department-detail', args=[self.department.pk])
+        etag = self.client.get(url)['ETag']
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        # A write that did not bump this process's version, e.g. made by another worker
+        Department.objects.filter(pk=self.department.pk).update(name='Platform')
+        expired = time.time() + get_timeout() + 1
+        with mock.patch('django.core.cache.backends.locmem.time.time', return_value=expired):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['name'], 'Platform')
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_save_and_delete_invalidate(self):
+        url = reverse('employees:department-detail', args=[self.department.pk])
+        etag = self.client.get(url)['ETag']
+
+        self.department.name = 'Platform'
+        self.department.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['name'], 'Platform')
+
+        list_url = reverse('employees:job-role-list')
+        self.assertEqual(len(self.client.get(list_url).data), 1)
+        JobRole.objects.create(name='Tester', department=self.department)
+        self.assertEqual(len(self.client.get(list_url).data), 2)
+        self.role.delete()
+        self.assertEqual(len(self.client.get(list_url).data), 1)
+
+
+@override_settings(SYNC_OVERLAP_SECONDS=0)
+class EmployeeChangesTests(EmployeeTestMixin, APITestCase):
+    def test_deactivated_employees_are_tombstones(self):
+        url = reverse('employees:employee-changes')
+        watermark = self.client.get(url).data['watermark']
+        self.assertEqual(self.client.get(url, {'since': watermark}).data['results'], [])
+
+        hired = self.create_employee()
+        self.client.delete(reverse('employees:employee-delete', args=[self.employee.pk]))
+        response = self.client.get(url, {'since': watermark})
+        self.assertEqual([row['id'] for row in response.data['results']], [hired.pk])
+        self.assertEqual(response.data['deleted'], [self.employee.pk])
+
+    def test_related_changes_resend_employees(self):
+        url = reverse('employees:employee-changes')
+        watermark = self.client.get(url).data['watermark']
+
+        def poll():
+            nonlocal watermark
+            response = self.client.get(url, {'since': watermark})
+            watermark = response.data['watermark']
+            return response.data['results']
+
+        self.user.email = 'ada@example.com'
+        self.user.save()
+        self.assertEqual([row['email'] for row in poll()], ['ada@example.com'])
+        self.role.name = 'Engineer'
+        self.role.save()
+        self.assertEqual([row['role']['name'] for row in poll()], ['Engineer'])
+        self.department.name = 'Platform'
+        self.department.save()
+        self.assertEqual([row['role']['department']['name'] for row in poll()], ['Platform'])
+        self.assertEqual(poll(), [])
+
+
+class AsyncEmployeeViewTests(EmployeeTestMixin, APITestCase):
+    def setUp(self):
+        token = EmployeeRefreshToken.for_user(self.user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+    def test_async_views_match_sync_views(self):
+        manager = self.create_employee()
+        report = self.create_employee(manager=manager)
+        for name, args in [
+            ('employee-list', []), ('employee-active', []), ('employee-detail', [report.pk]),
+        ]:
+            sync_response = self.client.get(reverse(f'employees:{name}', args=args))
+            async_response = self.client.get(reverse(f'employees-async:{name}', args=args))
+            self.assertEqual(async_response.status_code, 200)
+            sync_data, async_data = sync_response.json(), async_response.json()
+            if 'results' in sync_data:
+                sync_data, async_data = sync_data['results'], async_data['results']
+            self.assertEqual(async_data, sync_data)
+
+
+class LeanListSerializerTests(EmployeeTestMixin, APITestCase):
+    def test_values_serializer_matches_model_serializer(self):
+        get_cache().clear()
+        other = JobRole.objects.create(name='Designer', department=self.department)
+        self.create_employee(role=other, is_active=False)
+        queryset = Employee.objects.order_by('id')
+        expected = EmployeeListSerializer(queryset, many=True).data
+        lean = EmployeeListValuesSerializer(EmployeeListValuesSerializer.project(queryset), many=True).data
+        self.assertEqual(lean, [dict(row) for row in expected])
+
+    def test_roles_missing_from_cached_payload_are_loaded(self):
+        job_roles_by_id([self.role.pk])
+        # Bypasses the save signal, like a role created in another process
+        JobRole.objects.bulk_create([JobRole(name='Analyst', department=self.department)])
+        analyst = JobRole.objects.get(name='Analyst')
+        self.assertEqual(job_roles_by_id([analyst.pk])[analyst.pk]['name'], 'Analyst')
+
+
+class EmployeeImportTests(EmployeeTestMixin, APITestCase):
+    url = reverse('employees:employee-import')
+
+    def setUp(self):
+        self.user.is_staff = True
+        self.user.save()
+        super().setUp()
+
+    def row(self, name, **extra):
+        return {
+            'email': f'{name}@example.com', 'username': name,
+            'first_name': name.title(), 'last_name': 'Import', 'role': 'Developer', **extra
+        }
+
+    def test_json_import_creates_users_and_resolves_managers(self):
+        rows = [
+            self.row('grace', manager='lead@example.com', password='s3cret-pass'),
+            self.row('lead', role=str(self.role.pk), manager=str(self.employee.pk)),
+        ]
+
+        response = self.client.post(self.url, {'employees': rows}, format='json')
+
+        self.assertEqual(response.data['created_count'], 2, response.data)
+        grace = Employee.objects.get(user__email='grace@example.com')
+        self.assertEqual(grace.manager.user.email, 'lead@example.com')
+        self.assertEqual(grace.manager.manager, self.employee)
+        self.assertTrue(grace.user.check_password('s3cret-pass'))
+        self.assertFalse(grace.manager.user.has_usable_password())
+        self.assertEqual(
+            list(EmployeeHierarchy.objects.filter(descendant=grace).order_by('depth').values_list('ancestor_id', flat=True)),
+            [grace.pk, grace.manager_id, self.employee.pk],
+        )
+
+    def test_invalid_rows_are_reported_without_aborting(self):
+        rows = [
+            self.row('ok'),
+            self.row('owner'),  # email taken
+            self.row('norole', role='Astronaut'),
+            self.row('orphan', manager='nobody@example.com'),
+            self.row('follower', manager='norole@example.com'),
+            self.row('loop-a', manager='loop-b@example.com'),
+            self.row('loop-b', manager='loop-a@example.com'),
+        ]
+
+        response = self.client.post(self.url, rows, format='json')
+
+        self.assertEqual([c['row'] for c in response.data['created']], [1])
+        self.assertEqual([e['row'] for e in response.data['errors']], [2, 3, 4, 5, 6, 7])
+        self.assertIn('email', response.data['errors'][0]['errors'])
+        self.assertIn('role', response.data['errors'][1]['errors'])
+
+    def test_reports_of_a_failed_batch_are_not_imported(self):
+        rows = [
+            self.row('report', manager='lead@example.com'),
+            self.row('lead'),
+            self.row('other'),
+            self.row('grandreport', manager='report@example.com'),
+        ]
+        bulk_create = Employee.objects.bulk_create
+
+        def failing_bulk_create(employees, *args, **kwargs):
+            if any(employee.first_name == 'Lead' for employee in employees):
+                raise DatabaseError('disk I/O error')
+            return bulk_create(employees, *args, **kwargs)
+
+        with mock.patch.object(Employee.objects, 'bulk_create', side_effect=failing_bulk_create):
+            result = EmployeeImporter(rows, batch_size=1).run()
+
+        self.assertEqual([c['row'] for c in result['created']], [3])
+        self.assertEqual([e['row'] for e in result['errors']], [1, 2, 4])
+        self.assertIn('non_field_errors', result['errors'][1]['errors'])
+        self.assertEqual(result['errors'][0]['errors'], {'manager': ['Manager row could not be imported']})
+        self.assertEqual(result['errors'][2]['errors'], {'manager': ['Manager row could not be imported']})
+        self.assertFalse(Employee.objects.filter(user__email='report@example.com').exists())
+
+    def test_csv_upload(self):
+        content = 'email,username,first_name,last_name,role,expected_hours\n' \
+                  'csv@example.com,csv,Csv,Row,Developer,6\n'
+        upload = SimpleUploadedFile('staff.csv', content.encode('utf-8'), content_type='text/csv')
+
+        response = self.client.post(self.url, {'file': upload}, format='multipart')
+
+        self.assertEqual(response.data['created_count'], 1, response.data)
+        self.assertEqual(Employee.objects.get(user__email='csv@example.com').expected_hours, 6)
+
+    def test_requires_staff(self):
+        self.user.is_staff = False
+        self.user.save()
+        response = self.client.post(self.url, [self.row('x')], format='json')
+        self.assertEqual(response.status_code, 403)
+
+    def test_management_command(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.json') as handle:
+            handle.write('[{"email": "cmd@example.com", "username": "cmd", "first_name": "C", '
+                         '"last_name": "M", "role": "Developer"}]')
+            handle.flush()
+            call_command('import_employees', handle.name, stdout=tempfile.TemporaryFile('w'))
+        self.assertTrue(Employee.objects.filter(user__email='cmd@example.com').exists())
+
+
+class FieldSelectionTests(EmployeeTestMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.report = self.create_employee(manager=self.employee)
+
+    def test_profile_expand_collapses_relations_to_ids(self):
+        url = reverse('employees:employee-detail', args=[self.report.pk])
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, {'fields': 'id,manager,department,role', 'expand': 'role'})
+        self.assertEqual(response.data, {
+            'id': self.report.pk,
+            'manager': self.employee.pk,
+            'role': dict(JobRoleSerializer(self.role).data),
+            'department': self.department.pk,
+        })
+        self.assertEqual(len(queries), 1)
+
+    def test_profile_without_parameters_is_unchanged(self):
+        response = self.client.get(reverse('employees:current-user-employee-profile'))
+        self.assertEqual(response.data['employee']['manager'], None)
+        self.assertEqual(response.data['employee']['department']['name'], 'Engineering')
+
+        response = self.client.get(reverse('employees:current-user-employee-profile'), {'fields': 'id,full_name'})
+        self.assertEqual(response.data['employee'], {'id': self.employee.pk, 'full_name': 'Ada Lovelace'})
+
+    def test_list_fields_and_expand(self):
+        url = reverse('employees:employee-list')
+        response = self.client.get(url, {'fields': 'id,role', 'expand': ''})
+        self.assertEqual(response.data['results'], [
+            {'id': self.report.pk, 'role': self.role.pk},
+            {'id': self.employee.pk, 'role': self.role.pk},
+        ])
+        response = self.client.get(url, {'fields': 'id,role', 'expand': 'role'})
+        self.assertEqual(response.data['results'][0]['role']['name'], 'Developer')
+
+    def test_unknown_fields_are_rejected(self):
+        response = self.client.get(reverse('employees:current-user-employee-profile'), {'expand': 'user'})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['message'], 'Invalid field selection')
+
+
+class OrgChartTests(EmployeeTestMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        # Ada -> lead -> (dev1, dev2 -> intern)
+        self.lead = self.create_employee(manager=self.employee)
+        self.dev1 = self.create_employee(manager=self.lead)
+        self.dev2 = self.create_employee(manager=self.lead)
+        self.intern = self.create_employee(manager=self.dev2)
+
+    def closure(self):
+        return set(EmployeeHierarchy.objects.values_list('ancestor_id', 'descendant_id', 'depth'))
+
+    def expected_closure(self):
+        managers = dict(Employee.objects.values_list('id', 'manager_id'))
+        rows = set()
+        for employee_id in managers:
+            current, depth = employee_id, 0
+            while current is not None:
+                rows.add((current, employee_id, depth))
+                current, depth = managers[current], depth + 1
+        return rows
+
+    def test_subtree_in_one_query(self):
+        url = reverse('employees:employee-reports', args=[self.employee.pk])
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, {'fields': 'id,manager,depth'})
+        self.assertEqual(len(queries), 1)
+        self.assertEqual(response.data['results'], [
+            {'id': self.lead.pk, 'manager': self.employee.pk, 'depth': 1},
+            {'id': self.dev1.pk, 'manager': self.lead.pk, 'depth': 2},
+            {'id': self.dev2.pk, 'manager': self.lead.pk, 'depth': 2},
+            {'id': self.intern.pk, 'manager': self.dev2.pk, 'depth': 3},
+        ])
+
+        response = self.client.get(url, {'depth': 1, 'page_size': 1})
+        self.assertEqual([row['id'] for row in response.data['results']], [self.lead.pk])
+        self.assertIsNone(response.data['next'])
+
+    def test_managers_nearest_first(self):
+        url = reverse('employees:employee-managers', args=[self.intern.pk])
+        response = self.client.get(url, {'fields': 'id,depth'})
+        self.assertEqual(response.data, [
+            {'id': self.dev2.pk, 'depth': 1},
+            {'id': self.lead.pk, 'depth': 2},
+            {'id': self.employee.pk, 'depth': 3},
+        ])
+        self.assertEqual(self.client.get(reverse('employees:employee-managers', args=[self.employee.pk])).data, [])
+        self.assertEqual(self.client.get(reverse('employees:employee-managers', args=[999999])).status_code, 404)
+
+    def test_manager_changes_move_subtrees(self):
+        self.dev2.manager = self.employee
+        self.dev2.save()
+        self.assertEqual(self.closure(), self.expected_closure())
+
+        response = self.client.patch(
+            reverse('employees:employee-detail', args=[self.lead.pk]), {'manager': None}, format='json'
+        )
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(self.closure(), self.expected_closure())
+
+        self.dev2.delete()
+        self.assertEqual(self.closure(), self.expected_closure())
+
+    def test_reporting_cycles_are_rejected(self):
+        response = self.client.patch(
+            reverse('employees:employee-detail', args=[self.lead.pk]), {'manager': self.intern.pk}, format='json'
+        )
+        self.assertEqual(response.status_code, 400)
+        self.lead.manager = self.intern
+        with self.assertRaises(HierarchyCycle):
+            self.lead.save()
+
+    def test_rebuild_matches_maintained_table(self):
+        Employee.objects.filter(pk=self.dev1.pk).update(manager=self.intern)
+        call_command('rebuild_org_chart', stdout=io.StringIO())
+        self.assertEqual(self.closure(), self.expected_closure())
+
+
+class EmployeeSearchTests(EmployeeTestMixin, APITestCase):
+    url = reverse('employees:employee-search')
+
+    def search(self, query, **params):
+        response = self.client.get(self.url, {'q': query, **params})
+        self.assertEqual(response.status_code, 200, response.data)
+        return [row['id'] for row in response.data['results']]
+
+    def test_prefix_search_is_ranked_by_field(self):
+        # "Love" is in this employee's department, but in Ada Lovelace's name
+        support = Department.objects.create(name='Lovelace Support')
+        helper = self.create_employee(role=JobRole.objects.create(name='Helper', department=support))
+        self.assertEqual(self.search('lov'), [self.employee.pk, helper.pk])
+        self.assertEqual(self.search('ada LOVE'), [self.employee.pk])
+        self.assertEqual(self.search('owner@exa'), [self.employee.pk])
+        # FTS operators and quotes are treated as plain words
+        self.assertEqual(self.search('lov*"'), [self.employee.pk, helper.pk])
+        self.assertEqual(self.search('lov OR NEAR'), [])
+        self.assertEqual(self.search('lov', fields='id,full_name', limit=1), [self.employee.pk])
+
+    def test_index_follows_changes(self):
+        employee = self.create_employee()
+        self.assertEqual(sorted(self.search('engin')), sorted([self.employee.pk, employee.pk]))
+
+        self.department.name = 'Research'
+        self.department.save()
+        self.assertEqual(self.search('engin'), [])
+        self.assertEqual(len(self.search('research')), 2)
+
+        employee.user.email = 'renamed@example.com'
+        employee.user.save()
+        self.assertEqual(self.search('renamed'), [employee.pk])
+
+        employee.is_active = False
+        employee.save()
+        self.assertEqual(self.search('renamed'), [])
+        self.assertEqual(self.search('renamed', include_inactive='true'), [employee.pk])
+
+        employee.delete()
+        self.assertEqual(self.search('renamed', include_inactive='true'), [])
+
+    def test_rebuild_and_errors(self):
+        call_command('rebuild_search_index', stdout=io.StringIO())
+        self.assertEqual(self.search('ada'), [self.employee.pk])
+        self.assertEqual(self.client.get(self.url, {'q': ' '}).status_code, 400)
+
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, EMPLOYEES_IMAGE_WORKERS=0)
+class ProfileImageRenditionTests(EmployeeTestMixin, APITestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.addClassCleanup(shutil.rmtree, MEDIA_ROOT, ignore_errors=True)
+
+    @staticmethod
+    def image_upload(color, size=(640, 480), mode='RGB', image_format='PNG'):
+        output = io.BytesIO()
+        Image.new(mode, size, color).save(output, image_format)
+        return SimpleUploadedFile(f'avatar.{image_format.lower()}', output.getvalue())
+
+    def upload(self, employee, upload):
+        url = reverse('employees:employee-detail', args=[employee.pk])
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.patch(url, {'profile_image': upload}, format='multipart')
+        self.assertEqual(response.status_code, 200, response.data)
+        employee.refresh_from_db()
+        return employee.profile_image_digest
+
+    def test_upload_generates_content_addressed_renditions(self):
+        detail_url = reverse('employees:employee-detail', args=[self.employee.pk])
+        self.assertIsNone(self.client.get(detail_url).data['profile_image_renditions'])
+        digest = self.upload(self.employee, self.image_upload('red', mode='RGBA'))
+        self.assertTrue(digest)
+        for size in (48, 96, 256):
+            for extension, image_format in (('webp', 'WEBP'), ('jpg', 'JPEG')):
+                with default_storage.open(rendition_name(digest, size, extension)) as file, Image.open(file) as image:
+                    self.assertEqual((image.format, image.size), (image_format, (size, size)))
+
+        detail = self.client.get(detail_url).data
+        small = detail['profile_image_renditions']['small']
+        self.assertTrue(small['webp'].startswith('http://testserver/media/profile_images/renditions/'))
+        self.assertTrue(small['jpeg'].endswith(f'{digest}-96.jpg'))
+        listed = self.client.get(reverse('employees:employee-list')).data['results']
+        self.assertEqual(listed[0]['profile_image_renditions'], detail['profile_image_renditions'])
+
+        # Same content, same renditions; different content, new names
+        other = self.create_employee()
+        self.assertEqual(self.upload(other, self.image_upload('red', mode='RGBA')), digest)
+        self.assertNotEqual(self.upload(other, self.image_upload('blue')), digest)
+
+    def test_new_image_clears_digest_until_rendered(self):
+        self.upload(self.employee, self.image_upload('green', image_format='JPEG'))
+        self.employee.profile_image = self.image_upload('white')
+        self.employee.save()
+        self.assertEqual(self.employee.profile_image_digest, '')
+
+        Employee.objects.filter(pk=self.employee.pk).update(profile_image_digest='')
+        call_command('generate_profile_renditions', stdout=io.StringIO())
+        self.employee.refresh_from_db()
+        self.assertTrue(self.employee.profile_image_digest)
@@ -15,11 +15,18 @@ urlpatterns = [
     # Employee endpoints
     path('employees/', views.EmployeeListView.as_view(), name='employee-list'),
     path('employees/create/', views.EmployeeCreateView.as_view(), name='employee-create'),
+    path('employees/import/', views.employee_import, name='employee-import'),
     path('employees/<int:pk>/', views.EmployeeDetailView.as_view(), name='employee-detail'),
     path('employees/<int:pk>/delete/', views.employee_delete, name='employee-delete'),
     path('employees/active/', views.employee_active, name='employee-active'),
     path('employees/inactive/', views.employee_inactive, name='employee-inactive'),
+    path('employees/changes/', views.employee_changes, name='employee-changes'),
+    path('employees/search/', views.employee_search, name='employee-search'),
     path('employees/<int:pk>/reactivate/', views.employee_reactivate, name='employee-reactivate'),
+
+    # Org chart endpoints
+    path('employees/<int:pk>/reports/', views.EmployeeReportsView.as_view(), name='employee-reports'),
+    path('employees/<int:pk>/managers/', views.employee_managers, name='employee-managers'),
     
     # Current user's employee profile
     path('me/', views.current_user_employee_profile, name='current-user-employee-profile'),
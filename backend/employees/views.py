@@ -1,43 +1,96 @@
 from rest_framework import status, generics
 from rest_framework.decorators import api_view, permission_classes
-from rest_framework.permissions import IsAuthenticated, AllowAny
+from rest_framework.permissions import IsAuthenticated, IsAdminUser, AllowAny
 from rest_framework.response import Response
 from django.contrib.auth import get_user_model
+from backend.pagination import paginated_response
+from backend.sync import changes_response
+from .cache import cached_response
+from .hierarchy import managers, parse_max_depth, reports
+from .importers import EmployeeImporter, parse_rows
 from .models import Employee, JobRole, Department
+from .search import search_employee_ids
 from .serializers import (
     EmployeeCreateSerializer, 
     EmployeeUpdateSerializer,
     EmployeeProfileSerializer,
-    EmployeeListSerializer,
+    EmployeeListValuesSerializer,
+    OrgChartValuesSerializer,
     JobRoleSerializer,
     DepartmentSerializer
 )
 
 User = get_user_model()
 
+SEARCH_LIMIT = 20
+MAX_SEARCH_LIMIT = 100
 
-class DepartmentListView(generics.ListAPIView):
+
+def get_current_employee(request, employees=None):
+    """
+    Load the authenticated user's employee, by the id carried on the token
+    when CachedJWTAuthentication provided one.
+    """
+    if employees is None:
+        employees = Employee.objects.select_related('user', 'role__department', 'manager__user')
+    employee_id = getattr(request.user, 'employee_id', None)
+    if employee_id is not None:
+        return employees.get(pk=employee_id, user=request.user)
+    return employees.get(user=request.user)
+
+
+class CachedReferenceListMixin:
+    """Serve a whole reference table from the versioned cache with ETag support"""
+    cache_name = None
+
+    def list(self, request, *args, **kwargs):
+        return cached_response(
+            request, self.cache_name,
+            lambda: list(self.get_serializer(self.get_queryset(), many=True).data),
+        )
+
+
+class CachedReferenceDetailMixin:
+    """Serve a single reference row from the versioned cache with ETag support"""
+    cache_name = None
+
+    def retrieve(self, request, *args, **kwargs):
+        return cached_response(
+            request, f"{self.cache_name}:{kwargs[self.lookup_field]}",
+            lambda: dict(self.get_serializer(self.get_object()).data),
+        )
+
+
+class DepartmentListView(CachedReferenceListMixin, generics.ListAPIView):
     queryset = Department.objects.all()
     permission_classes = (IsAuthenticated,)
     serializer_class = DepartmentSerializer
+    # Small reference table, always returned whole
+    pagination_class = None
+    cache_name = 'departments'
 
 
-class DepartmentDetailView(generics.RetrieveAPIView):
+class DepartmentDetailView(CachedReferenceDetailMixin, generics.RetrieveAPIView):
     queryset = Department.objects.all()
     permission_classes = (IsAuthenticated,)
     serializer_class = DepartmentSerializer
+    cache_name = 'department'
 
 
-class JobRoleListView(generics.ListAPIView):
-    queryset = JobRole.objects.all()
+class JobRoleListView(CachedReferenceListMixin, generics.ListAPIView):
+    queryset = JobRole.objects.select_related('department')
     permission_classes = (IsAuthenticated,)
     serializer_class = JobRoleSerializer
+    # Small reference table, always returned whole
+    pagination_class = None
+    cache_name = 'job-roles'
 
 
-class JobRoleDetailView(generics.RetrieveAPIView):
-    queryset = JobRole.objects.all()
+class JobRoleDetailView(CachedReferenceDetailMixin, generics.RetrieveAPIView):
+    queryset = JobRole.objects.select_related('department')
     permission_classes = (IsAuthenticated,)
     serializer_class = JobRoleSerializer
+    cache_name = 'job-role'
 
 
 class EmployeeCreateView(generics.CreateAPIView):
@@ -63,7 +116,10 @@ class EmployeeCreateView(generics.CreateAPIView):
 class EmployeeListView(generics.ListAPIView):
     queryset = Employee.objects.all()
     permission_classes = (IsAuthenticated,)
-    serializer_class = EmployeeListSerializer
+    serializer_class = EmployeeListValuesSerializer
+
+    def get_queryset(self):
+        return EmployeeListValuesSerializer.project(super().get_queryset(), self.request)
 
 
 class EmployeeDetailView(generics.RetrieveUpdateAPIView):
@@ -71,6 +127,11 @@ class EmployeeDetailView(generics.RetrieveUpdateAPIView):
     permission_classes = (IsAuthenticated,)
     serializer_class = EmployeeProfileSerializer
 
+    def get_queryset(self):
+        if self.request.method == 'GET':
+            return EmployeeProfileSerializer.select_related_for(Employee.objects.all(), self.request)
+        return super().get_queryset()
+
     def get_serializer_class(self):
         if self.request.method in ['PUT', 'PATCH']:
             return EmployeeUpdateSerializer
@@ -93,6 +154,35 @@ class EmployeeDetailView(generics.RetrieveUpdateAPIView):
         }, status=status.HTTP_400_BAD_REQUEST)
 
 
+@api_view(['POST'])
+@permission_classes([IsAdminUser])
+def employee_import(request):
+    """Bulk-create employees from an uploaded CSV/JSON file or a JSON list of rows"""
+    upload = request.FILES.get('file')
+    try:
+        if upload:
+            file_type = request.data.get('file_type') or upload.name.rsplit('.', 1)[-1].lower()
+            rows = parse_rows(upload.read().decode('utf-8-sig'), file_type)
+        else:
+            rows = request.data.get('employees') if isinstance(request.data, dict) else request.data
+            if not isinstance(rows, list):
+                raise ValueError('Provide a file upload or a list of employees')
+    except (ValueError, UnicodeDecodeError) as e:
+        return Response({
+            'message': 'Employee import failed',
+            'error': str(e)
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    report = EmployeeImporter(rows).run()
+    return Response({
+        'message': 'Employee import finished',
+        'created_count': len(report['created']),
+        'error_count': len(report['errors']),
+        'created': report['created'],
+        'errors': report['errors']
+    }, status=status.HTTP_200_OK)
+
+
 @api_view(['DELETE'])
 @permission_classes([IsAuthenticated])
 def employee_delete(request, pk):
@@ -113,16 +203,97 @@ def employee_delete(request, pk):
 @permission_classes([IsAuthenticated])
 def employee_active(request):
     active_employees = Employee.objects.filter(is_active=True)
-    serializer = EmployeeListSerializer(active_employees, many=True)
-    return Response(serializer.data)
+    return paginated_response(request, active_employees, EmployeeListValuesSerializer)
 
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def employee_inactive(request):
     inactive_employees = Employee.objects.filter(is_active=False)
-    serializer = EmployeeListSerializer(inactive_employees, many=True)
-    return Response(serializer.data)
+    return paginated_response(request, inactive_employees, EmployeeListValuesSerializer)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def employee_search(request):
+    """
+    Typeahead search over name, email, job role and department through the
+    full-text index; every word of ``q`` matches as a prefix, best match first.
+    """
+    query = request.query_params.get('q', '').strip()
+    if not query:
+        return Response({
+            'message': 'Search query is required',
+            'error': 'Pass the search text as the q query parameter'
+        }, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        limit = min(max(int(request.query_params.get('limit', SEARCH_LIMIT)), 1), MAX_SEARCH_LIMIT)
+    except ValueError:
+        limit = SEARCH_LIMIT
+    include_inactive = request.query_params.get('include_inactive', '').lower() in ('1', 'true', 'yes')
+
+    ids = search_employee_ids(query, limit=limit, active_only=not include_inactive)
+    rows = EmployeeListValuesSerializer.project(Employee.objects.filter(pk__in=ids), request)
+    rows_by_id = {row['id']: row for row in rows}
+    ranked = [rows_by_id[pk] for pk in ids if pk in rows_by_id]
+    return Response({
+        'query': query,
+        'results': EmployeeListValuesSerializer(ranked, many=True, context={'request': request}).data,
+    })
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def employee_changes(request):
+    """
+    Employees created or updated after the ``since`` watermark; deactivated
+    employees are returned as tombstones under ``deleted``.
+    """
+    return changes_response(
+        request, Employee.objects.all(), EmployeeListValuesSerializer,
+        is_tombstone=lambda row: not row['is_active'],
+    )
+
+
+class EmployeeReportsView(generics.ListAPIView):
+    """Everyone under an employee, nearest first; ``?depth=1`` for direct reports only"""
+    permission_classes = (IsAuthenticated,)
+    serializer_class = OrgChartValuesSerializer
+    pagination_ordering = ['depth', 'id']
+
+    def get_queryset(self):
+        return OrgChartValuesSerializer.project(reports(self.kwargs['pk'], max_depth=self.max_depth), self.request)
+
+    def list(self, request, *args, **kwargs):
+        try:
+            self.max_depth = parse_max_depth(request.query_params.get('depth'))
+        except ValueError:
+            return Response({
+                'message': 'Invalid depth',
+                'error': 'depth must be a positive integer'
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        response = super().list(request, *args, **kwargs)
+        # An empty first page is the only case that needs to tell "no reports" from "no employee"
+        if not response.data['results'] and 'cursor' not in request.query_params \
+                and not Employee.objects.filter(pk=kwargs['pk']).exists():
+            return Response({
+                'message': 'Employee not found'
+            }, status=status.HTTP_404_NOT_FOUND)
+        return response
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def employee_managers(request, pk):
+    """The chain of managers above an employee, nearest first"""
+    chain = OrgChartValuesSerializer.project(managers(pk), request)
+    data = OrgChartValuesSerializer(chain, many=True, context={'request': request}).data
+    if not data and not Employee.objects.filter(pk=pk).exists():
+        return Response({
+            'message': 'Employee not found'
+        }, status=status.HTTP_404_NOT_FOUND)
+    return Response(data)
 
 
 @api_view(['POST'])
@@ -152,9 +323,11 @@ def employee_reactivate(request, pk):
 @permission_classes([IsAuthenticated])
 def current_user_employee_profile(request):
     """Get the current authenticated user's employee profile"""
+    # Validates ?fields= / ?expand= (400) and joins only what they select
+    employees = EmployeeProfileSerializer.select_related_for(Employee.objects.all(), request)
     try:
         # Get the employee profile for the current authenticated user
-        employee = Employee.objects.get(user=request.user)
+        employee = get_current_employee(request, employees)
         
         if not employee.is_active:
             return Response({
@@ -162,7 +335,7 @@ def current_user_employee_profile(request):
                 'error': 'Your employee profile has been deactivated'
             }, status=status.HTTP_400_BAD_REQUEST)
         
-        serializer = EmployeeProfileSerializer(employee)
+        serializer = EmployeeProfileSerializer(employee, context={'request': request})
         return Response({
             'message': 'Employee profile retrieved successfully',
             'employee': serializer.data
@@ -186,7 +359,7 @@ def update_current_user_profile(request):
     """Update the current authenticated user's employee profile"""
     try:
         # Get the employee profile for the current authenticated user
-        employee = Employee.objects.get(user=request.user)
+        employee = get_current_employee(request)
         
         if not employee.is_active:
             return Response({
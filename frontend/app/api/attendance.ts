@@ -26,6 +26,35 @@ export interface UpdateAttendanceData {
   check_out_time?: string;
 }
 
+export interface PaginatedResponse<T> {
+  next: string | null;
+  previous: string | null;
+  results: T[];
+}
+
+// Follow cursor pagination links until the whole collection is loaded
+const fetchAllPages = async <T>(
+  url: string,
+  params?: Record<string, string>
+): Promise<T[]> => {
+  const records: T[] = [];
+  let response = await api.get<PaginatedResponse<T>>(url, { params });
+
+  records.push(...response.data.results);
+  while (response.data.next) {
+    response = await api.get<PaginatedResponse<T>>(response.data.next);
+    records.push(...response.data.results);
+  }
+
+  return records;
+};
+
+export interface AttendanceEvent {
+  id?: number;
+  type: "created" | "updated" | "check_in" | "check_out" | "resync";
+  attendance?: AttendanceRecord;
+}
+
 export interface AttendanceStats {
   totalHours: number;
   breakHours: number;
@@ -72,8 +101,7 @@ export const attendanceAPI = {
 
   // Get today's attendance
   async getTodayAttendance(): Promise<AttendanceRecord[]> {
-    const response = await api.get("/attendance/today/");
-    return response.data;
+    return fetchAllPages<AttendanceRecord>("/attendance/today/");
   },
 
   // Get attendance by date range
@@ -81,18 +109,19 @@ export const attendanceAPI = {
     startDate: string,
     endDate: string
   ): Promise<AttendanceRecord[]> {
-    const response = await api.get("/attendance/date-range/", {
-      params: { start_date: startDate, end_date: endDate },
+    return fetchAllPages<AttendanceRecord>("/attendance/date-range/", {
+      start_date: startDate,
+      end_date: endDate,
     });
-    return response.data;
   },
 
   // Get attendance by employee
   async getAttendanceByEmployee(
     employeeId: number
   ): Promise<AttendanceRecord[]> {
-    const response = await api.get(`/attendance/employee/${employeeId}/`);
-    return response.data;
+    return fetchAllPages<AttendanceRecord>(
+      `/attendance/employee/${employeeId}/`
+    );
   },
 
   // Get or create today's attendance record
@@ -115,6 +144,31 @@ export const attendanceAPI = {
       throw error;
     }
   },
+
+  // Subscribe to live attendance changes (Server-Sent Events); returns an
+  // unsubscribe function. On "resync" the caller should refetch today's list.
+  subscribeToEvents(
+    onEvent: (event: AttendanceEvent) => void
+  ): () => void {
+    const token = localStorage.getItem("token") ?? "";
+    const url = `${api.defaults.baseURL}/attendance/events/?token=${encodeURIComponent(token)}`;
+    const source = new EventSource(url);
+    const types: AttendanceEvent["type"][] = [
+      "created",
+      "updated",
+      "check_in",
+      "check_out",
+      "resync",
+    ];
+
+    types.forEach((type) =>
+      source.addEventListener(type, (message) =>
+        onEvent(JSON.parse((message as MessageEvent).data))
+      )
+    );
+
+    return () => source.close();
+  },
 };
 
 // Utility functions for time calculations